@@ -28,15 +28,30 @@ else
    SUDO=""
 fi
 
+# Install shared modules (the launchers import them from their own directory)
+LIB_DIR=/usr/local/lib/sysinfo
+echo "📚 Installing shared modules to $LIB_DIR..."
+$SUDO mkdir -p "$LIB_DIR"
+$SUDO cp sysinfo*.py "$LIB_DIR"/
+# Users can't write __pycache__ here, so compile once now instead of on every run
+$SUDO python3 -m compileall -q "$LIB_DIR"
+
+# The launchers are tiny stubs that import the compiled modules; a script
+# run directly is recompiled from source on every start
+install_launcher() {
+    $SUDO rm -f "$2"
+    printf '#!/usr/bin/env python3\nimport sys\nsys.path.insert(0, "%s")\nfrom %s import main\nmain()\n' \
+        "$LIB_DIR" "$1" | $SUDO tee "$2" > /dev/null
+    $SUDO chmod +x "$2"
+}
+
 # Install TUI version
 echo "📝 Installing TUI version..."
-$SUDO cp sysinfo.py /usr/local/bin/sysinfo
-$SUDO chmod +x /usr/local/bin/sysinfo
+install_launcher sysinfo /usr/local/bin/sysinfo
 
 # Install GUI version
 echo "🖥️  Installing GUI version..."
-$SUDO cp sysinfo_gui.py /usr/local/bin/sysinfo-gui
-$SUDO chmod +x /usr/local/bin/sysinfo-gui
+install_launcher sysinfo_gui /usr/local/bin/sysinfo-gui
 
 echo ""
 echo "✅ Installation complete!"
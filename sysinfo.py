@@ -4,19 +4,78 @@ sysinfo - Interactive Linux system information viewer
 Run: python3 sysinfo.py
 """
 
-import curses
-import psutil
-import platform
-import subprocess
-import os
+import argparse
+import heapq
+import struct
+import time
 from datetime import datetime, timedelta
+from itertools import groupby
+
+from sysinfo_core import (HEAT_CHARS, CollectionEngine, DataSource, HistoryCollector, ProcessTable,
+                          format_age, heatmap_rows, memory_detail, pressure_summary,
+                          raise_open_file_limit, sparkline, stale_note, thermal_detail)
+from sysinfo_profile import SelfStats
+
+# curses is imported in main() so the headless modes work without it
+curses = None
 
 
 class SysInfoViewer:
-    def __init__(self, stdscr):
+    VIEWS = {
+        ord('1'): 'overview',
+        ord('2'): 'cpu',
+        ord('3'): 'memory',
+        ord('4'): 'disk',
+        ord('5'): 'network',
+        ord('6'): 'process',
+        ord('7'): 'diskio',
+        ord('8'): 'cgroups',
+        ord('9'): 'proclist',
+        ord('t'): 'thermal',
+    }
+    
+    # Process list: sort key -> column, and (column, heading, width)
+    LIST_SORT_KEYS = {
+        ord('p'): 'pid', ord('u'): 'user', ord('c'): 'cpu', ord('m'): 'memory',
+        ord('i'): 'io', ord('a'): 'age', ord('n'): 'name',
+    }
+    LIST_COLUMNS = (
+        ('pid', "PID", 8), ('user', "USER", 10), ('cpu', "CPU%", 7), ('memory', "RSS MB", 9),
+        ('io', "I/O MB/s", 9), ('age', "AGE", 8), ('name', "COMMAND", 0),
+    )
+    
+    def __init__(self, stdscr, interval=1.0, source=None, alerts=None, budget=0.05):
         self.stdscr = stdscr
-        self.current_view = 'main'
-        self.setup_colors()
+        self.current_view = 'overview'
+        self.interval = interval
+        self.cpu_grid = None  # None: heatmap automatically on many-core hosts
+        self.show_overhead = False
+        self.list_offset = 0     # first row of the process list on screen
+        self.list_filter = ""
+        self.filtering = False   # typing goes to the process list filter
+        self.stats = SelfStats()
+        self.engine = CollectionEngine()  # views wait for their data only until its deadline
+        self.frame = {}       # row -> [(x, text, attr), ...] being drawn
+        self.last_frame = {}  # what is currently on the terminal
+        if source is None:
+            source = DataSource(HistoryCollector(interval=interval), ProcessTable())
+        self.source = source
+        self.collector = source.collector
+        self.process_table = source.process_table
+        self.stats.instrument(self, ('get_', 'view_', 'present'))
+        self.instrument_source()
+        self.alerts = alerts
+        if alerts is not None:
+            self.stats.instrument(alerts, ('observe',), 'alerts')
+            alerts.attach(source)
+        if stdscr is not None:
+            self.stats.instrument(self.source.start(budget), ('use',), 'scheduler')
+            self.setup_colors()
+        
+    def instrument_source(self):
+        """Time the data source's sampling for the overhead panel"""
+        self.stats.instrument(self.collector, ('sample',), 'collector')
+        self.stats.instrument(self.process_table, ('refresh',), 'process_table')
         
     def setup_colors(self):
         """Initialize color pairs"""
@@ -27,51 +86,152 @@ class SysInfoViewer:
         curses.init_pair(4, curses.COLOR_WHITE, curses.COLOR_BLACK)   # Normal
         curses.init_pair(5, curses.COLOR_YELLOW, curses.COLOR_BLACK)  # Yellow
         
+    def put(self, y, x, text, attr=0):
+        """Queue text at (y, x) for the frame being drawn"""
+        if 0 <= y < curses.LINES and x < curses.COLS:
+            self.frame.setdefault(y, []).append((x, text[:curses.COLS - x], attr))
+        
+    def present(self):
+        """Write only the rows that changed since the last frame"""
+        frame, last = self.frame, self.last_frame
+        for y in frame.keys() | last.keys():
+            row = frame.get(y)
+            if row == last.get(y):
+                continue
+            self.stdscr.move(y, 0)
+            self.stdscr.clrtoeol()
+            for x, text, attr in row or ():
+                try:
+                    self.stdscr.addstr(y, x, text, attr)
+                except curses.error:
+                    pass  # Writing the bottom-right cell moves the cursor off-screen
+        self.last_frame = frame
+        self.frame = {}
+        self.stdscr.refresh()
+        
+    def resize(self):
+        """Pick up the new terminal size and force a full repaint"""
+        curses.update_lines_cols()
+        self.stdscr.clear()
+        self.last_frame = {}
+        
     def draw_header(self):
         """Draw top header"""
-        self.stdscr.addstr(0, 0, "╔" + "═" * (curses.COLS - 2) + "╗", curses.color_pair(1))
+        self.put(0, 0, "╔" + "═" * (curses.COLS - 2) + "╗", curses.color_pair(1))
         title = "  System Information Viewer  "
-        self.stdscr.addstr(0, (curses.COLS - len(title)) // 2, title, curses.color_pair(1) | curses.A_BOLD)
+        self.put(0, (curses.COLS - len(title)) // 2, title, curses.color_pair(1) | curses.A_BOLD)
+        if self.alerts is not None:
+            self.draw_alerts()
+        
+    def draw_alerts(self):
+        """Firing (red) and pending (yellow) alerts on the line under the header"""
+        active = self.alerts.active()
+        if not active:
+            return
+        firing = sum(alert.state == 'firing' for alert in active)
+        counts = f"{firing} firing" if firing else ""
+        if len(active) > firing:
+            counts += f"{', ' if firing else ''}{len(active) - firing} pending"
+        text = f" ⚠ {counts}: " + "  |  ".join(alert.describe() for alert in active)
+        self.put(1, 0, text, curses.color_pair(3 if firing else 5) | curses.A_BOLD)
         
     def draw_footer(self):
         """Draw navigation footer"""
-        footer = "🔱 (1)Overview  (2)CPU  (3)Memory  (4)Disk  (5)Network  (6)Process  (q)Quit"
-        self.stdscr.addstr(curses.LINES - 1, 0, footer[:curses.COLS], curses.color_pair(5))
+        footer = "🔱 (1)Overview  (2)CPU  (3)Memory  (4)Disk  (5)Network  (6)Process  (7)I/O  (8)Cgroups  (9)List  (t)Thermal  (o)Overhead  (q)Quit"
+        self.put(curses.LINES - 1, 0, footer, curses.color_pair(5))
         
     def draw_section(self, y, title, content):
         """Draw a section with title and content"""
-        self.stdscr.addstr(y, 2, f"▸ {title}", curses.color_pair(1) | curses.A_BOLD)
+        self.put(y, 2, f"▸ {title}", curses.color_pair(1) | curses.A_BOLD)
         for i, line in enumerate(content.split('\n')):
             if y + i + 1 < curses.LINES - 1:
-                line_display = line[:curses.COLS - 4]
-                self.stdscr.addstr(y + i + 1, 4, line_display, curses.color_pair(4))
+                self.put(y + i + 1, 4, line[:curses.COLS - 4], curses.color_pair(4))
         return y + len(content.split('\n')) + 2
         
-    def get_cpu_info(self):
+    def sections(self, getters):
+        """Run several views' getters concurrently, each within its deadline; {name: text}"""
+        texts = self.engine.collect(getters)
+        return {name: self.annotate(name, texts[name] or "") for name in getters}
+        
+    def section(self, name, getter):
+        """One view's text from getter, within the deadline for name"""
+        return self.sections({name: getter})[name]
+        
+    def annotate(self, name, text):
+        """text, plus a note if the engine had to fall back to an old answer or none"""
+        note = self.engine.note(name)
+        if note is None:
+            return text
+        return f"{text.rstrip()}\n({note})".lstrip()
+        
+    def draw_overhead(self):
+        """Overlay sysinfo's own CPU%, RSS and call latencies above the footer"""
+        height = max(min(curses.LINES // 2, curses.LINES - 4), 3)
+        lines = self.stats.report(rows=height - 2)
+        scheduler = getattr(self.source, 'scheduler', None)
+        if scheduler is not None:
+            lines.insert(1, scheduler.summary())
+        top = curses.LINES - 1 - len(lines)
+        for i, line in enumerate(lines):
+            attr = curses.color_pair(1) | curses.A_REVERSE
+            if i < 2:
+                attr |= curses.A_BOLD
+            self.put(top + i, 0, f" {line}".ljust(curses.COLS), attr)
+        
+    def show_cpu_grid(self, cpu):
+        """Whether the CPU view draws the heatmap instead of per-core bars"""
+        if self.cpu_grid is None:
+            return len(cpu['percpu']) > 16
+        return self.cpu_grid
+        
+    def get_cpu_info(self, cpu=None):
         """Get CPU information"""
-        cpu_count = psutil.cpu_count(logical=False)
-        cpu_logical = psutil.cpu_count(logical=True)
-        cpu_freq = psutil.cpu_freq()
-        cpu_percent = psutil.cpu_percent(interval=0.5, percpu=True)
-        
-        info = f"Physical Cores: {cpu_count}\n"
-        info += f"Logical Cores: {cpu_logical}\n"
-        info += f"Frequency: {cpu_freq.current:.1f} MHz\n\n"
-        info += "Per-Core Usage:\n"
-        for i, percent in enumerate(cpu_percent[:8]):  # Show first 8 cores
-            bar = "█" * int(percent / 5) + "░" * (20 - int(percent / 5))
-            info += f"  Core {i}: [{bar}] {percent:5.1f}%\n"
-        if len(cpu_percent) > 8:
-            info += f"  ... and {len(cpu_percent) - 8} more cores\n"
+        cpu = cpu or self.source.cpu()
+        cpu_percent = cpu['percpu']
+        
+        info = f"Physical Cores: {cpu['cores_physical']}\n"
+        info += f"Logical Cores: {cpu['cores_logical']}\n"
+        info += f"Frequency: {cpu['freq_current']:.1f} MHz\n\n"
+        if self.show_cpu_grid(cpu):
+            hottest = heapq.nlargest(8, range(len(cpu_percent)), key=cpu_percent.__getitem__)
+            info += "Hottest: " + "  ".join(
+                f"cpu{cpu['ids'][i]} {cpu_percent[i]:.0f}%" for i in hottest) + "\n"
+        else:
+            info += "Per-Core Usage:\n"
+            for i, percent in enumerate(cpu_percent[:8]):  # Show first 8 cores
+                bar = "█" * int(percent / 5) + "░" * (20 - int(percent / 5))
+                info += f"  Core {i}: [{bar}] {percent:5.1f}%\n"
+            if len(cpu_percent) > 8:
+                info += f"  ... and {len(cpu_percent) - 8} more cores (g for heatmap)\n"
         
-        avg = psutil.cpu_percent(interval=0.5)
-        info += f"\nAverage: {avg:.1f}%"
+        info += f"\nAverage: {cpu['percent']:.1f}%\n"
+        info += f"History: {sparkline(self.collector.history('cpu', 40), 100)}"
         return info
         
+    def draw_heatmap(self, y, cpu):
+        """Draw one cell per CPU, grouped by socket/NUMA node, colored by load"""
+        self.put(y, 2, "▸ Per-CPU Load (g to toggle)", curses.color_pair(1) | curses.A_BOLD)
+        last = len(HEAT_CHARS) - 1
+        colors = {c: curses.color_pair(2 if i <= last // 2 else 5 if i < last - 1 else 3)
+                  for i, c in enumerate(HEAT_CHARS)}
+        layout = self.source.cpu_topology().layout(cpu['ids'])
+        for label, cells in heatmap_rows(layout, cpu['percpu'], curses.COLS - 14):
+            y += 1
+            if y >= curses.LINES - 1:
+                break
+            self.put(y, 4, label, curses.color_pair(1))
+            x = 12
+            for attr, run in groupby(cells, colors.get):
+                run = "".join(run)
+                self.put(y, x, run, attr)
+                x += len(run)
+        return y + 2
+        
     def get_memory_info(self):
         """Get memory information"""
-        mem = psutil.virtual_memory()
-        swap = psutil.swap_memory()
+        data = self.source.memory()
+        mem = data['memory']
+        swap = data['swap']
         
         def draw_bar(used, total):
             percent = (used / total * 100) if total > 0 else 0
@@ -79,179 +239,654 @@ class SysInfoViewer:
             return f"[{bar}] {percent:.1f}%"
         
         info = f"Physical Memory:\n"
-        info += f"  Used: {mem.used / (1024**3):.1f} GB / {mem.total / (1024**3):.1f} GB\n"
-        info += f"  {draw_bar(mem.used, mem.total)}\n"
-        info += f"  Available: {mem.available / (1024**3):.1f} GB\n\n"
+        info += f"  Used: {mem['used'] / (1024**3):.1f} GB / {mem['total'] / (1024**3):.1f} GB\n"
+        info += f"  {draw_bar(mem['used'], mem['total'])}\n"
+        info += f"  Available: {mem['available'] / (1024**3):.1f} GB\n"
+        info += f"  History: {sparkline(self.collector.history('memory', 40), 100)}\n\n"
         
         info += f"Swap:\n"
-        info += f"  Used: {swap.used / (1024**3):.1f} GB / {swap.total / (1024**3):.1f} GB\n"
-        info += f"  {draw_bar(swap.used, swap.total)}"
+        info += f"  Used: {swap['used'] / (1024**3):.1f} GB / {swap['total'] / (1024**3):.1f} GB\n"
+        info += f"  {draw_bar(swap['used'], swap['total'])}\n"
+        info += f"  History: {sparkline(self.collector.history('swap', 40), 100)}"
+        detail = memory_detail(data)
+        if detail:
+            info += "\n\n" + "\n".join(detail)
         
         return info
         
     def get_disk_info(self):
         """Get disk usage information"""
+        data = self.source.disk()
         info = ""
-        for partition in psutil.disk_partitions():
-            if partition.fstype:  # Skip pseudo filesystems
-                usage = psutil.disk_usage(partition.mountpoint)
-                percent = usage.percent
-                bar = "█" * int(percent / 5) + "░" * (20 - int(percent / 5))
-                info += f"{partition.device} ({partition.fstype})\n"
-                info += f"  {partition.mountpoint}\n"
-                info += f"  {usage.used / (1024**3):.1f} GB / {usage.total / (1024**3):.1f} GB\n"
-                info += f"  [{bar}] {percent:.1f}%\n\n"
+        for part in data['partitions']:
+            percent = part['percent']
+            bar = "█" * int(percent / 5) + "░" * (20 - int(percent / 5))
+            info += f"{part['device']} ({part['fstype']})\n"
+            info += f"  {part['mountpoint']}\n"
+            info += f"  {part['used'] / (1024**3):.1f} GB / {part['total'] / (1024**3):.1f} GB\n"
+            info += f"  [{bar}] {percent:.1f}%{stale_note(part)}\n\n"
+        
+        if not info:
+            info = "No disk partitions found\n\n"
+        info += f"Disk I/O:\n"
+        info += f"  Read:  {data['read_bytes_per_s'] / (1024**2):8.2f} MB/s  {sparkline(self.collector.history('disk_read', 30))}\n"
+        info += f"  Write: {data['write_bytes_per_s'] / (1024**2):8.2f} MB/s  {sparkline(self.collector.history('disk_write', 30))}"
+        return info
         
-        return info.strip() if info else "No disk partitions found"
+    def get_diskio_info(self):
+        """Get per-device disk throughput and IOPS"""
+        devices = self.source.diskio()['devices']
+        if not devices:
+            return "No block devices found"
+        
+        info = f"{'Device':<12} {'Read MB/s':>10} {'Write MB/s':>10} {'Read IOPS':>10} {'Write IOPS':>10} {'Busy':>6}\n"
+        for d in devices:
+            info += (f"{d['name'][:12]:<12} {d['read_bytes_per_s'] / (1024**2):>10.2f} "
+                     f"{d['write_bytes_per_s'] / (1024**2):>10.2f} {d['read_iops']:>10.1f} "
+                     f"{d['write_iops']:>10.1f} {d['busy_percent']:>5.1f}%\n")
+        return info
         
     def get_network_info(self):
         """Get network information"""
-        info = ""
-        net_if = psutil.net_if_addrs()
+        data = self.source.network()
         
-        for interface, addrs in net_if.items():
-            info += f"{interface}:\n"
-            for addr in addrs:
-                info += f"  {addr.family.name}: {addr.address}\n"
-            info += "\n"
+        info = f"{'Interface':<14} {'Recv KB/s':>10} {'Send KB/s':>10} {'Pkt in/s':>9} {'Pkt out/s':>9} {'Err/s':>6} {'Drop/s':>6}\n"
+        for nic in data['nics']:
+            info += (f"{nic['name'][:14]:<14} {nic['bytes_recv_per_s'] / 1024:>10.1f} "
+                     f"{nic['bytes_sent_per_s'] / 1024:>10.1f} {nic['packets_recv_per_s']:>9.1f} "
+                     f"{nic['packets_sent_per_s']:>9.1f} {nic['errors_per_s']:>6.1f} {nic['drops_per_s']:>6.1f}\n")
+        info += "\n"
         
         # Network I/O stats
-        net_io = psutil.net_io_counters()
+        net_io = data['io']
         info += f"Network Stats:\n"
-        info += f"  Bytes Sent: {net_io.bytes_sent / (1024**3):.2f} GB\n"
-        info += f"  Bytes Recv: {net_io.bytes_recv / (1024**3):.2f} GB\n"
-        info += f"  Packets Sent: {net_io.packets_sent}\n"
-        info += f"  Packets Recv: {net_io.packets_recv}"
-        
-        return info
-        
+        info += f"  Bytes Sent: {net_io['bytes_sent'] / (1024**3):.2f} GB\n"
+        info += f"  Bytes Recv: {net_io['bytes_recv'] / (1024**3):.2f} GB\n"
+        info += f"  Packets Sent: {net_io['packets_sent']}\n"
+        info += f"  Packets Recv: {net_io['packets_recv']}\n"
+        info += f"  Send Rate: {data['sent_bytes_per_s'] / 1024:8.1f} KB/s  {sparkline(self.collector.history('net_sent', 30))}\n"
+        info += f"  Recv Rate: {data['recv_bytes_per_s'] / 1024:8.1f} KB/s  {sparkline(self.collector.history('net_recv', 30))}\n\n"
+        
+        for interface, addrs in data['interfaces'].items():
+            info += f"{interface}:\n"
+            for addr in addrs:
+                info += f"  {addr['family']}: {addr['address']}\n"
+        
+        return info.rstrip('\n')
+        
+    PROCESS_LISTS = (
+        (('top_memory', "Memory", lambda p: f"{p['memory_percent']:.1f}%"),
+         ('top_cpu', "CPU", lambda p: f"{p['cpu_percent']:.1f}%"),
+         ('top_ctx', "Context switches/s", lambda p: f"{p['ctx_switches_per_s']:.0f}")),
+        (('top_read', "Disk read", lambda p: f"{p['read_bytes_per_s'] / 1024**2:.2f} MB/s"),
+         ('top_write', "Disk write", lambda p: f"{p['write_bytes_per_s'] / 1024**2:.2f} MB/s"),
+         ('top_threads', "Threads", lambda p: f"{p['threads']}")),
+        (('top_syscr', "Read syscalls/s", lambda p: f"{p['syscr_per_s']:.0f}"),
+         ('top_syscw', "Write syscalls/s", lambda p: f"{p['syscw_per_s']:.0f}"),
+         ('top_fds', "Open files", lambda p: f"{p['fds']}")),
+    )
+    
     def get_process_info(self):
-        """Get top processes by memory and CPU"""
-        info = "Top 5 by Memory Usage:\n"
-        procs = sorted(psutil.process_iter(['pid', 'name', 'memory_percent']), 
-                      key=lambda p: p.info['memory_percent'], reverse=True)[:5]
-        
-        for p in procs:
-            try:
-                info += f"  {p.info['name'][:30]:<30} {p.info['memory_percent']:>6.1f}%\n"
-            except:
-                pass
-        
-        info += "\nTop 5 by CPU Usage:\n"
-        procs = sorted(psutil.process_iter(['pid', 'name', 'cpu_percent']), 
-                      key=lambda p: p.info['cpu_percent'] or 0, reverse=True)[:5]
-        
-        for p in procs:
-            try:
-                cpu = p.info['cpu_percent'] or 0
-                info += f"  {p.info['name'][:30]:<30} {cpu:>6.1f}%\n"
-            except:
-                pass
-        
+        """Get top processes by memory, CPU, I/O, syscalls, files, threads and switches"""
+        data = self.source.process(k=5, max_age=1.0, detail=True)
+        width = (curses.COLS if curses is not None else 120) - 6
+        column = max(width // 3, 24)
+        
+        if data['count'] is None:  # Older recordings keep only the top processes
+            info = "Process count not recorded; top processes only\n\n"
+        else:
+            info = f"{data['count']} processes\n\n"
+        for lists in self.PROCESS_LISTS:
+            lists = [entry for entry in lists if entry[0] in data]  # Recordings have only memory/CPU
+            if not lists:
+                continue
+            info += "".join(f"Top 5 by {title}:".ljust(column) for _, title, _ in lists).rstrip() + "\n"
+            for i in range(5):
+                line = ""
+                for key, _, fmt in lists:
+                    rows = data[key]
+                    if i < len(rows):
+                        value = fmt(rows[i])
+                        name_width = column - len(value) - 4
+                        line += f"  {rows[i]['name'][:name_width]:<{name_width}} {value}".ljust(column)
+                    else:
+                        line += " " * column
+                info += line.rstrip() + "\n"
+            info += "\n"
+        if data['count'] and 'top_read' in data:
+            info += "Disk I/O and open files of other users' processes need root"
+        return info.rstrip('\n')
+        
+    def get_cgroup_info(self):
+        """Get CPU, memory and I/O per systemd unit, container or pod"""
+        data = self.source.cgroups(k=30, max_age=1.0)
+        if not data['available']:
+            return "No cgroup v2 hierarchy here (needs a live Linux host with cgroup2 mounted)"
+        if not data['groups']:
+            return "No cgroups with counters (cgroup v2 has no controllers on this host)"
+        
+        info = (f"{'Unit':<28} {'Kind':<9} {'CPU':>6} {'Memory':>9} {'Read MB/s':>9} "
+                f"{'Write MB/s':>10} {'PSI':>5} {'Procs':>5}  Top process\n")
+        for g in data['groups']:
+            memory = f"{g['memory'] / 1024**2:.0f} MB" if g['memory'] is not None else "-"
+            pressure = f"{g['pressure']:.1f}" if g['pressure'] is not None else "-"
+            info += (f"{g['name'][:28]:<28} {g['kind']:<9} {g['cpu_percent']:5.1f}% {memory:>9} "
+                     f"{g['read_bytes_per_s'] / 1024**2:>9.2f} {g['write_bytes_per_s'] / 1024**2:>10.2f} "
+                     f"{pressure:>5} {g['procs']:>5}  {g['top'] or ''}\n")
         return info
         
+    def get_thermal_info(self):
+        """Get per-CPU clocks, thermal throttling and temperatures"""
+        lines = thermal_detail(self.source.thermal())
+        if not lines:
+            return "No cpufreq, thermal_throttle or temperature sensors on this host"
+        return "\n".join(lines).rstrip('\n')
+        
     def get_overview(self):
         """Get system overview"""
-        boot_time = datetime.fromtimestamp(psutil.boot_time())
-        uptime = datetime.now() - boot_time
+        data = self.source.overview()
+        boot_time = datetime.fromtimestamp(data['boot_time'])
+        uptime = timedelta(seconds=int(data['uptime']))
         
-        info = f"OS: {platform.system()} {platform.release()}\n"
-        info += f"Hostname: {platform.node()}\n"
-        info += f"Uptime: {str(uptime).split('.')[0]}\n"
+        info = f"OS: {data['system']} {data['release']}\n"
+        info += f"Hostname: {data['hostname']}\n"
+        info += f"Uptime: {uptime}\n"
         info += f"Boot Time: {boot_time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
         
-        info += f"CPU: {platform.processor()}\n"
-        info += f"Cores: {psutil.cpu_count(logical=False)} physical, {psutil.cpu_count(logical=True)} logical\n\n"
+        info += f"CPU: {data['processor']}\n"
+        info += f"Cores: {data['cores_physical']} physical, {data['cores_logical']} logical\n\n"
         
-        mem = psutil.virtual_memory()
-        info += f"Memory: {mem.used / (1024**3):.1f} / {mem.total / (1024**3):.1f} GB ({mem.percent:.1f}%)\n"
+        mem = data['memory']
+        info += f"Memory: {mem['used'] / (1024**3):.1f} / {mem['total'] / (1024**3):.1f} GB ({mem['percent']:.1f}%)\n"
+        for line in pressure_summary(data.get('pressure'), data.get('paging')):
+            info += line + "\n"
         
         return info
         
     def view_overview(self):
         """Display overview screen"""
-        self.stdscr.clear()
         self.draw_header()
         y = 2
-        y = self.draw_section(y, "System Overview", self.get_overview())
-        y = self.draw_section(y, "Quick Stats", self.get_cpu_info()[:200])
+        texts = self.sections({'overview': self.get_overview, 'cpu': self.get_cpu_info})
+        y = self.draw_section(y, "System Overview", texts['overview'])
+        y = self.draw_section(y, "Quick Stats", texts['cpu'][:200])
         self.draw_footer()
         
     def view_cpu(self):
         """Display CPU screen"""
-        self.stdscr.clear()
         self.draw_header()
         y = 2
-        y = self.draw_section(y, "CPU Information", self.get_cpu_info())
+        # Its own engine name: 'cpu' is the overview's text, this is the raw dict
+        cpu = self.engine.collect({'cpu_data': self.source.cpu})['cpu_data']
+        if cpu is None:
+            y = self.draw_section(y, "CPU Information", self.annotate('cpu_data', ""))
+            self.draw_footer()
+            return
+        y = self.draw_section(y, "CPU Information", self.annotate('cpu_data', self.get_cpu_info(cpu)))
+        if self.show_cpu_grid(cpu):
+            y = self.draw_heatmap(y, cpu)
         self.draw_footer()
         
     def view_memory(self):
         """Display memory screen"""
-        self.stdscr.clear()
         self.draw_header()
         y = 2
-        y = self.draw_section(y, "Memory Information", self.get_memory_info())
+        y = self.draw_section(y, "Memory Information", self.section('memory', self.get_memory_info))
         self.draw_footer()
         
     def view_disk(self):
         """Display disk screen"""
-        self.stdscr.clear()
         self.draw_header()
         y = 2
-        y = self.draw_section(y, "Disk Usage", self.get_disk_info())
+        y = self.draw_section(y, "Disk Usage", self.section('disk', self.get_disk_info))
+        self.draw_footer()
+        
+    def view_diskio(self):
+        """Display per-device disk I/O screen"""
+        self.draw_header()
+        y = 2
+        y = self.draw_section(y, "Disk I/O", self.section('diskio', self.get_diskio_info))
         self.draw_footer()
         
     def view_network(self):
         """Display network screen"""
-        self.stdscr.clear()
         self.draw_header()
         y = 2
-        y = self.draw_section(y, "Network Information", self.get_network_info())
+        y = self.draw_section(y, "Network Information", self.section('network', self.get_network_info))
         self.draw_footer()
         
     def view_process(self):
         """Display process screen"""
-        self.stdscr.clear()
         self.draw_header()
         y = 2
-        y = self.draw_section(y, "Process Information", self.get_process_info())
+        y = self.draw_section(y, "Process Information", self.section('process', self.get_process_info))
         self.draw_footer()
         
+    def view_cgroups(self):
+        """Display per-cgroup screen"""
+        self.draw_header()
+        y = 2
+        y = self.draw_section(y, "Cgroups (systemd units, containers, pods)", self.section('cgroups', self.get_cgroup_info))
+        self.draw_footer()
+        
+    def view_thermal(self):
+        """Display per-CPU frequency, throttling and temperature screen"""
+        self.draw_header()
+        y = 2
+        y = self.draw_section(y, "Frequency, Throttling and Temperatures", self.section('thermal', self.get_thermal_info))
+        self.draw_footer()
+        
+    def list_rows(self):
+        """Process list rows that fit between its headings and the footer"""
+        return max(curses.LINES - 7, 1)
+        
+    def view_proclist(self):
+        """Display every process, sortable and filterable, one screen at a time"""
+        self.draw_header()
+        plist = self.source.process_list(max_age=1.0)
+        if plist is None:
+            self.draw_section(2, "All Processes", "Not available in recordings")
+            self.draw_footer()
+            return
+        rows = self.list_rows()
+        count = len(plist)
+        self.list_offset = max(min(self.list_offset, count - rows), 0)
+        arrow = "▼" if plist.descending else "▲"
+        self.put(2, 2, f"▸ All Processes  {count} of {plist.total()}", curses.color_pair(1) | curses.A_BOLD)
+        if self.filtering or self.list_filter:
+            cursor = "█" if self.filtering else ""
+            self.put(2, 40, f"Filter: {self.list_filter}{cursor}", curses.color_pair(5) | curses.A_BOLD)
+        
+        x = 4
+        for column, heading, width in self.LIST_COLUMNS:
+            label = f"{heading}{arrow}" if column == plist.column else heading
+            attr = curses.color_pair(1) | curses.A_BOLD
+            if column == plist.column:
+                attr |= curses.A_REVERSE
+            self.put(4, x, label.rjust(width - 1) if width and column != 'user' else label, attr)
+            x += width
+        
+        now = time.time()
+        started = self.process_table.create_time
+        for i, e in enumerate(plist.window(self.list_offset, rows)):
+            io = (e.read_bytes_per_s + e.write_bytes_per_s) / 1024**2
+            line = (f"{e.pid:>7} {e.user[:9]:<9} {e.cpu_percent:>6.1f} {e.rss / 1024**2:>8.1f} "
+                    f"{io:>8.2f} {format_age(now - started(e)):>7} {e.cmdline}")
+            self.put(5 + i, 4, line, curses.color_pair(4))
+        
+        hint = " (↑/↓/PgUp/PgDn/Home/End)Scroll  (/)Filter  Sort: (p)PID (u)User (c)CPU (m)Memory (i)I/O (a)Age (n)Name, again to reverse"
+        if self.filtering:
+            hint = " Type to filter by name, command line or user  (Enter)Done  (Esc)Clear"
+        self.put(curses.LINES - 2, 0, hint, curses.color_pair(5))
+        self.draw_footer()
+        
+    def handle_list_key(self, key):
+        """Filter, sort and scroll keys of the process list; True if key was one"""
+        plist = getattr(self.source, 'process_index', None)
+        if plist is None:
+            return False
+        if self.filtering:
+            if key in (10, 13, curses.KEY_ENTER):
+                self.filtering = False
+            elif key == 27:
+                self.filtering = False
+                self.list_filter = ""
+            elif key in (curses.KEY_BACKSPACE, 127, 8):
+                self.list_filter = self.list_filter[:-1]
+            elif 32 <= key < 127:
+                self.list_filter += chr(key)
+            else:
+                return key not in (-1, curses.KEY_RESIZE)
+            plist.set_filter(self.list_filter)
+            self.list_offset = 0
+            return True
+        rows = self.list_rows()
+        moves = {curses.KEY_UP: -1, curses.KEY_DOWN: 1, curses.KEY_PPAGE: -rows, curses.KEY_NPAGE: rows}
+        if key == ord('/'):
+            self.filtering = True
+        elif key == 27 and self.list_filter:
+            self.list_filter = ""
+            plist.set_filter("")
+        elif key in self.LIST_SORT_KEYS:
+            plist.sort(self.LIST_SORT_KEYS[key])
+            self.list_offset = 0
+        elif key in moves:
+            self.list_offset = max(self.list_offset + moves[key], 0)  # Clamped when drawn
+        elif key == curses.KEY_HOME:
+            self.list_offset = 0
+        elif key == curses.KEY_END:
+            self.list_offset = len(plist)
+        else:
+            return False
+        return True
+        
+    def handle_key(self, key):
+        """React to a key press (or -1 when the refresh timeout expired)"""
+        if self.current_view == 'proclist' and self.handle_list_key(key):
+            return
+        if key in self.VIEWS:
+            self.current_view = self.VIEWS[key]
+        elif key == ord('o'):
+            self.show_overhead = not self.show_overhead
+        elif key == ord('g') and self.current_view == 'cpu':
+            self.cpu_grid = not self.show_cpu_grid(self.source.cpu())
+        elif key == curses.KEY_RESIZE:
+            self.resize()
+        
     def run(self):
-        """Main run loop"""
+        """Main run loop; redraws the current view every interval"""
+        self.stdscr.timeout(max(int(self.interval * 1000), 10))
         while True:
             try:
-                self.view_overview()
-                self.stdscr.refresh()
+                getattr(self, f"view_{self.current_view}")()
+                if self.show_overhead:
+                    self.draw_overhead()
+                self.present()
                 
                 key = self.stdscr.getch()
                 
-                if key == ord('q'):
+                if key == ord('q') and not self.filtering:
                     break
-                elif key == ord('1'):
-                    self.view_overview()
-                elif key == ord('2'):
-                    self.view_cpu()
-                elif key == ord('3'):
-                    self.view_memory()
-                elif key == ord('4'):
-                    self.view_disk()
-                elif key == ord('5'):
-                    self.view_network()
-                elif key == ord('6'):
-                    self.view_process()
+                self.handle_key(key)
                     
             except KeyboardInterrupt:
                 break
             except Exception as e:
-                self.stdscr.addstr(10, 10, f"Error: {str(e)[:50]}")
-                self.stdscr.refresh()
+                self.put(10, 10, f"Error: {str(e)[:50]}")
+                self.present()
                 self.stdscr.getch()
+        self.source.stop()
+
+
+class ReplayViewer(SysInfoViewer):
+    """SysInfoViewer driven by a recording instead of the live system"""
+    
+    SPEEDS = (1, 10, 60, 600)
+    
+    def __init__(self, stdscr, recording, interval=1.0):
+        from sysinfo_record import ReplaySource
+        super().__init__(stdscr, interval, ReplaySource(recording))
+        self.recording = recording
+        self.playing = True
+        self.speed = 1
+        self.play_time = recording.times[0]
+        
+    def seek(self, position):
+        """Jump to a record number"""
+        position = min(max(position, 0), len(self.recording) - 1)
+        self.source.position = position
+        self.play_time = self.recording.times[position]
+        
+    def handle_key(self, key):
+        """Playback keys on top of the normal view keys"""
+        position = self.source.position
+        if key == -1:
+            if self.playing:
+                self.play_time += self.interval * self.speed
+                self.source.position = self.recording.find(self.play_time)
+                if self.source.position == len(self.recording) - 1:
+                    self.playing = False
+        elif key == ord(' '):
+            self.playing = not self.playing
+        elif key == ord('f'):
+            self.speed = self.SPEEDS[(self.SPEEDS.index(self.speed) + 1) % len(self.SPEEDS)]
+        elif key == curses.KEY_RIGHT:
+            self.seek(position + 1)
+        elif key == curses.KEY_LEFT:
+            self.seek(position - 1)
+        elif key == curses.KEY_NPAGE:
+            self.seek(position + 60)
+        elif key == curses.KEY_PPAGE:
+            self.seek(position - 60)
+        elif key == curses.KEY_HOME:
+            self.seek(0)
+        elif key == curses.KEY_END:
+            self.seek(len(self.recording) - 1)
+        else:
+            super().handle_key(key)
+        
+    def draw_header(self):
+        """Header plus a playback status line"""
+        super().draw_header()
+        when = datetime.fromtimestamp(self.source.timestamp()).strftime('%Y-%m-%d %H:%M:%S')
+        state = "▶" if self.playing else "⏸"
+        status = (f" REPLAY {when}  [{self.source.position + 1}/{len(self.recording)}]  "
+                  f"{state} x{self.speed}   (space)Play/Pause (f)Speed (←/→)Step (PgUp/PgDn)±60 (Home/End)")
+        self.put(1, 0, status, curses.color_pair(5) | curses.A_BOLD)
+
+
+class FleetViewer(SysInfoViewer):
+    """SysInfoViewer over many agents: a fleet table, then drill-down into a host"""
+    
+    VIEWS = {**SysInfoViewer.VIEWS, ord('0'): 'fleet'}
+    
+    def __init__(self, stdscr, fleet, interval=1.0):
+        self.fleet = fleet
+        self.selected = 0
+        super().__init__(stdscr, interval, fleet.hosts[0].source)
+        self.current_view = 'fleet'
+        
+    def select(self, index):
+        """Point the ordinary views at one host"""
+        self.selected = min(max(index, 0), len(self.fleet.hosts) - 1)
+        self.source = self.fleet.hosts[self.selected].source
+        self.collector = self.source.collector
+        self.process_table = self.source.process_table
+        self.instrument_source()
+        
+    def handle_key(self, key):
+        """Host selection keys on top of the normal view keys"""
+        host = self.fleet.hosts[self.selected]
+        if self.current_view == 'fleet' and key == curses.KEY_DOWN:
+            self.select(self.selected + 1)
+        elif self.current_view == 'fleet' and key == curses.KEY_UP:
+            self.select(self.selected - 1)
+        elif self.current_view == 'fleet' and key in (curses.KEY_ENTER, 10, 13):
+            if len(host.feed):
+                self.current_view = 'overview'
+        elif key in (27, curses.KEY_BACKSPACE):
+            self.current_view = 'fleet'
+        elif key in self.VIEWS and self.VIEWS[key] != 'fleet' and not len(host.feed):
+            pass  # No data from this host yet; stay on the fleet table
+        else:
+            super().handle_key(key)
+        
+    def draw_header(self):
+        """Header plus the host being viewed"""
+        super().draw_header()
+        if self.current_view != 'fleet':
+            host = self.fleet.hosts[self.selected]
+            state = host.state if host.state == 'up' else f"{host.state}: {host.error}, showing last data"
+            status = f" HOST {host.feed.static['hostname']} ({host.label}, {state})   (0/Esc)Fleet"
+            self.put(1, 0, status, curses.color_pair(5 if host.state == 'up' else 3) | curses.A_BOLD)
+        
+    def draw_footer(self):
+        """Fleet keys on the fleet table, the normal footer elsewhere"""
+        if self.current_view == 'fleet':
+            footer = "🔱 (↑/↓)Select  (Enter)Open host  (1-9)Views of selected host  (o)Overhead  (q)Quit"
+            self.put(curses.LINES - 1, 0, footer, curses.color_pair(5))
+        else:
+            super().draw_footer()
+        
+    def view_fleet(self):
+        """Display one row per host"""
+        self.draw_header()
+        hosts = self.fleet.hosts
+        up = sum(host.state == 'up' for host in hosts)
+        self.put(2, 2, f"▸ Fleet: {up}/{len(hosts)} hosts up", curses.color_pair(1) | curses.A_BOLD)
+        self.put(3, 4, f"{'Host':<24} {'State':<10} {'CPU':>6} {'Cores':>5} {'Mem':>6} {'Swap':>6} "
+                       f"{'Net in/out KB/s':>17} {'Disk r/w MB/s':>15} {'Uptime':>10} {'Age':>5}",
+                 curses.color_pair(4) | curses.A_BOLD)
+        rows = curses.LINES - 6
+        first = max(self.selected - rows + 1, 0)
+        for y, i in enumerate(range(first, min(first + rows, len(hosts))), 4):
+            host = hosts[i]
+            data = host.summary()
+            name = data['hostname'] if data else host.label
+            if data is None:
+                line = f"{name[:24]:<24} {host.state:<10} {host.error}"
+            else:
+                net = f"{data['net_recv'] / 1024:.1f}/{data['net_sent'] / 1024:.1f}"
+                disk = f"{data['disk_read'] / 1024**2:.1f}/{data['disk_write'] / 1024**2:.1f}"
+                uptime = str(timedelta(seconds=int(data['uptime'])))
+                line = (f"{name[:24]:<24} {host.state:<10} {data['cpu']:5.1f}% {data['cores']:>5} "
+                        f"{data['memory']:5.1f}% {data['swap']:5.1f}% {net:>17} {disk:>15} "
+                        f"{uptime:>10} {data['age']:4.0f}s")
+            if host.state != 'up':
+                attr = curses.color_pair(3)
+            elif data and max(data['cpu'], data['memory']) >= 90:
+                attr = curses.color_pair(5)
+            else:
+                attr = curses.color_pair(2)
+            if i == self.selected:
+                attr |= curses.A_REVERSE
+            self.put(y, 4, line, attr)
+        self.draw_footer()
+
+
+def print_report(sections, delay=0.25):
+    """Print the selected views once as plain text (sysinfo --once)"""
+    titles = {
+        'overview': "System Overview",
+        'cpu': "CPU Information",
+        'memory': "Memory Information",
+        'disk': "Disk Usage",
+        'diskio': "Disk I/O",
+        'network': "Network Information",
+        'process': "Process Information",
+        'cgroups': "Cgroups",
+        'thermal': "Frequency, Throttling and Temperatures",
+    }
+    viewer = SysInfoViewer(None)
+    if 'process' in sections and delay > 0:
+        viewer.process_table.refresh(detail=True)  # Baseline for the I/O and switch rates
+    if 'thermal' in sections and delay > 0:
+        viewer.source.thermal()  # Baseline for the throttle rates
+    viewer.source.resample(delay)
+    getters = {}
+    for name in sections:
+        if name == 'overview':
+            getters[name] = viewer.get_overview
+        elif name == 'cgroups':
+            getters[name] = viewer.get_cgroup_info
+        else:
+            getters[name] = getattr(viewer, f"get_{name}_info")
+    texts = viewer.sections(getters)
+    for name in sections:
+        print(f"▸ {titles[name]}")
+        for line in texts[name].rstrip('\n').split('\n'):
+            print(f"  {line}")
+        print()
 
 
 def main():
+    global curses
+    parser = argparse.ArgumentParser(description="Interactive Linux system information viewer")
+    parser.add_argument('-i', '--interval', type=float, default=1.0,
+                        help="refresh interval in seconds (default: 1.0)")
+    parser.add_argument('--once', action='store_true',
+                        help="print a single report and exit")
+    parser.add_argument('--json', action='store_true',
+                        help="with --once, print the report as JSON")
+    parser.add_argument('--sample-time', type=float, default=0.25, metavar='SECONDS',
+                        help="with --once, window over which CPU%% and rates are measured "
+                             "(default: 0.25; 0 reports CPU%% since boot and no rates, but "
+                             "returns in tens of milliseconds)")
+    parser.add_argument('--stream', action='store_true',
+                        help="write one JSON snapshot per interval to stdout (NDJSON)")
+    parser.add_argument('--count', type=int,
+                        help="with --stream/--record, stop after this many snapshots")
+    parser.add_argument('--serve', type=int, metavar='PORT',
+                        help="serve Prometheus metrics (/metrics) and JSON (/json) over HTTP")
+    parser.add_argument('--bind', default='127.0.0.1',
+                        help="with --serve/--agent, address to listen on (default: 127.0.0.1)")
+    parser.add_argument('--ttl', type=float, default=1.0,
+                        help="with --serve, seconds a snapshot is shared between requests (default: 1.0)")
+    parser.add_argument('--record', metavar='FILE',
+                        help="append a binary snapshot to FILE every interval")
+    parser.add_argument('--replay', metavar='FILE',
+                        help="browse a recording made with --record")
+    parser.add_argument('--agent', type=int, metavar='PORT',
+                        help="stream binary snapshots over TCP for a --fleet viewer")
+    parser.add_argument('--fleet', nargs='+', metavar='HOST:PORT',
+                        help="watch the agents at these addresses")
+    parser.add_argument('--timeout', type=float, default=5.0,
+                        help="with --fleet, seconds before a silent agent is marked down (default: 5.0)")
+    parser.add_argument('--alerts', metavar='FILE',
+                        help="alert rules to evaluate on every sample "
+                             "(default: ~/.config/sysinfo/alerts.conf if it exists)")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="profile this session into FILE: cProfile stats for .prof/.pstats, "
+                             "otherwise folded stacks of every thread (for flamegraph.pl/speedscope)")
+    parser.add_argument('--budget', type=float, default=5.0, metavar='PERCENT',
+                        help="keep sysinfo's own CPU use under PERCENT of one core by "
+                             "collecting less often when needed (default: 5)")
+    parser.add_argument('--sections', default=','.join(DataSource.SECTIONS),
+                        help="comma-separated sections for --once/--stream "
+                             f"(default: {','.join(DataSource.SECTIONS)})")
+    args = parser.parse_args()
+    
+    sections = [s for s in args.sections.split(',') if s]
+    unknown = set(sections) - set(DataSource.SECTIONS)
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(sorted(unknown))}")
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    if args.sample_time < 0:
+        parser.error("--sample-time can't be negative")
+    if args.budget <= 0:
+        parser.error("--budget must be positive")
+    if args.profile:
+        from sysinfo_profile import start_profile
+        start_profile(args.profile)
+    raise_open_file_limit()  # The thermal section keeps two sysfs files open per CPU
+    
+    if args.serve is not None:
+        from sysinfo_serve import run_server
+        return run_server(args.serve, args.bind, args.ttl)
+    if args.agent is not None:
+        from sysinfo_fleet import run_agent
+        return run_agent(args.agent, args.bind, args.interval)
+    if args.record:
+        from sysinfo_record import run_record
+        return run_record(args.record, args.interval, args.count)
+    if args.stream:
+        from sysinfo_stream import run_stream
+        return run_stream(args.interval, sections, args.count)
+    if args.once:
+        if args.json:
+            from sysinfo_stream import run_once
+            return run_once(sections, args.sample_time)
+        return print_report(sections, args.sample_time)
+    
+    import curses
+    if args.replay:
+        from sysinfo_record import Recording
+        try:
+            recording = Recording(args.replay)
+        except (OSError, ValueError, struct.error) as e:
+            parser.error(f"cannot open recording {args.replay}: {e}")
+        if not len(recording):
+            parser.error(f"{args.replay} contains no records")
+        make_viewer = lambda stdscr: ReplayViewer(stdscr, recording, args.interval)
+    elif args.fleet:
+        from sysinfo_fleet import Fleet, parse_address
+        try:
+            fleet = Fleet([parse_address(a) for a in args.fleet], args.timeout)
+        except ValueError as e:
+            parser.error(str(e))
+        fleet.start()
+        make_viewer = lambda stdscr: FleetViewer(stdscr, fleet, args.interval)
+    else:
+        from sysinfo_alerts import load_alerts
+        try:
+            alerts = load_alerts(args.alerts)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot load alert rules: {e}")
+        make_viewer = lambda stdscr: SysInfoViewer(stdscr, args.interval, alerts=alerts,
+                                                   budget=args.budget / 100)
     try:
-        curses.wrapper(lambda stdscr: SysInfoViewer(stdscr).run())
+        curses.wrapper(lambda stdscr: make_viewer(stdscr).run())
     except Exception as e:
         print(f"Error: {e}")
         print("Make sure you have psutil installed: pip install psutil")
@@ -0,0 +1,411 @@
+"""
+sysinfo alerts - Threshold rules evaluated on every collector sample
+Used by: sysinfo (TUI), sysinfo-gui, via --alerts FILE or the default
+config file $XDG_CONFIG_HOME/sysinfo/alerts.conf
+
+One rule per line:
+
+    # METRIC OP VALUE [for DURATION] [clear VALUE]
+    cpu > 90 for 30s clear 70
+    core > 95% for 10s           # One alert per CPU
+    avg(memory, 1m) > 90         # avg/min/max over a window
+    swap.used rising 64M for 5m  # Grew by more than 64 MiB over 5 minutes
+    mount > 90%                  # One alert per mounted filesystem
+    mount:/var >= 80
+    hook = notify-send "sysinfo: $SYSINFO_STATE $SYSINFO_ALERT"
+
+Rules are compiled once. Each sample feeds every rule one value per
+instance, and every windowed aggregate is updated in O(1) (amortized), so
+the cost per sample grows with the number of rules, not with their windows.
+An alert is pending while its condition holds, firing once it has held for
+DURATION, and resolved only when the value crosses the clear threshold
+(by default 5% back from the trigger), so a value hovering at the
+threshold doesn't flap. The hook runs on every firing/resolved transition.
+"""
+
+import operator
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+
+HYSTERESIS = 0.05    # default clear threshold, relative to the trigger
+MOUNT_INTERVAL = 10  # seconds between filesystem usage checks
+DEFAULT_WINDOW = 60  # seconds, for rising/falling without "for"
+
+OPERATORS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+UNITS = {'': 1, 'k': 1024, 'm': 1024**2, 'g': 1024**3, 't': 1024**4}
+
+# name -> (extractor over collector.latest, unit)
+METRICS = {
+    'cpu': (lambda latest: latest['cpu'][0], '%'),
+    'memory': (lambda latest: latest['memory'].percent, '%'),
+    'memory.available': (lambda latest: latest['memory'].available, 'B'),
+    'swap': (lambda latest: latest['swap'].percent, '%'),
+    'swap.used': (lambda latest: latest['swap'].used, 'B'),
+    'disk.read': (lambda latest: latest['rates']['disk_read'], 'B/s'),
+    'disk.write': (lambda latest: latest['rates']['disk_write'], 'B/s'),
+    'net.sent': (lambda latest: latest['rates']['net_sent'], 'B/s'),
+    'net.recv': (lambda latest: latest['rates']['net_recv'], 'B/s'),
+    'load': (lambda latest: os.getloadavg()[0], ''),
+}
+PER_INSTANCE = {'core': '%', 'mount': '%'}  # one alert per CPU / mountpoint
+
+_RULE = re.compile(
+    r'^(?:(?P<agg>avg|min|max)\(\s*(?P<agg_metric>[\w.:/-]+)\s*,\s*(?P<window>[\d.]+[sm]?)\s*\)'
+    r'|(?P<metric>[\w.:/-]+))'
+    r'\s+(?P<op>>=|<=|>|<|rising|falling)'
+    r'(?:\s+(?P<value>-?[\d.]+[%kmgt]?b?))?'
+    r'(?:\s+for\s+(?P<duration>[\d.]+[sm]?))?'
+    r'(?:\s+clear\s+(?P<clear>-?[\d.]+[%kmgt]?b?))?$', re.IGNORECASE)
+
+
+def parse_value(text):
+    """'90', '90%', '64M', '1.5GB' -> float"""
+    match = re.fullmatch(r'(-?[\d.]+)%?([kmgt]?)b?', text.lower())
+    if match is None:
+        raise ValueError(f"bad value {text!r}")
+    return float(match.group(1)) * UNITS[match.group(2)]
+
+
+def parse_duration(text):
+    """'10', '10s', '5m' -> seconds"""
+    text = text.lower()
+    if text.endswith('m'):
+        return float(text[:-1]) * 60
+    return float(text.rstrip('s'))
+
+
+def format_value(value, unit):
+    if unit == '%':
+        return f"{value:.1f}%"
+    if unit.startswith('B'):
+        for suffix in ('', 'K', 'M', 'G'):
+            if abs(value) < 1024:
+                break
+            value /= 1024
+        return f"{value:.1f} {suffix}{unit}"
+    return f"{value:.2f}"
+
+
+class Latest:
+    """The current value, no window"""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = None
+
+    def add(self, now, value):
+        self.value = value
+        return value
+
+
+class Average:
+    """Mean over the last `span` seconds, kept as a running sum"""
+
+    __slots__ = ('span', 'points', 'total')
+
+    def __init__(self, span):
+        self.span = span
+        self.points = deque()
+        self.total = 0.0
+
+    def add(self, now, value):
+        points = self.points
+        points.append((now, value))
+        self.total += value
+        while points[0][0] < now - self.span:
+            self.total -= points.popleft()[1]
+        return self.total / len(points)
+
+
+class Extreme:
+    """Min or max over the last `span` seconds, using a monotonic deque"""
+
+    __slots__ = ('span', 'points', 'better')
+
+    def __init__(self, span, largest=True):
+        self.span = span
+        self.points = deque()
+        self.better = operator.ge if largest else operator.le
+
+    def add(self, now, value):
+        points = self.points
+        while points and self.better(value, points[-1][1]):
+            points.pop()
+        points.append((now, value))
+        while points[0][0] < now - self.span:
+            points.popleft()
+        return points[0][1]
+
+
+class Change:
+    """Least-squares change across the last `span` seconds, from running sums
+
+    None until the window is (almost) full, so a fresh start can't fire a
+    rising/falling rule from two points.
+    """
+
+    __slots__ = ('span', 'points', 'origin', 'n', 'st', 'sv', 'stt', 'stv')
+
+    def __init__(self, span):
+        self.span = span
+        self.points = deque()
+        self.origin = None
+        self.n = 0
+        self.st = self.sv = self.stt = self.stv = 0.0
+
+    def _move(self, t, v, sign):
+        self.n += sign
+        self.st += sign * t
+        self.sv += sign * v
+        self.stt += sign * t * t
+        self.stv += sign * t * v
+
+    def add(self, now, value):
+        if self.origin is None:
+            self.origin = now
+        t = now - self.origin  # Small numbers keep the sums precise
+        self.points.append((t, value))
+        self._move(t, value, 1)
+        while self.points[0][0] < t - self.span:
+            self._move(*self.points.popleft(), -1)
+        if self.n < 2 or t - self.points[0][0] < self.span * 0.9:
+            return None
+        denominator = self.n * self.stt - self.st * self.st
+        if denominator <= 0:
+            return None
+        slope = (self.n * self.stv - self.st * self.sv) / denominator
+        return slope * self.span
+
+
+class Alert:
+    """State of one rule for one instance (a CPU, a mountpoint, or the host)"""
+
+    __slots__ = ('rule', 'instance', 'aggregate', 'state', 'since', 'value')
+
+    def __init__(self, rule, instance):
+        self.rule = rule
+        self.instance = instance
+        self.aggregate = rule.make_aggregate()
+        self.state = 'ok'
+        self.since = None
+        self.value = None
+
+    def update(self, now, value):
+        """Feed one sample; returns 'firing'/'resolved' on a transition"""
+        value = self.aggregate.add(now, value)
+        if value is None:
+            return None
+        self.value = value
+        rule = self.rule
+        if self.state == 'firing':
+            if not rule.op(value, rule.clear):
+                self.state = 'ok'
+                self.since = None
+                return 'resolved'
+        elif rule.op(value, rule.threshold):
+            if self.state == 'ok':
+                self.state = 'pending'
+                self.since = now
+            if now - self.since >= rule.duration:
+                self.state = 'firing'
+                self.since = now
+                return 'firing'
+        else:
+            self.state = 'ok'
+            self.since = None
+        return None
+
+    def describe(self):
+        rule = self.rule
+        where = f" [{self.instance}]" if self.instance else ""
+        return f"{rule.text}{where}: {format_value(self.value, rule.unit)}"
+
+
+class Rule:
+    """One compiled line of the config file"""
+
+    def __init__(self, text):
+        match = _RULE.match(text)
+        if match is None:
+            raise ValueError(f"can't parse rule {text!r}")
+        self.text = text
+        metric = match['agg_metric'] or match['metric']
+        self.metric, _, self.selector = metric.partition(':')
+        if self.metric in PER_INSTANCE:
+            self.unit = PER_INSTANCE[self.metric]
+        elif self.metric in METRICS and not self.selector:
+            self.unit = METRICS[self.metric][1]
+        else:
+            raise ValueError(f"unknown metric {metric!r}")
+        self.aggregate = match['agg']
+        self.window = parse_duration(match['window']) if match['window'] else None
+        duration = parse_duration(match['duration']) if match['duration'] else 0.0
+        op = match['op'].lower()
+        threshold = parse_value(match['value']) if match['value'] else None
+
+        if op in ('rising', 'falling'):
+            if self.aggregate:
+                raise ValueError(f"{op} takes a plain metric: {text!r}")
+            # The "for" duration is the window the change is measured over
+            self.window = duration or DEFAULT_WINDOW
+            self.duration = 0.0
+            threshold = threshold or 0.0
+            self.op = operator.gt if op == 'rising' else operator.lt
+            if op == 'falling':
+                threshold = -threshold
+        else:
+            if threshold is None:
+                raise ValueError(f"missing threshold: {text!r}")
+            self.duration = duration
+            self.op = OPERATORS[op]
+        self.kind = op
+        self.threshold = threshold
+        if match['clear']:
+            self.clear = parse_value(match['clear'])
+            if op == 'falling':
+                self.clear = -self.clear
+        else:
+            margin = abs(threshold) * HYSTERESIS
+            self.clear = threshold - margin if self.op in (operator.gt, operator.ge) else threshold + margin
+        self.alerts = {}  # instance -> Alert
+
+    def make_aggregate(self):
+        if self.kind in ('rising', 'falling'):
+            return Change(self.window)
+        if self.aggregate == 'avg':
+            return Average(self.window)
+        if self.aggregate in ('min', 'max'):
+            return Extreme(self.window, largest=self.aggregate == 'max')
+        return Latest()
+
+    def feed(self, now, instance, value):
+        alert = self.alerts.get(instance)
+        if alert is None:
+            alert = self.alerts[instance] = Alert(self, instance)
+        return alert, alert.update(now, value)
+
+
+class AlertEngine:
+    """Compiled rules plus the state of every alert they raised"""
+
+    def __init__(self, rules, hook=None):
+        self.rules = rules
+        self.hook = hook
+        self.disks = None
+        self.lock = threading.Lock()
+        self.by_metric = {}
+        for rule in rules:
+            self.by_metric.setdefault(rule.metric, []).append(rule)
+        self._mounts = []
+        self._mounts_at = None
+        self._mounts_thread = None
+        self._hooks = []
+
+    @classmethod
+    def from_file(cls, path):
+        """Parse a config file; errors name the offending line"""
+        rules = []
+        hook = None
+        with open(path) as f:
+            for lineno, line in enumerate(f, 1):
+                key, sep, value = line.partition('=')
+                if sep and key.strip() == 'hook':
+                    hook = value.strip()  # Passed to the shell as is, '#' included
+                    continue
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                try:
+                    rules.append(Rule(' '.join(line.split())))
+                except ValueError as e:
+                    raise ValueError(f"{path}:{lineno}: {e}") from None
+        return cls(rules, hook)
+
+    def attach(self, source):
+        """Evaluate on every sample of a live DataSource"""
+        self.disks = source.disks
+        source.collector.observers.append(self.observe)
+
+    def _instances(self, metric, collector, now):
+        if metric == 'core':
+            ids = collector.cpu_sampler.ids
+            return [(f"cpu{cpu}", str(cpu), percent)
+                    for cpu, percent in zip(ids, collector.latest['cpu'][1])]
+        if metric == 'mount':
+            # statvfs can stall for up to DiskCollector's deadline; the list is
+            # refreshed on a thread of its own and rules see the last one
+            if self.disks is not None and (self._mounts_at is None
+                                           or now - self._mounts_at >= MOUNT_INTERVAL):
+                if self._mounts_thread is None or not self._mounts_thread.is_alive():
+                    self._mounts_at = now
+                    self._mounts_thread = threading.Thread(
+                        target=self._refresh_mounts, name='sysinfo-alert-mounts', daemon=True)
+                    self._mounts_thread.start()
+            return self._mounts
+        return [('', '', METRICS[metric][0](collector.latest))]
+
+    def _refresh_mounts(self):
+        try:
+            partitions = self.disks.partitions()
+        except OSError:
+            return  # Keep the last list; try again next interval
+        self._mounts = [(part['mountpoint'], part['mountpoint'], part['percent'])
+                        for part in partitions if not part['stale']]
+
+    def observe(self, collector, now):
+        """Feed one collector sample to every rule"""
+        changes = []
+        with self.lock:
+            for metric, rules in self.by_metric.items():
+                instances = self._instances(metric, collector, now)
+                for rule in rules:
+                    selector = rule.selector
+                    for label, key, value in instances:
+                        if selector and key != selector:
+                            continue
+                        alert, change = rule.feed(now, label, value)
+                        if change:
+                            changes.append((alert, change))
+        if self.hook and (changes or self._hooks):
+            self._run_hooks(changes)
+
+    def _run_hooks(self, changes):
+        self._hooks = [p for p in self._hooks if p.poll() is None]  # Reap finished ones
+        for alert, change in changes:
+            env = dict(os.environ, SYSINFO_ALERT=alert.rule.text, SYSINFO_INSTANCE=alert.instance,
+                       SYSINFO_STATE=change, SYSINFO_VALUE=f"{alert.value:g}",
+                       SYSINFO_TIME=str(int(time.time())))
+            try:
+                # Output would scribble over the TUI; hooks log on their own
+                self._hooks.append(subprocess.Popen(
+                    self.hook, shell=True, env=env, stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+            except OSError:
+                pass  # A broken hook mustn't stop sampling
+
+    def active(self):
+        """Firing alerts (oldest first), then pending ones"""
+        with self.lock:
+            alerts = [alert for rule in self.rules for alert in rule.alerts.values()
+                      if alert.state != 'ok']
+        alerts.sort(key=lambda alert: (alert.state != 'firing', alert.since))
+        return alerts
+
+
+def default_path():
+    base = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+    return os.path.join(base, 'sysinfo', 'alerts.conf')
+
+
+def load_alerts(path=None):
+    """Engine for path, or for the default config file if there is one; else None"""
+    if path is None:
+        path = default_path()
+        if not os.path.exists(path):
+            return None
+    return AlertEngine.from_file(path)
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+sysinfo bench - Timing harness for the collectors and render paths
+Run: python3 sysinfo_bench.py [--procs 100000] [--save baseline.json] [--compare baseline.json]
+
+Everything runs against a generated /proc and sysfs tree (512 CPUs, 1,000
+interfaces and 10k processes by default), so results are comparable
+between machines and don't depend on what the host is doing. Each
+benchmark reports p50/p90/p99/max over --repeat runs. --save writes them
+as JSON; --compare checks them against a saved baseline and exits with
+status 1 if any p50 got slower than --tolerance allows.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import types
+from collections import namedtuple
+
+import psutil
+
+import sysinfo
+import sysinfo_gui
+from sysinfo_core import (CpuTopology, DataSource, HistoryCollector, ProcessTable, ThermalMonitor,
+                          raise_open_file_limit)
+
+BASELINE_VERSION = 1
+NOISE_FLOOR_MS = 0.05   # Differences below this are never reported as regressions
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def _copy_or(path, real, default):
+    try:
+        with open(real) as f:
+            _write(path, f.read())
+    except OSError:
+        _write(path, default)
+
+
+class Fixture:
+    """A synthetic /proc and sysfs tree
+
+    Counters in stat and net/dev advance by a fixed step on every
+    advance() call, so CPU% and rates take their normal code paths.
+    """
+
+    def __init__(self, root, cpus=512, procs=10000, interfaces=1000, sockets=2, nodes=4):
+        self.root = root
+        self.proc = os.path.join(root, 'proc')
+        self.sysfs = os.path.join(root, 'sys', 'devices', 'system')
+        self.cpus = cpus
+        self.procs = procs
+        self.interfaces = interfaces
+        self.sockets = sockets
+        self.nodes = nodes
+        self.tick = 0
+
+    def create(self):
+        self._write_static()
+        self._write_topology()
+        self._write_processes()
+        self.advance()
+        return self
+
+    def _write_static(self):
+        proc = self.proc
+        meminfo = {
+            'MemTotal': 1056478208, 'MemFree': 301234176, 'MemAvailable': 702312448,
+            'Buffers': 4194304, 'Cached': 380108800, 'SwapCached': 0, 'Active': 412316860,
+            'Inactive': 190840832, 'Shmem': 2097152, 'SReclaimable': 20971520,
+            'SwapTotal': 8388608, 'SwapFree': 8126464,
+        }
+        _write(f"{proc}/meminfo", ''.join(f"{k + ':':<16}{v:>12} kB\n" for k, v in meminfo.items()))
+        _write(f"{proc}/cpuinfo", ''.join(f"processor\t: {cpu}\ncpu MHz\t\t: 2400.000\n\n"
+                                         for cpu in range(self.cpus)))
+        _write(f"{proc}/uptime", "86400.00 2000000.00\n")
+        _write(f"{proc}/loadavg", "1.00 1.00 1.00 2/600 12345\n")
+        _write(f"{proc}/self/stat", "1 (python3) R 0 1 1 0 -1 0 0 0 0 0 0 0 0 0 20 0 1 0 100 0 0\n")
+        _copy_or(f"{proc}/self/mounts", '/proc/self/mounts', "/dev/root / ext4 rw 0 0\n")
+        _copy_or(f"{proc}/filesystems", '/proc/filesystems', "\text4\n")
+        _copy_or(f"{proc}/diskstats", '/proc/diskstats', "")
+
+    def _write_topology(self):
+        per_socket = max(self.cpus // self.sockets, 1)
+        per_node = max(self.cpus // self.nodes, 1)
+        cores = max(per_socket // 2, 1)
+        for cpu in range(self.cpus):
+            topology = f"{self.sysfs}/cpu/cpu{cpu}/topology"
+            # Hyperthread siblings are numbered one half of the socket apart,
+            # as on most x86 machines
+            _write(f"{topology}/physical_package_id", f"{min(cpu // per_socket, self.sockets - 1)}\n")
+            _write(f"{topology}/core_id", f"{cpu % per_socket % cores}\n")
+            _write(f"{self.sysfs}/cpu/cpu{cpu}/cpufreq/scaling_cur_freq", f"{2400000 - cpu % 9 * 100000}\n")
+            _write(f"{self.sysfs}/cpu/cpu{cpu}/cpufreq/cpuinfo_max_freq", "3600000\n")
+            throttle = f"{self.sysfs}/cpu/cpu{cpu}/thermal_throttle"
+            _write(f"{throttle}/core_throttle_count", f"{cpu % 11}\n")
+            _write(f"{throttle}/package_throttle_count", "42\n")
+            _write(f"{throttle}/package_throttle_total_time_ms", "1500\n")
+        hwmon = os.path.join(self.root, 'sys', 'class', 'hwmon')
+        for socket in range(self.sockets):
+            _write(f"{hwmon}/hwmon{socket}/name", "coretemp\n")
+            _write(f"{hwmon}/hwmon{socket}/temp1_label", f"Package id {socket}\n")
+            _write(f"{hwmon}/hwmon{socket}/temp1_input", "61000\n")
+            _write(f"{hwmon}/hwmon{socket}/temp1_crit", "100000\n")
+            for core in range(cores):
+                _write(f"{hwmon}/hwmon{socket}/temp{core + 2}_label", f"Core {core}\n")
+                _write(f"{hwmon}/hwmon{socket}/temp{core + 2}_input", f"{50000 + core * 100}\n")
+        for node in range(self.nodes):
+            first = node * per_node
+            _write(f"{self.sysfs}/node/node{node}/cpulist", f"{first}-{first + per_node - 1}\n")
+
+    def _write_processes(self):
+        for pid in range(1, self.procs + 1):
+            fields = ['S', '1', str(pid), str(pid), '0', '-1', '4194560'] + ['0'] * 4 + \
+                [str(pid % 997), str(pid % 389), '0', '0', '20', '0', '1', '0', str(100 + pid),
+                 str(4096 * pid), str(pid % 5000 + 100)] + ['0'] * 28
+            _write(f"{self.proc}/{pid}/stat", f"{pid} (worker-{pid % 1000}) {' '.join(fields)}\n")
+            _write(f"{self.proc}/{pid}/status", f"Name:\tworker-{pid % 1000}\nPid:\t{pid}\n"
+                   f"voluntary_ctxt_switches:\t{pid % 500}\nnonvoluntary_ctxt_switches:\t{pid % 7}\n")
+            _write(f"{self.proc}/{pid}/io", f"rchar: {pid * 10}\nwchar: {pid}\nsyscr: {pid % 300}\n"
+                   f"syscw: {pid % 200}\nread_bytes: {pid * 4096}\nwrite_bytes: {pid * 512}\n"
+                   f"cancelled_write_bytes: 0\n")
+            _write(f"{self.proc}/{pid}/cmdline", f"/usr/bin/worker\0--id\0{pid}\0")
+            os.makedirs(f"{self.proc}/{pid}/fd/{pid % 16}", exist_ok=True)
+
+    def advance(self):
+        """Move every counter forward by one tick"""
+        self.tick += 1
+        t = self.tick
+        lines = []
+        rows = [(100 * t + cpu % 7 * t, 2 * t, 30 * t, 800 * t, 5 * t, 0, 3 * t, 0, 0, 0)
+                for cpu in range(self.cpus)]
+        total = [sum(col) for col in zip(*rows)]
+        lines.append("cpu  " + ' '.join(map(str, total)))
+        lines += [f"cpu{cpu} " + ' '.join(map(str, row)) for cpu, row in enumerate(rows)]
+        lines += ["intr 0", f"ctxt {1000 * t}", "btime 1700000000",
+                  f"processes {self.procs}", "procs_running 2", "procs_blocked 0"]
+        _write(f"{self.proc}/stat", '\n'.join(lines) + '\n')
+        dev = ["Inter-|   Receive                                                |  Transmit",
+               " face |bytes    packets errs drop fifo frame compressed multicast|"
+               "bytes    packets errs drop fifo colls carrier compressed"]
+        for i in range(self.interfaces):
+            rx, tx = (i + 1) * 1500 * t, (i + 1) * 900 * t
+            dev.append(f"{'eth' + str(i):>6}: {rx} {rx // 1500} 0 0 0 0 0 0 {tx} {tx // 1500} 0 0 0 0 0 0")
+        _write(f"{self.proc}/net/dev", '\n'.join(dev) + '\n')
+
+
+def percentiles(samples):
+    """{'n', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms'} from durations in seconds"""
+    ordered = sorted(samples)
+    n = len(ordered)
+
+    def rank(p):
+        return round(ordered[min(max(int(p * n + 0.5) - 1, 0), n - 1)] * 1000, 4)
+
+    return {'n': n, 'p50_ms': rank(0.50), 'p90_ms': rank(0.90), 'p99_ms': rank(0.99),
+            'max_ms': round(ordered[-1] * 1000, 4)}
+
+
+def measure(fn, repeat, warmup=3, prepare=None):
+    for _ in range(warmup):
+        if prepare:
+            prepare()
+        fn()
+    samples = []
+    for _ in range(repeat):
+        if prepare:
+            prepare()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+class _NullScreen:
+    """Accepts curses drawing calls and does nothing, to time our side only"""
+
+    def move(self, y, x):
+        pass
+
+    def clrtoeol(self):
+        pass
+
+    def addstr(self, *args):
+        pass
+
+    def refresh(self):
+        pass
+
+
+DiskPartition = namedtuple('DiskPartition', 'device mountpoint fstype opts')
+DiskUsage = namedtuple('DiskUsage', 'total used free percent')
+DiskIO = namedtuple('DiskIO', 'read_count write_count read_bytes write_bytes busy_time')
+
+
+class FixtureDisks:
+    """Stand-ins for psutil's disk functions, serving fixed devices and filesystems
+
+    The real ones read the host's mount table, statvfs and /sys/block, so
+    the disk benchmarks would depend on the machine. Counters advance with
+    the fixture's tick like its /proc/stat and net/dev.
+    """
+
+    NAMES = ('disk_partitions', 'disk_usage', 'disk_io_counters')
+
+    def __init__(self, fixture, devices=16, filesystems=8):
+        self.fixture = fixture
+        self.devices = [f"nvme{i}n1" for i in range(devices)]
+        self.partitions = [DiskPartition(f"/dev/{self.devices[i % devices]}p{i + 1}",
+                                         "/" if i == 0 else f"/srv/data{i}", 'ext4', 'rw')
+                           for i in range(filesystems)]
+        self.saved = None
+
+    def disk_partitions(self, all=False):
+        return list(self.partitions)
+
+    def disk_usage(self, path):
+        total = 500 * 1024**3
+        used = total // 8 * (len(path) % 7 + 1)
+        return DiskUsage(total, used, total - used, round(used / total * 100, 1))
+
+    def disk_io_counters(self, perdisk=False, nowrap=True):
+        t = self.fixture.tick
+        counters = {name: DiskIO(120 * t * (i + 1), 80 * t * (i + 1), 4096 * 120 * t * (i + 1),
+                                 4096 * 80 * t * (i + 1), 150 * t)
+                    for i, name in enumerate(self.devices)}
+        if perdisk:
+            return counters
+        return DiskIO(*[sum(col) for col in zip(*counters.values())])
+
+    def install(self):
+        self.saved = {name: getattr(psutil, name) for name in self.NAMES}
+        for name in self.NAMES:
+            setattr(psutil, name, getattr(self, name))
+
+    def remove(self):
+        for name, fn in (self.saved or {}).items():
+            setattr(psutil, name, fn)
+
+
+def _fake_curses(lines=50, cols=200):
+    return types.SimpleNamespace(LINES=lines, COLS=cols, A_BOLD=1 << 21, A_REVERSE=1 << 18,
+                                 color_pair=lambda n: n << 8, error=Exception)
+
+
+def build(fixture):
+    """Point a DataSource, TUI viewer and GUI formatter at the fixture"""
+    collector = HistoryCollector(proc_root=fixture.proc)
+    source = DataSource(collector, ProcessTable(proc_root=fixture.proc))
+    source.topology = CpuTopology(fixture.sysfs)
+    source.thermal_monitor = ThermalMonitor(os.path.join(fixture.root, 'sys'))
+    viewer = sysinfo.SysInfoViewer(None, source=source)
+    viewer.stdscr = _NullScreen()
+    gui = sysinfo_gui.SysInfoGUI.__new__(sysinfo_gui.SysInfoGUI)
+    gui.source = source
+    gui.collector = collector
+    return source, viewer, gui
+
+
+def benchmarks(fixture, source, viewer, gui):
+    """(name, fn, prepare) for every timed path"""
+    collector = source.collector
+    cpu_text = viewer.get_cpu_info()
+
+    def draw(view):
+        def run():
+            viewer.frame = {}
+            view()
+        return run
+
+    def present():
+        viewer.frame = {}
+        viewer.last_frame = {}
+        viewer.view_process()
+        viewer.present()
+
+    def rescan_due():
+        # get_process_info rescans only when the table is a second old; make
+        # it due so this times the scan plus formatting, like the GUI's
+        table = source.process_table
+        if table.last_refresh is not None:
+            table.last_refresh -= 2.0
+
+    yield 'collector.sample', collector.sample, fixture.advance
+    yield 'process_table.refresh', source.process_table.refresh, None
+    for name in ('get_cpu_info', 'get_memory_info', 'get_disk_info', 'get_network_info'):
+        yield f'tui.{name}', getattr(viewer, name), None
+    yield 'tui.get_process_info', viewer.get_process_info, rescan_due
+    yield 'tui.get_diskio_info', viewer.get_diskio_info, fixture.advance
+    yield 'tui.draw_section', draw(lambda: viewer.draw_section(2, "CPU Information", cpu_text)), None
+    yield 'tui.view_cpu', draw(viewer.view_cpu), None
+    yield 'tui.view_network', draw(viewer.view_network), None
+
+    thermals = source.thermals()
+
+    def age_thermals():
+        if thermals._prev is not None:  # Past the 50 ms reuse window, so every call reads
+            thermals._prev = (thermals._prev[0] - 1, thermals._prev[1])
+
+    yield 'thermal.sample', thermals.sample, age_thermals
+    yield 'tui.view_thermal', draw(viewer.view_thermal), age_thermals
+    yield 'tui.present', present, None
+
+    plist = source.process_list()
+
+    def narrow():
+        plist.set_filter('worker-')
+        plist.window(0, 50)
+
+    def keystroke():
+        plist.set_filter('worker-1')
+        plist.window(0, 50)
+
+    yield 'process_list.sync', plist.sync, source.process_table.refresh
+    yield 'process_list.keystroke', keystroke, narrow
+    yield 'tui.view_proclist', draw(viewer.view_proclist), None
+    for name in ('get_cpu_info', 'get_memory_info', 'get_disk_info',
+                 'get_network_info', 'get_process_info'):
+        yield f'gui.{name}', getattr(gui, name), None
+    text = gui.get_process_info()
+    widget = _text_widget()
+    if widget is not None:
+        tk = sysinfo_gui.tk
+
+        def update_text():
+            widget.config(state=tk.NORMAL)
+            widget.delete(1.0, tk.END)
+            widget.insert(tk.END, text)
+            widget.config(state=tk.DISABLED)
+            widget.update_idletasks()
+        yield 'gui.text_update', update_text, None
+
+        # The CPU tab's charts on a real Canvas: coords() on existing items only
+        gui.charts = {}
+        gui.create_charts('cpu', widget.master)
+
+        def update_charts():
+            gui.update_charts('cpu')
+            widget.update_idletasks()
+        yield 'gui.chart_update', update_charts, collector.sample
+
+
+def _text_widget():
+    """A real Tk Text widget, or None when there's no display"""
+    try:
+        import tkinter
+        root = tkinter.Tk()
+    except Exception:
+        return None
+    root.withdraw()
+    sysinfo_gui.tk = tkinter
+    widget = tkinter.Text(root, width=100, height=40)
+    widget.pack()
+    return widget
+
+
+def compare(results, baseline, tolerance):
+    """Return [(name, baseline p50, current p50)] for every regression"""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get('results', {}).get(name)
+        if old is None:
+            continue
+        before, after = old['p50_ms'], result['p50_ms']
+        if after > before * (1 + tolerance) and after - before > NOISE_FLOOR_MS:
+            regressions.append((name, before, after))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sysinfo against a synthetic /proc and sysfs")
+    parser.add_argument('--cpus', type=int, default=512)
+    parser.add_argument('--procs', type=int, default=10000)
+    parser.add_argument('--interfaces', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50,
+                        help="timed runs per benchmark (default: 50)")
+    parser.add_argument('--filter', default='',
+                        help="only run benchmarks whose name contains this")
+    parser.add_argument('--fixture', metavar='DIR',
+                        help="build (or reuse) the fixture tree here instead of a temporary directory")
+    parser.add_argument('--save', metavar='FILE', help="write results as a JSON baseline")
+    parser.add_argument('--compare', metavar='FILE', help="compare against a saved baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed p50 slowdown before --compare fails (default: 0.25)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read baseline {args.compare}: {e}")
+
+    root = args.fixture or tempfile.mkdtemp(prefix='sysinfo-bench-')
+    fixture = Fixture(root, args.cpus, args.procs, args.interfaces)
+    raise_open_file_limit(args.cpus)  # ThermalMonitor keeps the fixture's sysfs files open
+    started = time.perf_counter()
+    if not os.path.isfile(os.path.join(fixture.proc, 'stat')):
+        print(f"Building fixture in {root}: {args.cpus} CPUs, {args.procs} processes, "
+              f"{args.interfaces} interfaces...", flush=True)
+        fixture.create()
+        print(f"  done in {time.perf_counter() - started:.1f}s")
+
+    real_procfs = psutil.PROCFS_PATH
+    psutil.PROCFS_PATH = fixture.proc
+    disks = FixtureDisks(fixture)
+    disks.install()
+    sysinfo.curses = _fake_curses()
+    results = {}
+    try:
+        source, viewer, gui = build(fixture)
+        print(f"{'Benchmark':<26} {'n':>4} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for name, fn, prepare in benchmarks(fixture, source, viewer, gui):
+            if args.filter not in name:
+                continue
+            r = results[name] = measure(fn, args.repeat, prepare=prepare)
+            print(f"{name:<26} {r['n']:>4} {r['p50_ms']:>9.3f} {r['p90_ms']:>9.3f} "
+                  f"{r['p99_ms']:>9.3f} {r['max_ms']:>9.3f}", flush=True)
+    finally:
+        psutil.PROCFS_PATH = real_procfs
+        disks.remove()
+        if not args.fixture:
+            shutil.rmtree(root, ignore_errors=True)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'version': BASELINE_VERSION,
+                'created': time.time(),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'fixture': {'cpus': args.cpus, 'procs': args.procs, 'interfaces': args.interfaces},
+                'results': results,
+            }, f, indent=2)
+            f.write('\n')
+        print(f"Saved baseline to {args.save}")
+
+    if baseline is not None:
+        if baseline.get('fixture') != {'cpus': args.cpus, 'procs': args.procs,
+                                       'interfaces': args.interfaces}:
+            print("Warning: baseline was taken with a different fixture size", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p50 {before:.3f} ms -> {after:.3f} ms "
+                  f"(+{(after / before - 1) * 100:.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
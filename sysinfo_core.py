@@ -0,0 +1,2366 @@
+"""
+sysinfo core - Shared data collectors for the TUI and GUI front-ends
+Imported by sysinfo.py and sysinfo_gui.py
+"""
+
+import bisect
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from collections import namedtuple
+from operator import attrgetter
+
+import psutil
+
+# numpy is optional and only worth its ~90 ms import on many-core hosts;
+# it's loaded by _load_numpy() the first time /proc/stat has that many CPUs
+numpy = None
+NUMPY_MIN_CPUS = 64
+_numpy_tried = False
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+HEAT_CHARS = "·▁▂▃▄▅▆▇█"
+
+
+def sparkline(values, maximum=None):
+    """Render a list of numbers as a one-line block sparkline"""
+    if not values:
+        return ""
+    top = maximum if maximum else max(values)
+    if top <= 0:
+        return SPARK_CHARS[0] * len(values)
+    last = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[min(int(v / top * last + 0.5), last)] if v > 0
+                   else SPARK_CHARS[0] for v in values)
+
+
+def heatmap_rows(layout, percpu, width):
+    """Render per-CPU percentages as labelled rows of heat cells
+
+    layout is CpuTopology.layout() output. Each group is wrapped to width
+    cells; the label is only given on a group's first row. Returns
+    [(label, cells)], where cells is a string of HEAT_CHARS, one per CPU.
+    """
+    width = max(width, 1)
+    last = len(HEAT_CHARS) - 1
+    chars = [HEAT_CHARS[min(int(p * last / 100 + 0.5), last)] for p in percpu]
+    rows = []
+    for label, positions in layout:
+        cells = "".join(chars[i] for i in positions if i < len(chars))
+        for start in range(0, len(cells), width):
+            rows.append((label if start == 0 else "", cells[start:start + width]))
+    return rows
+
+
+def stale_note(part):
+    """Suffix for a filesystem whose statvfs call didn't answer in time"""
+    if not part['stale']:
+        return ""
+    if 'age' not in part:
+        return "  (not responding)"
+    return f"  (stale, last answer {part['age']:.0f}s ago)"
+
+
+def pressure_summary(pressure, paging):
+    """Overview lines: PSI 'some' (and 'full') avg10 per resource, swap and fault rates"""
+    lines = []
+    if pressure:
+        parts = []
+        for name, label in (('cpu', "CPU"), ('memory', "Memory"), ('io', "I/O")):
+            psi = pressure.get(name)
+            if psi is None:
+                continue
+            part = f"{label} {psi['some'][0]:.1f}%"
+            if 'full' in psi and name != 'cpu':  # cpu 'full' is always 0 outside cgroups
+                part += f" (full {psi['full'][0]:.1f}%)"
+            parts.append(part)
+        lines.append("Pressure (10s): " + "  ".join(parts))
+    if paging:
+        lines.append(f"Paging: swap in {paging['swap_in_bytes_per_s'] / 1024**2:.1f} / "
+                     f"out {paging['swap_out_bytes_per_s'] / 1024**2:.1f} MB/s, "
+                     f"major faults {paging['major_faults_per_s']:.0f}/s")
+    return lines
+
+
+def memory_detail(data):
+    """Memory view lines: meminfo breakdown, PSI averages and paging rates"""
+    lines = []
+    m = data.get('breakdown')
+    if m:
+        def size(name):
+            value = m.get(name, 0)
+            return f"{value / 1024**3:.2f} GB" if value >= 1024**3 else f"{value / 1024**2:.1f} MB"
+        lines += ["Breakdown:",
+                  f"  Cached: {size('Cached')}  Buffers: {size('Buffers')}  Shmem: {size('Shmem')}  "
+                  f"Swap cached: {size('SwapCached')}",
+                  f"  Slab: {size('Slab')} ({size('SReclaimable')} reclaimable)  "
+                  f"Page tables: {size('PageTables')}  Kernel stacks: {size('KernelStack')}",
+                  f"  Anon: {size('AnonPages')}  Mapped: {size('Mapped')}  "
+                  f"Active: {size('Active')}  Inactive: {size('Inactive')}",
+                  f"  Dirty: {size('Dirty')}  Writeback: {size('Writeback')}",
+                  f"  Huge pages: {m.get('HugePages_Free', 0)} free of {m.get('HugePages_Total', 0)} "
+                  f"({m.get('Hugepagesize', 0) // 1024**2} MB each, {m.get('HugePages_Rsvd', 0)} reserved)  "
+                  f"Transparent: {size('AnonHugePages')}",
+                  f"  Committed: {size('Committed_AS')} of {size('CommitLimit')} limit",
+                  ""]
+    pressure = data.get('pressure')
+    if pressure:
+        lines.append("Pressure (% of time stalled, avg10 / avg60 / avg300):")
+        for name, label in (('cpu', "CPU"), ('memory', "Memory"), ('io', "I/O")):
+            psi = pressure.get(name)
+            if psi is None:
+                continue
+            line = f"  {label:<7}"
+            for kind in ('some', 'full'):
+                if kind in psi:
+                    line += f"  {kind} {psi[kind][0]:6.2f} {psi[kind][1]:6.2f} {psi[kind][2]:6.2f}"
+            lines.append(line)
+        lines.append("")
+    paging = data.get('paging')
+    if paging:
+        minor = max(paging['faults_per_s'] - paging['major_faults_per_s'], 0)
+        lines += ["Paging:",
+                  f"  Page in: {paging['page_in_bytes_per_s'] / 1024**2:.2f} MB/s  "
+                  f"Page out: {paging['page_out_bytes_per_s'] / 1024**2:.2f} MB/s",
+                  f"  Swap in: {paging['swap_in_bytes_per_s'] / 1024**2:.2f} MB/s  "
+                  f"Swap out: {paging['swap_out_bytes_per_s'] / 1024**2:.2f} MB/s",
+                  f"  Major faults: {paging['major_faults_per_s']:.0f}/s  Minor faults: {minor:.0f}/s"]
+    return lines
+
+
+def thermal_detail(data, per_cpu=16):
+    """Thermal view lines: per-CPU clocks, throttling and temperatures
+
+    Hosts with more than per_cpu CPUs (None: no limit) get a summary and
+    the slowest CPUs instead of one line each.
+    """
+    lines = []
+    cpus = data['cpus']
+    clocked = [c for c in cpus if c['mhz'] is not None]
+    if clocked:
+        speeds = [c['mhz'] for c in clocked]
+        top = max(c['max_mhz'] for c in clocked)
+        lines.append(f"Frequency: {len(clocked)} CPUs, {min(speeds):.0f}-{max(speeds):.0f} MHz, "
+                     f"average {sum(speeds) / len(speeds):.0f} MHz"
+                     + (f" (max {top:.0f} MHz)" if top else ""))
+        if per_cpu is not None and len(clocked) > per_cpu:
+            slowest = heapq.nsmallest(8, clocked, key=lambda c: c['mhz'])
+            lines.append("Slowest: " + "  ".join(f"cpu{c['cpu']} {c['mhz']:.0f}" for c in slowest))
+        else:
+            for c in clocked:
+                line = f"  cpu{c['cpu']:<4} {c['mhz']:6.0f} MHz"
+                if c['max_mhz']:
+                    share = min(c['mhz'] / c['max_mhz'], 1.0)
+                    bar = "█" * int(share * 20) + "░" * (20 - int(share * 20))
+                    line += f" [{bar}] {share * 100:3.0f}% of max"
+                if c['throttles'] is not None:
+                    line += f"  throttled {c['throttles']} ({c['throttles_per_s']:.1f}/s)"
+                lines.append(line)
+        lines.append("")
+    throttled = [c for c in cpus if c['throttles'] is not None]
+    if throttled or data['packages']:
+        lines.append("Thermal throttling (events since boot, rate, share of time):")
+        for p in data['packages']:
+            line = f"  Package {p['package']}: {p['throttles']} ({p['throttles_per_s']:.1f}/s)"
+            if p['throttled_percent'] is not None:
+                line += f"  {p['throttled_percent']:.1f}% of time"
+            lines.append(line)
+        busy = sorted((c for c in throttled if c['throttles_per_s'] > 0),
+                      key=lambda c: c['throttles_per_s'], reverse=True)
+        if busy:
+            lines.append("  Throttling now: " + "  ".join(
+                f"cpu{c['cpu']} {c['throttles_per_s']:.1f}/s" for c in busy[:8])
+                + (f"  ... and {len(busy) - 8} more" if len(busy) > 8 else ""))
+        elif throttled:
+            lines.append("  No CPU throttled since the last sample")
+        lines.append("")
+    if data['sensors']:
+        lines.append("Temperatures:")
+        for t in data['sensors']:
+            line = f"  {t['chip']:<14} {t['label']:<16} {t['current']:6.1f}°C"
+            limits = [f"{name} {t[key]:.0f}" for name, key in (("high", 'high'), ("crit", 'critical'))
+                      if t[key]]
+            if limits:
+                line += f"  ({', '.join(limits)})"
+            if t['critical'] and t['current'] >= t['critical']:
+                line += "  CRITICAL"
+            elif t['high'] and t['current'] >= t['high']:
+                line += "  HOT"
+            lines.append(line)
+    return lines
+
+
+class RingBuffer:
+    """Fixed-size float history backed by a preallocated array('d')"""
+
+    def __init__(self, size):
+        self.size = size
+        self.data = array('d', bytes(8 * size))
+        self.index = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+        self.data[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def latest(self, default=0.0):
+        if not self.count:
+            return default
+        return self.data[self.index - 1]
+
+    def last(self, n=None):
+        """Return up to n most recent values, oldest first"""
+        n = self.count if n is None else min(n, self.count)
+        start = self.index - n
+        if start >= 0:
+            return self.data[start:self.index].tolist()
+        return self.data[start:].tolist() + self.data[:self.index].tolist()
+
+
+MemInfo = namedtuple('MemInfo', 'total available percent used free')
+SwapInfo = namedtuple('SwapInfo', 'total used free percent')
+NetIO = namedtuple('NetIO', 'bytes_sent bytes_recv packets_sent packets_recv '
+                            'errin errout dropin dropout')
+
+
+class ProcFile:
+    """A /proc file kept open and re-read with pread into a reused buffer
+
+    Safe to share between threads: reads of the buffer are serialized.
+    """
+
+    def __init__(self, path, size=4096):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0))
+        self.buf = bytearray(size)
+        self.lock = threading.Lock()
+
+    def read(self):
+        """Return the current file contents as bytes"""
+        with self.lock:
+            while True:
+                n = os.preadv(self.fd, [self.buf], 0)
+                if n < len(self.buf):
+                    return bytes(memoryview(self.buf)[:n])
+                # Contents didn't fit; grow the buffer and read again
+                self.buf = bytearray(len(self.buf) * 2)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+_CPU_LABEL = re.compile(rb'cpu(\d*)')
+
+
+def _load_numpy():
+    global numpy, _numpy_tried
+    if not _numpy_tried:
+        _numpy_tried = True
+        try:
+            import numpy
+        except ImportError:
+            pass
+    return numpy
+
+
+def parse_cpu_stat(data):
+    """Parse the cpu lines of /proc/stat into flat arrays
+
+    Returns (ids, busy, total): ids[0] is -1 for the aggregate line,
+    followed by the logical CPU numbers, and busy/total are jiffy counters
+    in the same order (arrays of floats, or NumPy arrays on hosts with at
+    least NUMPY_MIN_CPUS CPUs when numpy is installed).
+    """
+    start = data.find(b'cpu')
+    last = data.rfind(b'\ncpu')
+    if start < 0:
+        return [], array('d'), array('d')
+    end = data.find(b'\n', last + 1 if last >= 0 else start)
+    block = data[start:end if end >= 0 else len(data)]
+    ids = [int(n) if n else -1 for n in _CPU_LABEL.findall(block)]
+    stride = len(block[:block.find(b'\n')].split()) - 1
+    # user nice system idle iowait irq softirq steal (guest* are already
+    # included in user/nice)
+    if len(ids) > NUMPY_MIN_CPUS and stride >= 5 and _load_numpy() is not None:
+        # One C-level parse of every counter on the host, without labels
+        values = numpy.fromstring(_CPU_LABEL.sub(b'', block), dtype=numpy.int64, sep=' ')
+        if values.size == stride * len(ids):
+            values = values.reshape(len(ids), stride)[:, :8]
+            total = values.sum(axis=1)
+            busy = total - values[:, 3] - values[:, 4]
+            return ids, busy.astype(numpy.float64), total.astype(numpy.float64)
+    busy = array('d')
+    total = array('d')
+    for line in block.split(b'\n'):
+        values = [int(v) for v in line.split()[1:9]]
+        line_total = sum(values)
+        busy.append(line_total - values[3] - (values[4] if len(values) > 4 else 0))
+        total.append(line_total)
+    return ids, busy, total
+
+
+def parse_meminfo(data, wanted=None):
+    """Parse /proc/meminfo into {b'Field': bytes}, optionally only some fields"""
+    fields = {}
+    for line in data.split(b'\n'):
+        name, sep, rest = line.partition(b':')
+        if not sep or (wanted is not None and name not in wanted):
+            continue
+        parts = rest.split()
+        value = int(parts[0])
+        fields[name] = value * 1024 if len(parts) > 1 else value
+    return fields
+
+
+def parse_net_dev(data):
+    """Parse /proc/net/dev into {interface: (rx_bytes, rx_packets, rx_errs,
+    rx_drop, tx_bytes, tx_packets, tx_errs, tx_drop)}"""
+    nics = {}
+    for line in data.split(b'\n')[2:]:
+        name, sep, rest = line.partition(b':')
+        if not sep:
+            continue
+        v = rest.split()
+        nics[name.strip().decode()] = (int(v[0]), int(v[1]), int(v[2]),
+                                       int(v[3]), int(v[8]), int(v[9]),
+                                       int(v[10]), int(v[11]))
+    return nics
+
+
+class ProcFastPath:
+    """Linux collectors that read /proc directly instead of through psutil
+
+    /proc/stat, /proc/meminfo and /proc/net/dev stay open for the lifetime
+    of the object and are re-read with pread, parsing only the fields the
+    views display. Use open() to get an instance, or None where /proc is
+    not available so callers can fall back to psutil.
+    """
+
+    MEMINFO_FIELDS = frozenset((b'MemTotal', b'MemFree', b'MemAvailable',
+                                b'Buffers', b'Cached', b'SReclaimable',
+                                b'SwapTotal', b'SwapFree'))
+
+    def __init__(self, root='/proc'):
+        self.files = []
+        try:
+            self.stat = self._open(f"{root}/stat")
+            self.meminfo = self._open(f"{root}/meminfo")
+            self.net_dev = self._open(f"{root}/net/dev")
+        except OSError:
+            self.close()
+            raise
+
+    def _open(self, path):
+        f = ProcFile(path)
+        self.files.append(f)
+        return f
+
+    @classmethod
+    def open(cls, root='/proc'):
+        """Return a fast-path collector, or None if it can't be used here"""
+        if not hasattr(os, 'preadv'):
+            return None
+        try:
+            fast = cls(root)
+            # Make sure the formats are what we expect before relying on them
+            if not parse_cpu_stat(fast.stat.read())[0]:
+                fast.close()
+                return None
+            fast.memory()
+            fast.net_io_counters()
+        except (OSError, ValueError, IndexError, KeyError):
+            return None
+        return fast
+
+    def close(self):
+        for f in self.files:
+            f.close()
+        self.files = []
+
+    def cpu_counters(self):
+        return parse_cpu_stat(self.stat.read())
+
+    def memory(self):
+        """Return (virtual, swap) memory, matching psutil's field semantics"""
+        m = parse_meminfo(self.meminfo.read(), self.MEMINFO_FIELDS)
+        total = m[b'MemTotal']
+        free = m[b'MemFree']
+        avail = m.get(b'MemAvailable')
+        if not avail:
+            avail = free + m.get(b'Buffers', 0) + m.get(b'Cached', 0) \
+                + m.get(b'SReclaimable', 0)
+        avail = min(max(avail, 0), total)
+        used = total - avail
+        percent = round(used / total * 100, 1) if total else 0.0
+        mem = MemInfo(total, avail, percent, used, free)
+
+        swap_total = m.get(b'SwapTotal', 0)
+        swap_free = m.get(b'SwapFree', 0)
+        swap_used = swap_total - swap_free
+        swap_percent = round(swap_used / swap_total * 100, 1) if swap_total else 0.0
+        swap = SwapInfo(swap_total, swap_used, swap_free, swap_percent)
+        return mem, swap
+
+    def net_io_counters(self, pernic=False):
+        """Return network counters summed over all interfaces, or per NIC"""
+        nics = parse_net_dev(self.net_dev.read())
+        if pernic:
+            return {name: NetIO(v[4], v[0], v[5], v[1], v[2], v[6], v[3], v[7])
+                    for name, v in nics.items()}
+        t = [sum(col) for col in zip(*nics.values())] or [0] * 8
+        return NetIO(t[4], t[0], t[5], t[1], t[2], t[6], t[3], t[7])
+
+
+def sum_net_io(pernic):
+    """Sum per-NIC counters into one NetIO, like net_io_counters()"""
+    return NetIO(*[sum(col) for col in zip(*pernic.values())] or [0] * 8)
+
+
+WRAP_MARGIN = 2**28  # How close to 2**32 a 32-bit counter must be to have wrapped
+
+
+def counter_delta(cur, prev):
+    """Difference between two readings of a kernel counter
+
+    A counter that went backwards from just below 2**32 is taken to be a
+    32-bit counter that wrapped; anything else means the counter was reset
+    (e.g. the interface was recreated), and the new value is the delta.
+    """
+    if cur >= prev:
+        return cur - prev
+    if 2**32 - WRAP_MARGIN <= prev < 2**32:
+        return cur + 2**32 - prev
+    return cur
+
+
+class NetRates:
+    """Per-interface network rates with EWMA smoothing
+
+    update() takes per-NIC counters and computes bytes/s, packets/s,
+    errors/s and drops/s for each interface, smoothed with a time constant
+    of `smoothing` seconds so the result doesn't depend on the sampling
+    interval. Interface addresses are cached and only reloaded when the
+    set of interfaces changes (or every `addr_max_age` seconds, to catch
+    address changes on existing interfaces).
+    """
+
+    FIELDS = NetIO._fields
+
+    def __init__(self, smoothing=3.0, addr_max_age=60.0):
+        self.smoothing = smoothing
+        self.addr_max_age = addr_max_age
+        self.prev = {}       # nic -> NetIO
+        self.prev_time = None
+        self.rates = {}      # nic -> instantaneous per-second rates
+        self.smoothed = {}   # nic -> smoothed per-second rates
+        self.seeded = set()  # nics with at least one real rate
+        self._names = frozenset()
+        self._addrs = {}
+        self._addrs_time = 0.0
+
+    def update(self, pernic, now=None):
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.prev_time if self.prev_time is not None else 0.0
+        if self.prev_time is not None and elapsed <= 0:
+            return
+        alpha = 1 - math.exp(-elapsed / self.smoothing) if self.smoothing > 0 else 1.0
+        rates = {}
+        smoothed = {}
+        seeded = set()
+        for name, cur in pernic.items():
+            old = self.prev.get(name)
+            if old is None or elapsed <= 0:
+                # First sighting: nothing to diff against yet
+                rates[name] = smoothed[name] = [0.0] * len(cur)
+                continue
+            rate = [counter_delta(c, p) / elapsed for c, p in zip(cur, old)]
+            rates[name] = rate
+            last = self.smoothed.get(name)
+            if last is None or name not in self.seeded:
+                smoothed[name] = rate
+                seeded.add(name)
+            else:
+                smoothed[name] = [s + alpha * (r - s) for r, s in zip(rate, last)]
+                seeded.add(name)
+        self.seeded = seeded
+        self.prev = pernic
+        self.prev_time = now
+        self.rates = rates
+        self.smoothed = smoothed
+
+    def total(self, field):
+        """Instantaneous rate of one field summed over all interfaces"""
+        i = self.FIELDS.index(field)
+        return sum(r[i] for r in self.rates.values())
+
+    def table(self):
+        """Smoothed per-interface rates as a list of dicts, busiest first"""
+        rows = []
+        for name, r in self.smoothed.items():
+            rows.append({
+                'name': name,
+                'bytes_sent_per_s': r[0],
+                'bytes_recv_per_s': r[1],
+                'packets_sent_per_s': r[2],
+                'packets_recv_per_s': r[3],
+                'errors_per_s': r[4] + r[5],
+                'drops_per_s': r[6] + r[7],
+            })
+        rows.sort(key=lambda row: row['bytes_sent_per_s'] + row['bytes_recv_per_s'],
+                  reverse=True)
+        return rows
+
+    def addresses(self):
+        """Interface addresses, reloaded only when the interfaces change"""
+        names = frozenset(self.prev)
+        now = time.monotonic()
+        if names != self._names or now - self._addrs_time >= self.addr_max_age:
+            self._addrs = {
+                name: [{'family': addr.family.name, 'address': addr.address}
+                       for addr in addrs]
+                for name, addrs in psutil.net_if_addrs().items()
+            }
+            self._names = names
+            self._addrs_time = now
+        return self._addrs
+
+
+class CpuSampler:
+    """Non-blocking CPU utilization from /proc/stat counter deltas
+
+    Each call to sample() reads the counters once and reports utilization
+    since the previous call, so a refresh costs a single file read instead
+    of sleeping for a measurement interval. Counters are kept in flat
+    arrays and all cores are computed in one pass (vectorized with NumPy
+    when it is installed), which keeps 512-CPU hosts cheap.
+    """
+
+    def __init__(self, path='/proc/stat', proc_file=None):
+        self.path = path
+        self._file = proc_file
+        self.lock = threading.Lock()
+        self._prev = None
+        self.ids = []       # logical CPU number of each percpu entry
+        self.total = 0.0
+        self.percpu = []
+        self.sample()
+
+    def _read_proc(self):
+        if self._file is None:
+            self._file = ProcFile(self.path)
+        return parse_cpu_stat(self._file.read())
+
+    def _read_psutil(self):
+        """Fallback for systems without a readable /proc/stat"""
+        busy = array('d')
+        total = array('d')
+        times = [psutil.cpu_times()] + psutil.cpu_times(percpu=True)
+        for t in times:
+            t_total = sum(t)
+            for name in ('guest', 'guest_nice'):
+                t_total -= getattr(t, name, 0)
+            busy.append(t_total - t.idle - getattr(t, 'iowait', 0))
+            total.append(t_total)
+        return [-1] + list(range(len(times) - 1)), busy, total
+
+    def read(self):
+        """Read raw counters as (ids, busy, total), aggregate first"""
+        try:
+            counters = self._read_proc()
+            if counters[0]:
+                return counters
+        except OSError:
+            pass
+        return self._read_psutil()
+
+    def sample(self):
+        """Return (total_percent, [per_core_percent, ...]) since last call"""
+        with self.lock:
+            ids, busy, total = self.read()
+            prev = self._prev
+            if prev is None or prev[0] != ids:
+                # First call or CPUs went on/offline: report since boot
+                pbusy = ptotal = [0.0] * len(ids)
+                last = None
+            else:
+                _, pbusy, ptotal = prev
+                last = [self.total] + self.percpu
+            if not isinstance(busy, array):
+                dtotal = total - numpy.asarray(ptotal)
+                moved = dtotal > 0
+                percents = numpy.divide((busy - numpy.asarray(pbusy)) * 100, dtotal,
+                                        out=numpy.zeros(len(ids)), where=moved)
+                numpy.clip(percents, 0.0, 100.0, out=percents)
+                if last is not None and not moved.all():
+                    # Too little time has passed for some counters to move;
+                    # keep their last values instead of flapping to zero
+                    percents = numpy.where(moved, percents, last)
+                percents = percents.tolist()
+            else:
+                percents = [min(max((b - pb) * 100 / (t - pt), 0.0), 100.0) if t > pt
+                            else (last[i] if last is not None else 0.0)
+                            for i, (b, pb, t, pt) in enumerate(zip(busy, pbusy, total, ptotal))]
+            self._prev = (ids, busy, total)
+            self.ids = ids[1:]
+            self.total = percents[0]
+            self.percpu = percents[1:]
+            return self.total, list(self.percpu)
+
+
+class CpuTopology:
+    """Socket, NUMA node and core of each logical CPU, read once from sysfs
+
+    CPUs without topology information (or a missing sysfs) all land in a
+    single group, so the layout degrades to a flat grid.
+    """
+
+    def __init__(self, sysfs='/sys/devices/system'):
+        self.cpus = {}      # cpu -> (socket, node, core)
+        self._layouts = {}
+        if sysfs is not None:
+            self._read(sysfs)
+
+    def _read(self, sysfs):
+        nodes = {}
+        node_dir = os.path.join(sysfs, 'node')
+        try:
+            names = os.listdir(node_dir)
+        except OSError:
+            names = []
+        for name in names:
+            if name.startswith('node') and name[4:].isdigit():
+                try:
+                    with open(os.path.join(node_dir, name, 'cpulist')) as f:
+                        for cpu in parse_cpulist(f.read()):
+                            nodes[cpu] = int(name[4:])
+                except (OSError, ValueError):
+                    pass
+        cpu_dir = os.path.join(sysfs, 'cpu')
+        try:
+            names = os.listdir(cpu_dir)
+        except OSError:
+            return
+        for name in names:
+            if not (name.startswith('cpu') and name[3:].isdigit()):
+                continue
+            cpu = int(name[3:])
+            topology = os.path.join(cpu_dir, name, 'topology')
+            try:
+                with open(os.path.join(topology, 'physical_package_id')) as f:
+                    socket = int(f.read())
+                with open(os.path.join(topology, 'core_id')) as f:
+                    core = int(f.read())
+            except (OSError, ValueError):
+                continue
+            self.cpus[cpu] = (max(socket, 0), nodes.get(cpu, 0), core)
+
+    def layout(self, ids):
+        """Group positions in ids by (socket, node), hyperthread siblings adjacent
+
+        Returns [(label, [position, ...])]; cached per CPU set, since it
+        only changes when CPUs go on/offline.
+        """
+        key = tuple(ids)
+        cached = self._layouts.get(key)
+        if cached is not None:
+            return cached
+        groups = {}
+        for position, cpu in enumerate(ids):
+            socket, node, core = self.cpus.get(cpu, (0, 0, cpu))
+            groups.setdefault((socket, node), []).append(((core, cpu), position))
+        sockets = len({socket for socket, _ in groups})
+        layout = []
+        for (socket, node), members in sorted(groups.items()):
+            members.sort()
+            label = f"S{socket} N{node}" if sockets > 1 or len(groups) > 1 else "CPUs"
+            layout.append((label, [position for _, position in members]))
+        self._layouts = {key: layout}
+        return layout
+
+
+def parse_cpulist(text):
+    """Expand a sysfs CPU list like '0-3,8,10-11' into a list of ints"""
+    cpus = []
+    for part in text.strip().split(','):
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+class HistoryCollector(threading.Thread):
+    """Background thread sampling CPU, memory, swap, disk and network
+
+    Every interval the collector takes one sample of each metric, stores
+    the raw psutil results in `latest` and appends the derived values to
+    fixed-length ring buffers. Front-ends read from here instead of
+    calling psutil on the UI path.
+    """
+
+    SERIES = ('time', 'cpu', 'memory', 'swap', 'disk_read', 'disk_write',
+              'net_sent', 'net_recv')
+
+    def __init__(self, interval=1.0, length=120, proc_root='/proc'):
+        super().__init__(name='sysinfo-collector', daemon=True)
+        self.interval = interval
+        self.length = length
+        self.lock = threading.Lock()
+        self.fast = ProcFastPath.open(proc_root)
+        self.cpu_sampler = CpuSampler(
+            f"{proc_root}/stat", self.fast.stat if self.fast is not None else None)
+        self.series = {name: RingBuffer(length) for name in self.SERIES}
+        self.percpu = [RingBuffer(length)
+                       for _ in range(len(self.cpu_sampler.percpu))]
+        self.latest = {}
+        self.net_rates = NetRates()
+        self.observers = []  # observer(collector, now), called after every sample
+        self._prev = None
+        self._stop_event = threading.Event()
+        self.sample()
+
+    def run(self):
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            deadline += self.interval
+            try:
+                self.sample()
+            except (OSError, psutil.Error):
+                pass
+            now = time.monotonic()
+            if deadline < now:
+                # Fell behind (suspend, overloaded host); don't burst
+                deadline = now
+            self._stop_event.wait(deadline - now)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def sample(self):
+        """Take one sample of every metric and append it to the history"""
+        now = time.monotonic()
+        cpu_total, cpu_percpu = self.cpu_sampler.sample()
+        if self.fast is not None:
+            mem, swap = self.fast.memory()
+            pernic = self.fast.net_io_counters(pernic=True)
+        else:
+            mem = psutil.virtual_memory()
+            swap = psutil.swap_memory()
+            pernic = psutil.net_io_counters(pernic=True)
+        net_io = sum_net_io(pernic)
+        disk_io = psutil.disk_io_counters()
+
+        self.net_rates.update(pernic, now)
+        rates = (0.0, 0.0, 0.0, 0.0)
+        if self._prev is not None:
+            ptime, pdisk = self._prev
+            elapsed = now - ptime
+            if elapsed > 0:
+                rates = (
+                    _rate(disk_io, pdisk, 'read_bytes', elapsed),
+                    _rate(disk_io, pdisk, 'write_bytes', elapsed),
+                    self.net_rates.total('bytes_sent'),
+                    self.net_rates.total('bytes_recv'),
+                )
+        self._prev = (now, disk_io)
+
+        with self.lock:
+            series = self.series
+            series['time'].append(time.time())
+            series['cpu'].append(cpu_total)
+            series['memory'].append(mem.percent)
+            series['swap'].append(swap.percent)
+            series['disk_read'].append(rates[0])
+            series['disk_write'].append(rates[1])
+            series['net_sent'].append(rates[2])
+            series['net_recv'].append(rates[3])
+            for buf, percent in zip(self.percpu, cpu_percpu):
+                buf.append(percent)
+            self.latest = {
+                'cpu': (cpu_total, cpu_percpu),
+                'nics': self.net_rates.table(),
+                'memory': mem,
+                'swap': swap,
+                'disk_io': disk_io,
+                'net_io': net_io,
+                'rates': dict(zip(self.SERIES[4:], rates)),
+            }
+        for observe in self.observers:
+            observe(self, now)
+
+    def history(self, name, n=None):
+        """Return the last n points of a series, oldest first"""
+        with self.lock:
+            return self.series[name].last(n)
+
+    def core_history(self, core, n=None):
+        """Return the last n utilization points of one logical CPU"""
+        with self.lock:
+            return self.percpu[core].last(n)
+
+
+def _rate(cur, prev, field, elapsed):
+    """Per-second rate of a counter field, tolerating missing/reset counters"""
+    if cur is None or prev is None:
+        return 0.0
+    delta = getattr(cur, field) - getattr(prev, field)
+    return delta / elapsed if delta > 0 else 0.0
+
+
+def _status_value(status, key):
+    """The number after key, a b'\\n'-prefixed field name, in /proc/<pid>/status contents"""
+    start = status.index(key) + len(key)
+    end = status.find(b'\n', start)
+    return int(status[start:end if end >= 0 else len(status)])
+
+
+class ProcEntry:
+    """One row of the process table, identified by (pid, start)"""
+
+    __slots__ = ('pid', 'start', 'name', 'proc', 'cpu_time', 'cpu_percent',
+                 'rss', 'memory_percent', 'seen', 'cgroup', 'threads', 'fds', 'counters',
+                 'read_bytes_per_s', 'write_bytes_per_s', 'syscr_per_s', 'syscw_per_s',
+                 'ctx_switches_per_s', 'user', 'cmdline')
+
+    def __init__(self, pid, start, name, proc=None):
+        self.pid = pid
+        self.start = start
+        self.name = name
+        self.proc = proc
+        self.cpu_time = None
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.memory_percent = 0.0
+        self.seen = 0
+        self.cgroup = None  # cgroup v2 path, read once by CgroupCollector
+        # Only filled in while the table collects detail
+        self.threads = 0
+        self.fds = 0
+        self.counters = None  # (read_bytes, write_bytes, syscr, syscw, ctx switches)
+        self.read_bytes_per_s = 0.0
+        self.write_bytes_per_s = 0.0
+        self.syscr_per_s = 0.0
+        self.syscw_per_s = 0.0
+        self.ctx_switches_per_s = 0.0
+        # Read once, the first time a process list needs them
+        self.user = None
+        self.cmdline = None
+
+
+class ProcessTable:
+    """Persistent process table updated incrementally on every refresh
+
+    Entries survive between refreshes so CPU usage can be computed from
+    the change in each process's CPU time. New pids are added, exited ones
+    evicted, and a reused pid is detected by its start time. On Linux each
+    process costs one read of /proc/<pid>/stat; elsewhere cached
+    psutil.Process objects are used.
+
+    Once a caller asks for detail, every scan also collects I/O, syscall and
+    context-switch rates, open fds and threads: three more reads per
+    process on Linux (status, io, the fd directory), one oneshot() batch
+    elsewhere. A process that exits mid-scan is dropped from the table.
+    """
+
+    def __init__(self, proc_root='/proc'):
+        self.proc_root = proc_root
+        self.use_proc = os.path.isfile(f"{proc_root}/self/stat")
+        self.clock_ticks = os.sysconf('SC_CLK_TCK') if self.use_proc else 100
+        self.page_size = os.sysconf('SC_PAGE_SIZE') if self.use_proc else 4096
+        self.mem_total = psutil.virtual_memory().total
+        self.boot_time = psutil.boot_time()
+        self.users = {}  # uid -> user name
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.detail = False
+        self.generation = 0
+        self.last_refresh = None
+        self.refresh()
+
+    def refresh(self, max_age=0.0, detail=False):
+        """Rescan processes and update CPU and memory usage
+
+        With max_age, skip the scan if the table is younger than that many
+        seconds, so fast redraws don't rescan every process. detail=True
+        turns on detail collection for this and every later scan.
+        """
+        with self.lock:
+            now = time.monotonic()
+            fresh = self.last_refresh is not None and now - self.last_refresh < max_age
+            if fresh and (self.detail or not detail):
+                return
+            self.detail = self.detail or detail
+            elapsed = now - self.last_refresh if self.last_refresh else 0.0
+            self.generation += 1
+            if self.use_proc:
+                self._scan_proc(elapsed)
+            else:
+                self._scan_psutil(elapsed)
+            gen = self.generation
+            for pid in [pid for pid, e in self.entries.items() if e.seen != gen]:
+                del self.entries[pid]
+            self.last_refresh = now
+
+    def enable_detail(self):
+        """Turn on detail collection for later scans; True if it was off"""
+        with self.lock:
+            newly = not self.detail
+            self.detail = True
+            return newly
+
+    def _update(self, entry, cpu_time, rss, elapsed):
+        if entry.cpu_time is not None and elapsed > 0:
+            entry.cpu_percent = max(cpu_time - entry.cpu_time, 0) / elapsed * 100
+        entry.cpu_time = cpu_time
+        entry.rss = rss
+        entry.memory_percent = rss / self.mem_total * 100 if self.mem_total else 0.0
+        entry.seen = self.generation
+
+    def _update_detail(self, entry, threads, fds, counters, elapsed):
+        prev = entry.counters
+        if prev is not None and elapsed > 0:
+            (entry.read_bytes_per_s, entry.write_bytes_per_s, entry.syscr_per_s,
+             entry.syscw_per_s, entry.ctx_switches_per_s) = [
+                max(cur - old, 0) / elapsed for cur, old in zip(counters, prev)]
+        entry.counters = counters
+        entry.threads = threads
+        entry.fds = fds
+
+    @staticmethod
+    def _proc_detail(path):
+        """(open fds, counters) from /proc/<pid>, or None if the process is gone
+
+        Other users' io and fd directory need root; they count as 0.
+        """
+        try:
+            with open(f"{path}/status", 'rb') as f:
+                status = f.read()
+            # By key: newer kernels add lines (x86_Thread_features) after these
+            ctx = (_status_value(status, b'\nvoluntary_ctxt_switches:')
+                   + _status_value(status, b'\nnonvoluntary_ctxt_switches:'))
+            try:
+                with open(f"{path}/io", 'rb') as f:
+                    io = f.read().split()
+                # rchar wchar syscr syscw read_bytes write_bytes cancelled_write_bytes
+                counters = (int(io[9]), int(io[11]), int(io[5]), int(io[7]), ctx)
+            except PermissionError:
+                counters = (0, 0, 0, 0, ctx)
+            try:
+                fds = len(os.listdir(f"{path}/fd"))
+            except PermissionError:
+                fds = 0
+        except (FileNotFoundError, ProcessLookupError):
+            return None  # Exited mid-scan
+        except (OSError, ValueError, IndexError):
+            return 0, (0, 0, 0, 0, 0)
+        return fds, counters
+
+    def _scan_proc(self, elapsed):
+        entries = self.entries
+        root = self.proc_root
+        ticks = self.clock_ticks
+        page_size = self.page_size
+        detail = self.detail
+        for name in os.listdir(root):
+            if not name.isdigit():
+                continue
+            pid = int(name)
+            try:
+                with open(f"{root}/{name}/stat", 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue  # Exited between listdir and open
+            lparen = data.find(b'(')
+            rparen = data.rfind(b')')
+            fields = data[rparen + 2:].split()
+            # Fields after the comm: state is index 0, so stat field N is N - 3
+            start = int(fields[19])
+            entry = entries.get(pid)
+            if entry is None or entry.start != start:
+                comm = data[lparen + 1:rparen].decode('utf-8', 'replace')
+                entry = entries[pid] = ProcEntry(pid, start, self._full_name(pid, comm))
+            if detail:
+                extra = self._proc_detail(f"{root}/{name}")
+                if extra is None:
+                    continue  # Not marked seen, so it's evicted below
+                self._update_detail(entry, int(fields[17]), extra[0], extra[1], elapsed)
+            cpu_time = (int(fields[11]) + int(fields[12])) / ticks
+            self._update(entry, cpu_time, int(fields[21]) * page_size, elapsed)
+
+    def _full_name(self, pid, comm):
+        """The kernel truncates comm to 15 chars; ask psutil for the real name"""
+        if len(comm) < 15:
+            return comm
+        try:
+            return psutil.Process(pid).name()
+        except psutil.Error:
+            return comm
+
+    def _scan_psutil(self, elapsed):
+        entries = self.entries
+        detail = self.detail
+        for proc in psutil.process_iter():
+            try:
+                with proc.oneshot():
+                    start = proc.create_time()
+                    entry = entries.get(proc.pid)
+                    if entry is None or entry.start != start:
+                        entry = entries[proc.pid] = ProcEntry(
+                            proc.pid, start, proc.name(), proc)
+                    times = proc.cpu_times()
+                    rss = proc.memory_info().rss
+                    if detail:
+                        threads = proc.num_threads()
+                        ctx = sum(proc.num_ctx_switches())
+                        try:
+                            io = proc.io_counters()
+                            counters = (io.read_bytes, io.write_bytes, io.read_count,
+                                        io.write_count, ctx)
+                        except (psutil.AccessDenied, AttributeError):
+                            counters = (0, 0, 0, 0, ctx)  # Not ours, or no io_counters on this OS
+                        try:
+                            fds = proc.num_fds()
+                        except (psutil.AccessDenied, AttributeError):
+                            fds = 0
+            except psutil.Error:
+                continue  # Exited mid-scan (NoSuchProcess) or not ours at all
+            if detail:
+                self._update_detail(entry, threads, fds, counters, elapsed)
+            self._update(entry, times.user + times.system, rss, elapsed)
+
+    def top(self, k, key='memory_percent'):
+        """Return the k entries with the largest value of key"""
+        with self.lock:
+            return heapq.nlargest(k, self.entries.values(), key=attrgetter(key))
+
+    def describe(self, entry):
+        """Fill in entry.user and entry.cmdline, once per process
+
+        Kernel threads have no command line; they show as [name] like ps.
+        """
+        if entry.user is not None:
+            return
+        cmdline = ''
+        if self.use_proc:
+            path = f"{self.proc_root}/{entry.pid}"
+            try:
+                uid = os.stat(path).st_uid
+                with open(f"{path}/cmdline", 'rb') as f:
+                    cmdline = f.read().replace(b'\0', b' ').decode('utf-8', 'replace')
+                entry.user = self._user_name(uid)
+            except OSError:
+                entry.user = '?'  # Exited; evicted on the next scan
+        else:
+            try:
+                entry.user = entry.proc.username()
+                cmdline = ' '.join(entry.proc.cmdline())
+            except psutil.Error:
+                entry.user = entry.user or '?'
+        # Arguments may hold newlines and tabs; one line per process
+        entry.cmdline = ' '.join(cmdline.split()) or f"[{entry.name}]"
+
+    def _user_name(self, uid):
+        name = self.users.get(uid)
+        if name is None:
+            import pwd
+            try:
+                name = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                name = str(uid)  # No passwd entry (containers, NSS users)
+            self.users[uid] = name
+        return name
+
+    def create_time(self, entry):
+        """When the process started, in seconds since the epoch"""
+        if self.use_proc:
+            return self.boot_time + entry.start / self.clock_ticks
+        return entry.start
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def format_age(seconds):
+    """Compact age like ps: 45s, 12m03s, 5h12m, 3d04h"""
+    seconds = max(int(seconds), 0)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}h{minutes:02d}m"
+    days, hours = divmod(hours, 24)
+    return f"{days}d{hours:02d}h"
+
+
+class ProcessList:
+    """Every process in a ProcessTable, sorted and filtered, kept up to date incrementally
+
+    Front-ends show a window of it at a time (virtual scrolling), so only
+    the visible rows are ever formatted. sync() catches up with the table
+    once per scan, not once per redraw. Sorted by a fixed column (pid,
+    user, age, name), new processes are inserted with bisect and exited
+    ones removed; sorted by a live column (CPU, memory, I/O), the list is
+    re-sorted once per scan starting from the previous order, which
+    Timsort handles close to linearly. The filter is a case-insensitive
+    substring of the name, command line or user; typing more characters
+    only rechecks the rows that still match.
+    """
+
+    # column -> (sort key, largest first by default, changes on every scan)
+    COLUMNS = {
+        'cpu': (attrgetter('cpu_percent'), True, True),
+        'memory': (attrgetter('rss'), True, True),
+        'io': (lambda e: e.read_bytes_per_s + e.write_bytes_per_s, True, True),
+        'pid': (attrgetter('pid'), False, False),
+        'user': (attrgetter('user'), False, False),
+        'age': (attrgetter('start'), False, False),  # Smallest start first: oldest first
+        'name': (lambda e: e.name.lower(), False, False),
+    }
+
+    def __init__(self, table, column='cpu'):
+        self.table = table
+        self.lock = threading.Lock()
+        self.column = column
+        self.descending = self.COLUMNS[column][1]
+        self.query = ''
+        self.entries = {}   # pid -> ProcEntry, as of the last sync
+        self.text = {}      # pid -> lowercased "name cmdline user" for the filter
+        self.order = []     # (sort key, pid), ascending
+        self.visible = []   # pids that match the filter, in display order
+        self.stale = True   # visible needs rebuilding from order
+        self.generation = None
+
+    def sync(self):
+        """Catch up with the table's latest scan"""
+        table = self.table
+        with self.lock:
+            if table.generation == self.generation:
+                return
+            with table.lock:
+                current = dict(table.entries)
+                self.generation = table.generation
+            known = self.entries
+            gone = [pid for pid, e in known.items() if current.get(pid) is not e]
+            added = [e for pid, e in current.items() if known.get(pid) is not e]
+            key, _, live = self.COLUMNS[self.column]
+            text = self.text
+            for pid in gone:
+                if not live:
+                    order = self.order
+                    i = bisect.bisect_left(order, (key(known[pid]), pid))
+                    del order[i]
+                del text[pid]
+            for e in added:
+                table.describe(e)
+                text[e.pid] = f"{e.name}\0{e.cmdline}\0{e.user}".lower()
+                if not live:
+                    bisect.insort(self.order, (key(e), e.pid))
+            if live:
+                gone = set(gone)
+                order = [(key(current[pid]), pid) for _, pid in self.order if pid not in gone]
+                order += [(key(e), e.pid) for e in added]
+                order.sort()
+                self.order = order
+            self.entries = current
+            self.stale = True
+
+    def sort(self, column):
+        """Sort by column; the current column again flips the direction"""
+        with self.lock:
+            if column == self.column:
+                self.descending = not self.descending
+            else:
+                key, self.descending, _ = self.COLUMNS[column]
+                self.column = column
+                entries = self.entries
+                self.order = sorted((key(e), pid) for pid, e in entries.items())
+            self.stale = True
+
+    def set_filter(self, query):
+        """Show only processes whose name, command line or user contains query"""
+        query = query.lower()
+        with self.lock:
+            if query == self.query:
+                return
+            if not self.stale and query.startswith(self.query):
+                text = self.text
+                self.visible = [pid for pid in self.visible if query in text[pid]]
+            else:
+                self.stale = True
+            self.query = query
+
+    def _visible(self):
+        if self.stale:
+            order = reversed(self.order) if self.descending else self.order
+            query = self.query
+            if query:
+                text = self.text
+                self.visible = [pid for _, pid in order if query in text[pid]]
+            else:
+                self.visible = [pid for _, pid in order]
+            self.stale = False
+        return self.visible
+
+    def window(self, offset, count):
+        """The count entries starting at row offset of the sorted, filtered list"""
+        with self.lock:
+            entries = self.entries
+            return [entries[pid] for pid in self._visible()[offset:offset + count]]
+
+    def total(self):
+        """Number of processes, filtered or not"""
+        return len(self.entries)
+
+    def __len__(self):
+        with self.lock:
+            return len(self._visible())
+
+
+class DiskCollector:
+    """Filesystem usage and per-device I/O that a hung mount can't block
+
+    statvfs runs in a small thread pool and each refresh waits at most
+    `timeout` seconds. A mount that doesn't answer in time keeps showing
+    its last known usage, marked stale, and is not queried again until
+    its outstanding call returns.
+    """
+
+    def __init__(self, timeout=0.5, workers=4):
+        self.timeout = timeout
+        self.workers = workers
+        self.executor = None  # Started on first use, so views without disks skip it
+        self.cache = {}     # mountpoint -> (usage, monotonic time)
+        self.inflight = {}  # mountpoint -> Future still waiting on the kernel
+        self.lock = threading.Lock()
+        self._prev_io = None
+        self._io_rates = {}
+
+    def partitions(self):
+        """Usage of every real filesystem; slow mounts come back stale"""
+        from concurrent.futures import ThreadPoolExecutor, wait
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                   thread_name_prefix='sysinfo-statvfs')
+            mounts = [p for p in psutil.disk_partitions() if p.fstype]
+            futures = {}
+            for part in mounts:
+                future = self.inflight.get(part.mountpoint)
+                if future is None:
+                    future = self.executor.submit(psutil.disk_usage, part.mountpoint)
+                    self.inflight[part.mountpoint] = future
+                futures[part.mountpoint] = future
+            wait(futures.values(), timeout=self.timeout)
+
+            now = time.monotonic()
+            result = []
+            for part in mounts:
+                mountpoint = part.mountpoint
+                future = futures[mountpoint]
+                entry = {'device': part.device, 'fstype': part.fstype,
+                         'mountpoint': mountpoint, 'stale': False}
+                if future.done():
+                    del self.inflight[mountpoint]
+                    try:
+                        self.cache[mountpoint] = (future.result(), now)
+                    except OSError:
+                        self.cache.pop(mountpoint, None)
+                        continue
+                else:
+                    entry['stale'] = True
+                cached = self.cache.get(mountpoint)
+                if cached is None:
+                    usage = None
+                else:
+                    usage, taken = cached
+                    entry['age'] = now - taken
+                entry.update(total=usage.total if usage else 0,
+                             used=usage.used if usage else 0,
+                             free=usage.free if usage else 0,
+                             percent=usage.percent if usage else 0.0)
+                result.append(entry)
+            return result
+
+    def io_rates(self):
+        """Per-device throughput, IOPS and busy% since the previous call"""
+        with self.lock:
+            now = time.monotonic()
+            counters = psutil.disk_io_counters(perdisk=True) or {}
+            prev = self._prev_io
+            if prev is not None and now - prev[0] < 0.05:
+                return self._io_rates
+            rates = {}
+            for name, cur in counters.items():
+                old = prev[1].get(name) if prev else None
+                elapsed = now - prev[0] if prev else 0.0
+                if old is None or elapsed <= 0:
+                    rates[name] = dict.fromkeys(
+                        ('read_bytes_per_s', 'write_bytes_per_s', 'read_iops',
+                         'write_iops', 'busy_percent'), 0.0)
+                    continue
+                busy = _rate(cur, old, 'busy_time', elapsed) / 10 \
+                    if hasattr(cur, 'busy_time') else 0.0
+                rates[name] = {
+                    'read_bytes_per_s': _rate(cur, old, 'read_bytes', elapsed),
+                    'write_bytes_per_s': _rate(cur, old, 'write_bytes', elapsed),
+                    'read_iops': _rate(cur, old, 'read_count', elapsed),
+                    'write_iops': _rate(cur, old, 'write_count', elapsed),
+                    'busy_percent': min(busy, 100.0),
+                }
+            self._prev_io = (now, counters)
+            self._io_rates = rates
+            return rates
+
+
+def parse_pressure(data):
+    """/proc/pressure/* -> {'some': (avg10, avg60, avg300), 'full': (...)}"""
+    result = {}
+    for line in data.split(b'\n'):
+        parts = line.split()
+        if len(parts) >= 4:
+            result[parts[0].decode()] = tuple(float(p.partition(b'=')[2]) for p in parts[1:4])
+    return result
+
+
+class MemoryPressure:
+    """Where memory goes and whether the host is short of it
+
+    The full /proc/meminfo breakdown, PSI averages from /proc/pressure and
+    paging, swapping and major-fault rates from /proc/vmstat deltas. The
+    files stay open and are re-read with pread like ProcFastPath's. Each
+    part is None where the kernel doesn't provide it (no PSI before 4.20,
+    or psi=0), and all of them are None off Linux.
+    """
+
+    BREAKDOWN = (b'MemTotal', b'MemFree', b'MemAvailable', b'Buffers', b'Cached',
+                 b'SwapCached', b'Active', b'Inactive', b'AnonPages', b'Mapped',
+                 b'Shmem', b'Slab', b'SReclaimable', b'SUnreclaim', b'KernelStack',
+                 b'PageTables', b'Dirty', b'Writeback', b'AnonHugePages',
+                 b'HugePages_Total', b'HugePages_Free', b'HugePages_Rsvd',
+                 b'Hugepagesize', b'CommitLimit', b'Committed_AS')
+    # /proc/vmstat counter -> (rate name, scale: KiB, pages or plain events)
+    VMSTAT = {b'pgpgin': ('page_in_bytes_per_s', 1024), b'pgpgout': ('page_out_bytes_per_s', 1024),
+              b'pswpin': ('swap_in_bytes_per_s', 'page'), b'pswpout': ('swap_out_bytes_per_s', 'page'),
+              b'pgmajfault': ('major_faults_per_s', 1), b'pgfault': ('faults_per_s', 1)}
+
+    def __init__(self, proc_root='/proc'):
+        self.lock = threading.Lock()
+        self.page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+        self.meminfo = self._open(f"{proc_root}/meminfo")
+        self.vmstat = self._open(f"{proc_root}/vmstat")
+        self.psi = {name: self._open(f"{proc_root}/pressure/{name}")
+                    for name in ('cpu', 'memory', 'io')}
+        self._prev = None
+        self._rates = None
+
+    @staticmethod
+    def _open(path):
+        if not hasattr(os, 'preadv'):
+            return None
+        try:
+            return ProcFile(path)
+        except OSError:
+            return None
+
+    def breakdown(self):
+        """{field: bytes} (HugePages_* are page counts), or None"""
+        if self.meminfo is None:
+            return None
+        fields = parse_meminfo(self.meminfo.read(), self.BREAKDOWN)
+        return {name.decode(): value for name, value in fields.items()}
+
+    def pressure(self):
+        """{'cpu'|'memory'|'io': {'some'|'full': (avg10, avg60, avg300)}}, or None"""
+        result = {}
+        for name, f in self.psi.items():
+            if f is None:
+                continue
+            try:
+                result[name] = parse_pressure(f.read())
+            except OSError:
+                pass  # EOPNOTSUPP when booted with psi=0
+        return result or None
+
+    def paging(self):
+        """Paging, swapping and fault rates since the previous call, or None"""
+        if self.vmstat is None:
+            return None
+        with self.lock:
+            now = time.monotonic()
+            if self._prev is not None and now - self._prev[0] < 0.05:
+                return self._rates
+            counters = {}
+            for line in self.vmstat.read().split(b'\n'):
+                name, _, value = line.partition(b' ')
+                if name in self.VMSTAT:
+                    counters[name] = int(value)
+            rates = {}
+            for name, (key, scale) in self.VMSTAT.items():
+                rate = 0.0
+                if self._prev is not None and name in counters and name in self._prev[1]:
+                    rate = max(counters[name] - self._prev[1][name], 0) / (now - self._prev[0])
+                rates[key] = rate * (self.page_size if scale == 'page' else scale)
+            self._prev = (now, counters)
+            self._rates = rates
+            return rates
+
+
+def _read_sysfs(path):
+    """Contents of a small sysfs file, stripped, or None"""
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_number(path, scale=1):
+    """A sysfs number divided by scale, or None"""
+    try:
+        return int(_read_sysfs(path)) / scale
+    except (TypeError, ValueError):
+        return None
+
+
+def raise_open_file_limit(cpus=None):
+    """Raise the soft open-file limit to fit ThermalMonitor's files for `cpus` CPUs
+
+    Called once by the front ends at startup, never by the collectors.
+    The hard limit is left alone. Returns the new soft limit, or None if
+    it was left as it was.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    wanted = 2 * (cpus or os.cpu_count() or 1) + 1024  # Headroom for process scans and sockets
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft == resource.RLIM_INFINITY or soft >= wanted:
+            return None
+        if hard != resource.RLIM_INFINITY:
+            wanted = min(wanted, hard)
+        if wanted <= soft:
+            return None
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+        return wanted
+    except (ValueError, OSError):
+        return None
+
+
+class ThermalMonitor:
+    """Per-CPU clock speed, thermal throttling and temperature sensors
+
+    Each CPU's cpufreq/scaling_cur_freq, the thermal_throttle counters and
+    the hwmon (or thermal zone) temperature inputs are opened once and
+    re-read with pread, so a sample of a 256-CPU host is a few hundred
+    small reads and no directory walks. Throttle counters are shared by
+    the hyperthreads of a core and opened once per core. That is about
+    two files per CPU, which the front ends make room for with
+    raise_open_file_limit(). Off Linux, temperatures come from
+    psutil.sensors_temperatures() and there are no per-CPU clocks or
+    throttle counters.
+    """
+
+    def __init__(self, sys_root='/sys'):
+        self.lock = threading.Lock()
+        self.cpus = []      # (cpu, scaling_cur_freq file, max MHz, core key)
+        self.cores = {}     # (package, core) -> throttle count file
+        self.packages = {}  # package -> (count file, total time file)
+        self.sensors = []   # (chip, device, label, input file, high, critical)
+        self.fallback = False
+        self._prev = None
+        self._result = None
+        if hasattr(os, 'preadv') and os.path.isdir(f"{sys_root}/devices/system/cpu"):
+            self._open_cpus(f"{sys_root}/devices/system/cpu")
+            self._open_sensors(sys_root)
+        else:
+            self.fallback = hasattr(psutil, 'sensors_temperatures')
+
+    @staticmethod
+    def _open(path):
+        try:
+            return ProcFile(path, size=64)
+        except OSError:
+            return None
+
+    def _open_cpus(self, cpu_dir):
+        try:
+            numbers = sorted(int(name[3:]) for name in os.listdir(cpu_dir)
+                             if name.startswith('cpu') and name[3:].isdigit())
+        except OSError:
+            return
+        for cpu in numbers:
+            base = f"{cpu_dir}/cpu{cpu}"
+            package = _read_number(f"{base}/topology/physical_package_id")
+            core = _read_number(f"{base}/topology/core_id")
+            key = (int(package or 0), int(core if core is not None else -1 - cpu))
+            if key not in self.cores:
+                self.cores[key] = self._open(f"{base}/thermal_throttle/core_throttle_count")
+            if key[0] not in self.packages:
+                self.packages[key[0]] = (
+                    self._open(f"{base}/thermal_throttle/package_throttle_count"),
+                    self._open(f"{base}/thermal_throttle/package_throttle_total_time_ms"))
+            self.cpus.append((cpu, self._open(f"{base}/cpufreq/scaling_cur_freq"),
+                              _read_number(f"{base}/cpufreq/cpuinfo_max_freq", 1000) or 0.0, key))
+        self.cores = {key: f for key, f in self.cores.items() if f is not None}
+        self.packages = {key: files for key, files in self.packages.items() if files[0] is not None}
+        if not self.cores and all(freq is None for _, freq, _, _ in self.cpus):
+            self.cpus = []  # No cpufreq or throttle counters (typical in VMs)
+
+    def _open_sensors(self, sys_root):
+        hwmon = f"{sys_root}/class/hwmon"
+        try:
+            chips = sorted(os.listdir(hwmon), key=lambda name: int(name[5:] or 0))
+        except (OSError, ValueError):
+            chips = []
+        for device in chips:
+            chip = _read_sysfs(f"{hwmon}/{device}/name") or device
+            for base in (f"{hwmon}/{device}", f"{hwmon}/{device}/device"):
+                try:
+                    names = os.listdir(base)
+                except OSError:
+                    continue
+                inputs = [name[:-6] for name in names
+                          if name.startswith('temp') and name.endswith('_input')]
+                for prefix in sorted(inputs, key=lambda name: int(name[4:] or 0)):
+                    f = self._open(f"{base}/{prefix}_input")
+                    if f is not None:
+                        label = _read_sysfs(f"{base}/{prefix}_label") or prefix
+                        self.sensors.append((chip, device, label, f,
+                                             _read_number(f"{base}/{prefix}_max", 1000),
+                                             _read_number(f"{base}/{prefix}_crit", 1000)))
+        if self.sensors:
+            return
+        # No hwmon driver: fall back to the thermal zones, as psutil does
+        zones = f"{sys_root}/class/thermal"
+        try:
+            names = sorted(name for name in os.listdir(zones) if name.startswith('thermal_zone'))
+        except OSError:
+            names = []
+        for name in names:
+            f = self._open(f"{zones}/{name}/temp")
+            if f is not None:
+                self.sensors.append((_read_sysfs(f"{zones}/{name}/type") or name, name, name, f, None,
+                                     self._zone_critical(f"{zones}/{name}")))
+
+    @staticmethod
+    def _zone_critical(zone):
+        for i in range(16):
+            kind = _read_sysfs(f"{zone}/trip_point_{i}_type")
+            if kind is None:
+                return None
+            if kind == 'critical':
+                return _read_number(f"{zone}/trip_point_{i}_temp", 1000)
+        return None
+
+    @staticmethod
+    def _value(f):
+        if f is None:
+            return None
+        try:
+            return int(f.read())
+        except (OSError, ValueError):
+            return None  # CPU went offline, or the driver has no reading
+
+    def _rate(self, key, counters, now, scale=1):
+        if self._prev is None or counters.get(key) is None or self._prev[1].get(key) is None:
+            return 0.0
+        return max(counters[key] - self._prev[1][key], 0) * scale / (now - self._prev[0])
+
+    def sample(self):
+        """{'cpus': [...], 'packages': [...], 'sensors': [...]} with rates since the previous call"""
+        with self.lock:
+            now = time.monotonic()
+            if self._prev is not None and now - self._prev[0] < 0.05:
+                return self._result
+            counters = {}
+            for key, f in self.cores.items():
+                counters[key] = self._value(f)
+            for package, (count, total) in self.packages.items():
+                counters[package] = self._value(count)
+                counters[package, 'ms'] = self._value(total)
+            cpus = []
+            for cpu, freq, max_mhz, key in self.cpus:
+                khz = self._value(freq)
+                cpus.append({
+                    'cpu': cpu,
+                    'mhz': khz / 1000 if khz is not None else None,
+                    'max_mhz': max_mhz,
+                    'throttles': counters.get(key),
+                    'throttles_per_s': self._rate(key, counters, now),
+                })
+            packages = []
+            for package in self.packages:
+                share = None
+                if counters[package, 'ms'] is not None:
+                    share = min(self._rate((package, 'ms'), counters, now, 0.1), 100.0)
+                packages.append({'package': package, 'throttles': counters[package],
+                                 'throttles_per_s': self._rate(package, counters, now),
+                                 'throttled_percent': share})
+            self._prev = (now, counters)
+            self._result = {'cpus': cpus, 'packages': packages, 'sensors': self._temperatures()}
+            return self._result
+
+    def _temperatures(self):
+        if self.fallback:
+            try:
+                readings = psutil.sensors_temperatures()
+            except (OSError, RuntimeError):
+                return []
+            return [{'chip': chip, 'device': f"{chip}{i}", 'label': t.label or chip,
+                     'current': t.current, 'high': t.high, 'critical': t.critical}
+                    for chip, temps in readings.items() for i, t in enumerate(temps)]
+        sensors = []
+        for chip, device, label, f, high, critical in self.sensors:
+            value = self._value(f)
+            if value is not None:
+                sensors.append({'chip': chip, 'device': device, 'label': label, 'current': value / 1000,
+                                'high': high, 'critical': critical})
+        return sensors
+
+
+def cgroup2_root(mounts='/proc/self/mounts'):
+    """Where the cgroup v2 hierarchy is mounted, or None"""
+    try:
+        with open(mounts) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) > 2 and fields[2] == 'cgroup2':
+                    return fields[1]
+    except OSError:
+        pass
+    return None
+
+
+class CgroupCollector:
+    """CPU, memory, I/O and memory pressure per systemd unit, container or pod
+
+    Reads the cgroup v2 files directly. The tree is walked down to the
+    first cgroup that is a service, scope, container or pod (or a leaf) and
+    those units are reported; their counters already include everything
+    below them. The walk is redone every `rescan` seconds, in between only
+    the units' stat files are read. Each process's cgroup is read from
+    /proc/<pid>/cgroup once and kept on its ProcessTable entry.
+    """
+
+    CONTAINER = re.compile(r'(?:docker|cri-containerd|crio|libpod)-([0-9a-f]{12,})\.scope$|^([0-9a-f]{64})$')
+    POD = re.compile(r'pod([0-9a-f]{8}[0-9a-f_-]*?)(?:\.slice)?$')
+
+    def __init__(self, root=None, proc_root='/proc', rescan=5.0):
+        self.root = root if root is not None else cgroup2_root()
+        self.proc_root = proc_root
+        self.rescan = rescan
+        self.lock = threading.Lock()
+        self.units = {}      # cgroup path -> (name, kind)
+        self.scanned = None
+        self._unit_of = {}   # cgroup path -> unit path, memoized between rescans
+        self._prev = {}      # unit path -> (monotonic time, usage_usec, rbytes, wbytes)
+        self._rows = []
+        self._at = None
+
+    def classify(self, name):
+        """(display name, kind) for a cgroup directory name, or None for a plain one"""
+        match = self.CONTAINER.search(name)
+        if match:
+            return f"container {(match.group(1) or match.group(2))[:12]}", 'container'
+        match = self.POD.search(name)
+        if match:
+            return f"pod {match.group(1).replace('_', '-')}", 'pod'
+        if name.endswith('.service'):
+            return name[:-len('.service')], 'service'
+        if name.endswith('.scope'):
+            return name[:-len('.scope')], 'scope'
+        return None
+
+    def _walk(self, path, depth):
+        directory = self.root + path
+        try:
+            children = [e.name for e in os.scandir(directory) if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        if not children and path:
+            self.units[path] = (path.rsplit('/', 1)[-1], 'cgroup')
+            return
+        for name in children:
+            child = f"{path}/{name}"
+            unit = self.classify(name)
+            if unit is not None or depth >= 8:
+                self.units[child] = unit or (name, 'cgroup')
+            else:
+                self._walk(child, depth + 1)
+
+    def unit_of(self, path):
+        """The reported unit a process's cgroup path belongs to, or None"""
+        unit = self._unit_of.get(path, False)
+        if unit is False:
+            unit = path
+            while unit and unit not in self.units:
+                unit = unit.rpartition('/')[0]
+            unit = self._unit_of[path] = unit or None
+        return unit
+
+    def _read_cgroup(self, pid):
+        try:
+            with open(f"{self.proc_root}/{pid}/cgroup") as f:
+                for line in f:
+                    if line.startswith('0::'):
+                        return line[3:].strip()
+        except OSError:
+            pass
+        return ''
+
+    def _stats(self, path):
+        """(usage_usec, memory bytes, rbytes, wbytes, pressure) or None if it's gone"""
+        directory = self.root + path
+        try:
+            with open(f"{directory}/cpu.stat") as f:
+                usage = int(f.readline().split()[1])  # usage_usec is always first
+        except (OSError, IndexError, ValueError):
+            return None
+        memory = rbytes = wbytes = pressure = None
+        try:
+            with open(f"{directory}/memory.current") as f:
+                memory = int(f.read())
+        except (OSError, ValueError):
+            pass
+        try:
+            with open(f"{directory}/io.stat") as f:
+                rbytes = wbytes = 0
+                for line in f:
+                    for field in line.split()[1:]:
+                        key, _, value = field.partition('=')
+                        if key == 'rbytes':
+                            rbytes += int(value)
+                        elif key == 'wbytes':
+                            wbytes += int(value)
+        except (OSError, ValueError):
+            pass
+        try:
+            with open(f"{directory}/memory.pressure") as f:
+                pressure = float(f.readline().split()[1].partition('=')[2])  # some avg10
+        except (OSError, IndexError, ValueError):
+            pass
+        return usage, memory, rbytes, wbytes, pressure
+
+    def refresh(self, process_table=None):
+        """One row per unit with rates since the previous call, busiest first"""
+        if self.root is None:
+            return []
+        with self.lock:
+            now = time.monotonic()
+            if self._at is not None and now - self._at < 0.05:
+                return self._rows
+            if self.scanned is None or now - self.scanned >= self.rescan:
+                self.units = {}
+                self._unit_of = {}
+                self._walk('', 0)
+                self.scanned = now
+            procs = {}
+            if process_table is not None:
+                with process_table.lock:
+                    for entry in process_table.entries.values():
+                        if entry.cgroup is None:
+                            entry.cgroup = self._read_cgroup(entry.pid)
+                        unit = self.unit_of(entry.cgroup)
+                        if unit is None:
+                            continue
+                        count, top = procs.get(unit, (0, None))
+                        if top is None or entry.cpu_percent > top.cpu_percent:
+                            top = entry
+                        procs[unit] = (count + 1, top)
+            rows = []
+            prev = self._prev
+            current = {}
+            for path, (name, kind) in self.units.items():
+                stats = self._stats(path)
+                if stats is None:
+                    continue  # Removed since the last rescan
+                usage, memory, rbytes, wbytes, pressure = stats
+                current[path] = (now, usage, rbytes, wbytes)
+                cpu = read = write = 0.0
+                old = prev.get(path)
+                if old is not None and now > old[0]:
+                    elapsed = now - old[0]
+                    cpu = max(usage - old[1], 0) / elapsed / 1e4  # usec/s -> %
+                    if rbytes is not None and old[2] is not None:
+                        read = max(rbytes - old[2], 0) / elapsed
+                        write = max(wbytes - old[3], 0) / elapsed
+                count, top = procs.get(path, (0, None))
+                rows.append({'path': path, 'name': name, 'kind': kind, 'cpu_percent': cpu,
+                             'memory': memory, 'read_bytes_per_s': read,
+                             'write_bytes_per_s': write, 'pressure': pressure,
+                             'procs': count, 'top': top.name if top else None})
+            self._prev = current
+            rows.sort(key=lambda row: (row['cpu_percent'], row['memory'] or 0), reverse=True)
+            self._rows = rows
+            self._at = now
+            return rows
+
+
+def boot_id():
+    """The kernel's random ID for this boot, or None if it isn't available"""
+    try:
+        with open('/proc/sys/kernel/random/boot_id') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def facts_cache_dir():
+    base = os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('XDG_CACHE_HOME') \
+        or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'sysinfo')
+
+
+_host_facts = None
+
+
+def host_facts(cache_dir=None):
+    """Facts that can't change while the machine is up, computed once
+
+    Kept for the life of the process, and the costly ones (the `uname -p`
+    subprocess behind platform.processor(), the sysfs walk behind
+    cpu_count(logical=False), boot time, maximum frequency) are also saved
+    per boot ID, so later runs such as a cron'd --once skip them. The
+    hostname is always read fresh at startup since it can be changed
+    without a reboot.
+    """
+    global _host_facts
+    if _host_facts is not None:
+        return _host_facts
+    uname = os.uname()
+    facts = {'system': uname.sysname, 'release': uname.release, 'hostname': uname.nodename}
+    boot = boot_id()
+    path = os.path.join(cache_dir or facts_cache_dir(), f'facts-{boot}.json') if boot else None
+    saved = None
+    if path:
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            pass
+    if not isinstance(saved, dict) or saved.get('release') != uname.release:
+        import platform
+        freq = psutil.cpu_freq()
+        saved = {
+            'release': uname.release,
+            'processor': platform.processor(),
+            'boot_time': psutil.boot_time(),
+            'cores_physical': psutil.cpu_count(logical=False),
+            'cores_logical': psutil.cpu_count(logical=True),
+            'freq_max': freq.max if freq else 0.0,
+        }
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+                tmp = f'{path}.{os.getpid()}'
+                with open(tmp, 'w') as f:
+                    json.dump(saved, f)
+                os.replace(tmp, path)
+                # Facts from earlier boots are never read again
+                for name in os.listdir(os.path.dirname(path)):
+                    if name.startswith('facts-') and name != os.path.basename(path):
+                        os.unlink(os.path.join(os.path.dirname(path), name))
+            except OSError:
+                pass  # Read-only home; the in-memory copy still works
+    saved.update(facts)
+    _host_facts = saved
+    return saved
+
+
+class Task:
+    """One collector run by the Scheduler at its own interval"""
+
+    __slots__ = ('name', 'fn', 'base', 'longest', 'on_demand', 'interval', 'cost',
+                 'result', 'last_run', 'next_run', 'wanted', 'lock')
+
+    def __init__(self, name, fn, interval, longest, on_demand):
+        self.name = name
+        self.fn = fn
+        self.base = interval
+        self.longest = max(longest, interval)
+        self.on_demand = on_demand
+        self.interval = interval
+        self.cost = None       # CPU seconds per run, smoothed
+        self.result = None
+        self.last_run = None
+        self.next_run = 0.0
+        self.wanted = None     # monotonic time a view last asked for the result
+        self.lock = threading.Lock()
+
+
+class Scheduler(threading.Thread):
+    """Runs each collector at its own interval, within a CPU budget
+
+    Every task has a base interval and a measured cost (CPU seconds per
+    run, smoothed). Once a second the scheduler compares sysinfo's own CPU
+    use with `budget` (a share of one core) and, while it is over, stretches
+    the intervals of the tasks that allow it, in proportion, up to each
+    task's `longest`. They shrink back as soon as there is room. On-demand
+    tasks only run while a view keeps asking for their result; the first
+    request after a pause runs them synchronously so nothing shows stale.
+    """
+
+    DEMAND_GRACE = 5.0  # seconds an on-demand task keeps running after the last use()
+
+    def __init__(self, budget=0.05):
+        super().__init__(name='sysinfo-scheduler', daemon=True)
+        self.budget = budget
+        self.tasks = {}
+        self.factor = 1.0
+        self.process_load = 0.0  # sysinfo's CPU use, cores, smoothed
+        self._cpu_prev = None
+        self._balanced = 0.0
+        self._stop_event = threading.Event()
+
+    def add(self, name, fn, interval, longest=None, on_demand=False):
+        self.tasks[name] = Task(name, fn, interval, longest or interval, on_demand)
+
+    def use(self, name, force=False):
+        """Latest result of a task, running it now if it never ran or is overdue"""
+        task = self.tasks[name]
+        now = time.monotonic()
+        task.wanted = now
+        if force or task.last_run is None or now - task.last_run > task.interval * 1.5:
+            self._run(task)
+        return task.result
+
+    def _active(self, task, now):
+        return not task.on_demand or (task.wanted is not None
+                                      and now - task.wanted < self.DEMAND_GRACE + task.interval)
+
+    def _run(self, task):
+        with task.lock:
+            start = time.thread_time()
+            try:
+                task.result = task.fn()
+            except (OSError, psutil.Error):
+                pass  # Keep the last result; try again next interval
+            cost = time.thread_time() - start
+            task.cost = cost if task.cost is None else task.cost * 0.7 + cost * 0.3
+            task.last_run = time.monotonic()
+            task.next_run = task.last_run + task.interval
+
+    def run(self):
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            if now - self._balanced >= 1.0:
+                self.rebalance(now)
+            due = [task for task in self.tasks.values() if self._active(task, now)]
+            task = min(due, key=lambda task: task.next_run, default=None)
+            if task is None or task.next_run > now:
+                # Wake at least twice a second to notice new demand and rebalance
+                wait = 0.5 if task is None else min(task.next_run - now, 0.5)
+                self._stop_event.wait(wait)
+                continue
+            self._run(task)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def rebalance(self, now):
+        """Stretch or relax intervals so sysinfo stays within its budget"""
+        t = os.times()
+        cpu = t.user + t.system
+        if self._cpu_prev is not None:
+            load = (cpu - self._cpu_prev[1]) / (now - self._cpu_prev[0])
+            self.process_load = self.process_load * 0.5 + load * 0.5
+        self._cpu_prev = (now, cpu)
+        self._balanced = now
+
+        tasks = [task for task in self.tasks.values()
+                 if task.cost is not None and self._active(task, now)]
+        fixed = sum(task.cost / task.base for task in tasks if task.longest == task.base)
+        flexible = sum(task.cost / task.base for task in tasks if task.longest > task.base)
+        running = sum(task.cost / task.interval for task in tasks)
+        # Rendering, the GUI and the rest aren't tasks; leave room for them
+        other = max(self.process_load - running, 0.0)
+        room = self.budget - other - fixed
+        if flexible <= 0 or flexible <= room:
+            self.factor = 1.0
+        elif room <= 0:
+            self.factor = math.inf
+        else:
+            self.factor = flexible / room
+        for task in self.tasks.values():
+            task.interval = min(task.base * self.factor, task.longest)
+
+    def summary(self):
+        """One line: each task's interval and cost, and the load against the budget"""
+        parts = []
+        for task in self.tasks.values():
+            if task.cost is None:
+                continue
+            stretched = "↑" if task.interval > task.base * 1.01 else ""
+            parts.append(f"{task.name} {task.interval:.3g}s{stretched}/{task.cost * 1000:.1f}ms")
+        return (f"Scheduler: {self.process_load * 100:.1f}% of a core "
+                f"(budget {self.budget * 100:g}%)  " + "  ".join(parts))
+
+
+class CollectionEngine:
+    """Runs collectors concurrently, each within its own deadline
+
+    Every call goes to a small thread pool and the caller waits for each
+    one only until its deadline, so a batch takes as long as its slowest
+    deadline instead of the sum of all the calls. As with DiskCollector's
+    mounts, a collector that overruns comes back as its last answer
+    (dicts marked stale, with their age) and is not started again until
+    its outstanding call returns; one that never answered comes back as
+    None. A collector that raises is treated the same way, with the error
+    kept for note(), so one failing section doesn't cost the others.
+    """
+
+    DEADLINES = {'overview': 0.5, 'cpu': 0.5, 'cpu_data': 0.5, 'memory': 0.5, 'disk': 1.0,
+                 'diskio': 0.5, 'network': 0.5, 'process': 2.0, 'cgroups': 2.0, 'proclist': 2.0,
+                 'thermal': 0.5}
+    DEFAULT_DEADLINE = 1.0
+
+    def __init__(self, deadlines=None, workers=8):
+        self.deadlines = dict(self.DEADLINES, **(deadlines or {}))
+        self.workers = workers
+        self.executor = None  # Started on first use
+        self.results = {}   # name -> (last answer, monotonic time)
+        self.inflight = {}  # name -> Future still running
+        self.late = {}      # name -> age of the answer returned instead (None: no answer yet)
+        self.errors = {}    # name -> exception from its last finished call, if it raised
+        self.lock = threading.Lock()
+
+    def deadline(self, name):
+        return self.deadlines.get(name, self.DEFAULT_DEADLINE)
+
+    def collect(self, calls):
+        """{name: fn} -> {name: result}, waiting for each fn until its deadline
+
+        Cached answers and running calls are shared by name, so a name must
+        always stand for the same kind of result. A collector that raised
+        gets its last answer (or None), like one that overran.
+        """
+        from concurrent.futures import ThreadPoolExecutor, wait
+        start = time.monotonic()
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                   thread_name_prefix='sysinfo-engine')
+            futures = {}
+            for name, fn in calls.items():
+                future = self.inflight.get(name)
+                if future is None:
+                    future = self.executor.submit(fn)
+                    self.inflight[name] = future
+                futures[name] = future
+        for name in sorted(futures, key=self.deadline):
+            wait([futures[name]], timeout=max(start + self.deadline(name) - time.monotonic(), 0))
+
+        results = {}
+        with self.lock:
+            now = time.monotonic()
+            for name, future in futures.items():
+                if future.done():
+                    if self.inflight.get(name) is future:
+                        del self.inflight[name]
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        self.errors[name] = e
+                    else:
+                        self.late.pop(name, None)
+                        self.errors.pop(name, None)
+                        self.results[name] = (value, now)
+                        results[name] = value
+                        continue
+                cached = self.results.get(name)
+                if cached is None:
+                    self.late[name] = None
+                    results[name] = None
+                    continue
+                value, taken = cached
+                self.late[name] = now - taken
+                if isinstance(value, dict):
+                    value = dict(value, stale=True, age=now - taken)
+                results[name] = value
+        return results
+
+    def note(self, name):
+        """Why name's last result wasn't fresh, or None if it was"""
+        if name not in self.late:
+            return None
+        age = self.late[name]
+        error = self.errors.get(name)
+        if error is not None:
+            if age is None:
+                return f"failed: {error}"
+            return f"failed: {error}; last answer {age:.0f}s ago"
+        if age is None:
+            return f"no answer within {self.deadline(name):g}s"
+        return f"stale, last answer {age:.0f}s ago"
+
+
+class DataSource:
+    """Structured data behind every view, shared by all front-ends
+
+    Each method returns plain dicts/lists of numbers and strings, which the
+    TUI and GUI format for display and the headless modes serialize.
+    """
+
+    SECTIONS = ('overview', 'cpu', 'memory', 'disk', 'diskio', 'network', 'process', 'cgroups',
+                'thermal')
+
+    def __init__(self, collector, process_table, disks=None):
+        self.collector = collector
+        self.process_table = process_table
+        self.disks = disks if disks is not None else DiskCollector()
+        self.topology = None
+        self.cgroup_collector = None
+        self.memory_pressure = None
+        self.paging_rates = None  # Taken by a collector observer once memory_pressure is open
+        self.thermal_monitor = None
+        self.process_index = None
+        self.scheduler = None
+        self.engine = None
+        self.lock = threading.Lock()  # Sections run concurrently; guards the lazy opens
+
+    def _lazy(self, attr, make):
+        """getattr(self, attr), set to make() on first use by exactly one thread"""
+        value = getattr(self, attr)
+        if value is None:
+            with self.lock:
+                value = getattr(self, attr)
+                if value is None:
+                    value = make()
+                    setattr(self, attr, value)
+        return value
+
+    def start(self, budget=0.05):
+        """Keep the data fresh in the background, each collector at its own rate
+
+        Counters follow the collector's interval; process and cgroup scans,
+        filesystem usage and CPU frequency run every few seconds, and only
+        while a view is using them. Intervals stretch to stay within
+        `budget` of one core.
+        """
+        interval = self.collector.interval
+        scheduler = self.scheduler = Scheduler(budget)
+        scheduler.add('counters', lambda: self.collector.sample(), interval, max(interval * 4, 2.0))
+        scheduler.add('processes', lambda: self.process_table.refresh(),
+                      max(interval, 2.0), 30.0, on_demand=True)
+        scheduler.add('cgroups', lambda: self._cgroup_collector().refresh(self.process_table),
+                      max(interval, 5.0), 60.0, on_demand=True)
+        scheduler.add('disks', lambda: self.disks.partitions(), max(interval, 5.0), 60.0, on_demand=True)
+        scheduler.add('cpufreq', psutil.cpu_freq, max(interval, 2.0), 30.0, on_demand=True)
+        scheduler.start()
+        return scheduler
+
+    def stop(self):
+        if self.scheduler is not None:
+            self.scheduler.stop()
+
+    def resample(self, delay=0.25):
+        """Take a second sample after a short delay
+
+        Used by one-shot modes, where the collector has only its initial
+        sample and CPU% and rates would otherwise cover no interval. A
+        delay of 0 skips the second sample: CPU% is then the average since
+        boot and rates read 0, which is what keeps cron'd runs fast.
+        """
+        if delay > 0:
+            self.memstat().paging()  # Baseline for the paging rates
+            time.sleep(delay)
+            self.collector.sample()
+            self.process_table.refresh()
+
+    def memstat(self):
+        """MemoryPressure for this host, opened on first use"""
+        return self._lazy('memory_pressure', self._open_memstat)
+
+    def _open_memstat(self):
+        memstat = MemoryPressure(self.process_table.proc_root)
+
+        def sample_paging(collector, now):
+            self.paging_rates = memstat.paging()
+        self.collector.observers.append(sample_paging)
+        return memstat
+
+    def paging(self):
+        """Paging rates over the collector's last interval
+
+        Taken once per collector sample, so every view that shows them
+        agrees and none of them gets a rate over the few milliseconds
+        since another view's redraw. Until the first sample after opening,
+        this takes the baseline (all rates 0).
+        """
+        memstat = self.memstat()
+        rates = self.paging_rates
+        return memstat.paging() if rates is None else rates
+
+    def overview(self):
+        mem = self.collector.latest['memory']
+        facts = host_facts()
+        memstat = self.memstat()
+        return {
+            'system': facts['system'],
+            'release': facts['release'],
+            'hostname': facts['hostname'],
+            'processor': facts['processor'],
+            'boot_time': facts['boot_time'],
+            'uptime': time.time() - facts['boot_time'],
+            'cores_physical': facts['cores_physical'],
+            'cores_logical': facts['cores_logical'],
+            'memory': mem._asdict(),
+            'pressure': memstat.pressure(),
+            'paging': self.paging(),
+        }
+
+    def thermals(self):
+        """ThermalMonitor for this host, opened on first use"""
+        return self._lazy('thermal_monitor', ThermalMonitor)
+
+    def cpu_topology(self):
+        """CpuTopology of this host, read from sysfs on first use"""
+        return self._lazy('topology', CpuTopology)
+
+    def cpu(self):
+        facts = host_facts()
+        freq = self.scheduler.use('cpufreq') if self.scheduler else psutil.cpu_freq()
+        total, percpu = self.collector.latest['cpu']
+        return {
+            'cores_physical': facts['cores_physical'],
+            'cores_logical': facts['cores_logical'],
+            'freq_current': freq.current if freq else 0.0,
+            'freq_max': facts['freq_max'],
+            'percent': total,
+            'percpu': percpu,
+            'ids': list(self.collector.cpu_sampler.ids),
+        }
+
+    def memory(self):
+        latest = self.collector.latest
+        memstat = self.memstat()
+        return {
+            'memory': latest['memory']._asdict(),
+            'swap': latest['swap']._asdict(),
+            'breakdown': memstat.breakdown(),
+            'pressure': memstat.pressure(),
+            'paging': self.paging(),
+        }
+
+    def disk(self):
+        rates = self.collector.latest['rates']
+        return {
+            'partitions': self.scheduler.use('disks') if self.scheduler else self.disks.partitions(),
+            'read_bytes_per_s': rates['disk_read'],
+            'write_bytes_per_s': rates['disk_write'],
+        }
+
+    def diskio(self):
+        rates = self.disks.io_rates()
+        return {'devices': [dict(name=name, **r) for name, r in sorted(rates.items())]}
+
+    def network(self):
+        latest = self.collector.latest
+        with self.collector.lock:
+            interfaces = self.collector.net_rates.addresses()
+        return {
+            'interfaces': interfaces,
+            'nics': latest['nics'],
+            'io': latest['net_io']._asdict(),
+            'sent_bytes_per_s': latest['rates']['net_sent'],
+            'recv_bytes_per_s': latest['rates']['net_recv'],
+        }
+
+    DETAIL_LISTS = (('top_read', 'read_bytes_per_s'), ('top_write', 'write_bytes_per_s'),
+                    ('top_syscr', 'syscr_per_s'), ('top_syscw', 'syscw_per_s'),
+                    ('top_fds', 'fds'), ('top_threads', 'threads'),
+                    ('top_ctx', 'ctx_switches_per_s'))
+
+    def _refresh_processes(self, max_age, detail):
+        table = self.process_table
+        if self.scheduler is None:
+            table.refresh(max_age=max_age, detail=detail)
+        else:
+            newly = detail and table.enable_detail()
+            self.scheduler.use('processes', force=newly)
+
+    def process(self, k=10, max_age=0.0, detail=False):
+        table = self.process_table
+        self._refresh_processes(max_age, detail)
+
+        if detail:
+            def row(e):
+                return {'pid': e.pid, 'name': e.name, 'cpu_percent': e.cpu_percent,
+                        'memory_percent': e.memory_percent,
+                        'read_bytes_per_s': e.read_bytes_per_s,
+                        'write_bytes_per_s': e.write_bytes_per_s,
+                        'syscr_per_s': e.syscr_per_s, 'syscw_per_s': e.syscw_per_s,
+                        'fds': e.fds, 'threads': e.threads,
+                        'ctx_switches_per_s': e.ctx_switches_per_s}
+        else:
+            def row(e):
+                return {'pid': e.pid, 'name': e.name, 'cpu_percent': e.cpu_percent,
+                        'memory_percent': e.memory_percent}
+        data = {
+            'count': len(table),
+            'top_memory': [row(e) for e in table.top(k, 'memory_percent')],
+            'top_cpu': [row(e) for e in table.top(k, 'cpu_percent')],
+        }
+        if detail:
+            for name, key in self.DETAIL_LISTS:
+                data[name] = [row(e) for e in table.top(k, key)]
+        return data
+
+    def process_list(self, max_age=0.0):
+        """ProcessList of every process, caught up with the latest scan"""
+        self._refresh_processes(max_age, detail=True)
+        plist = self._lazy('process_index', lambda: ProcessList(self.process_table))
+        plist.sync()
+        return plist
+
+    def _cgroup_collector(self):
+        return self._lazy('cgroup_collector',
+                          lambda: CgroupCollector(proc_root=self.process_table.proc_root))
+
+    def cgroups(self, k=None, max_age=0.0):
+        collector = self._cgroup_collector()
+        if self.scheduler is None:
+            self.process_table.refresh(max_age=max_age)
+            rows = collector.refresh(self.process_table)
+        else:
+            self.scheduler.use('processes')
+            rows = self.scheduler.use('cgroups') or []
+        return {'available': collector.root is not None, 'groups': rows[:k]}
+
+    def thermal(self):
+        return self.thermals().sample()
+
+    def snapshot(self, sections=SECTIONS):
+        """Collect the requested sections concurrently into one record
+
+        A section that overruns its deadline or raises is its last answer
+        marked stale, or None if it never answered; 'stale' lists them and
+        'errors' gives the reason for the ones that raised.
+        """
+        engine = self._lazy('engine', CollectionEngine)
+        record = {'timestamp': time.time()}
+        record.update(engine.collect({name: getattr(self, name) for name in sections}))
+        stale = [name for name in sections if name in engine.late]
+        if stale:
+            record['stale'] = stale
+        errors = {name: str(engine.errors[name]) for name in stale if name in engine.errors}
+        if errors:
+            record['errors'] = errors
+        return record
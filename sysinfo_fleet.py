@@ -0,0 +1,239 @@
+"""
+sysinfo fleet - Watch many machines from one terminal
+Used by: sysinfo --agent PORT, sysinfo --fleet HOST:PORT ...
+
+An agent streams the same bytes a recording file holds: FILE_HEADER and
+the static host facts once per connection, then one record per interval.
+The aggregator connects to every agent concurrently with asyncio, keeps the
+last few minutes of records per host and serves them to the viewer through
+ReplaySource, so drilling into a host reuses the ordinary views.
+"""
+
+import asyncio
+import json
+import struct
+import threading
+import time
+from collections import deque
+
+from sysinfo_record import (FILE_HEADER, MAGIC, REC_HEADER, REC_MAGIC, VERSION, ReplaySource,
+                            file_header, snapshot_record, static_facts, unpack_record)
+
+HISTORY = 120                  # records kept per host
+WRITE_BUFFER_LIMIT = 1 << 20   # drop agent clients that stop reading
+MAX_BACKOFF = 30.0
+
+
+async def _agent(port, bind, interval):
+    from sysinfo_stream import make_source
+    source = make_source(interval)
+    header = file_header(static_facts())
+    clients = set()
+
+    async def handle(reader, writer):
+        writer.write(header)
+        clients.add(writer)
+        try:
+            await reader.read()  # Nothing is expected from the aggregator; wait for EOF
+        except (OSError, asyncio.CancelledError):
+            pass  # Client went away, or the agent is shutting down
+        finally:
+            clients.discard(writer)
+            writer.close()
+
+    try:
+        server = await asyncio.start_server(handle, bind, port)
+    except OSError as e:
+        raise SystemExit(f"sysinfo: cannot listen on {bind}:{port}: {e.strerror}")
+    actual = server.sockets[0].getsockname()[1]
+    print(f"sysinfo: agent listening on {bind}:{actual} (interval {interval:g}s)", flush=True)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tick = 0
+    async with server:
+        while True:
+            tick += 1
+            delay = start + tick * interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                tick += int(-delay / interval)  # Overran; skip missed ticks
+            # Keep sampling while nobody is connected, so the first record
+            # a new client gets has CPU% and rates over a real interval
+            await asyncio.to_thread(source.collector.sample)
+            if not clients:
+                continue
+            _, record = await asyncio.to_thread(snapshot_record, source)
+            for writer in list(clients):
+                if writer.transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+                    clients.discard(writer)
+                    writer.close()
+                else:
+                    writer.write(record)
+
+
+def run_agent(port, bind='127.0.0.1', interval=1.0):
+    """Serve binary snapshots to aggregators until interrupted"""
+    try:
+        asyncio.run(_agent(port, bind, interval))
+    except KeyboardInterrupt:
+        pass
+
+
+def parse_address(text):
+    """'host:port' (or '[v6]:port') -> (host, port)"""
+    host, sep, port = text.rpartition(':')
+    if not sep or not port.isdigit():
+        raise ValueError(f"expected HOST:PORT, got {text!r}")
+    return host.strip('[]') or '127.0.0.1', int(port)
+
+
+class HostFeed:
+    """Recording lookalike over the last HISTORY records from one agent"""
+
+    def __init__(self):
+        self.static = None
+        self.records = deque(maxlen=HISTORY)
+        self._pending_static = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def record(self, i):
+        return self.records[i]
+
+    def connected(self, static):
+        # Keep showing the old records until the new connection delivers one
+        self._pending_static = static
+
+    def append(self, record):
+        if self._pending_static is not None:
+            if self._pending_static != self.static:
+                self.records.clear()
+            self.static = self._pending_static
+            self._pending_static = None
+        self.records.append(record)
+
+
+class HostSource(ReplaySource):
+    """ReplaySource pinned to the newest record of a live feed"""
+
+    @property
+    def position(self):
+        return max(len(self.recording) - 1, 0)
+
+    @position.setter
+    def position(self, value):
+        pass
+
+
+class FleetHost:
+    """Connection state and data for one agent"""
+
+    def __init__(self, address):
+        self.address = address
+        self.label = f"{address[0]}:{address[1]}"
+        self.state = 'connecting'
+        self.error = ""
+        self.last_seen = 0.0
+        self.feed = HostFeed()
+        self.source = HostSource(self.feed)
+
+    def summary(self):
+        """Headline numbers for the fleet table, or None before the first record"""
+        if not len(self.feed):
+            return None
+        source = self.source
+        position = source.position
+        record = self.feed.record(position)
+        return {
+            'hostname': self.feed.static['hostname'],
+            'cpu': record['cpu'][0],
+            'cores': len(record['cpu'][1]),
+            'memory': record['memory'].percent,
+            'swap': record['swap'].percent,
+            'net_sent': source.series_value(position, 'net_sent'),
+            'net_recv': source.series_value(position, 'net_recv'),
+            'disk_read': source.series_value(position, 'disk_read'),
+            'disk_write': source.series_value(position, 'disk_write'),
+            'uptime': record['timestamp'] - self.feed.static['boot_time'],
+            'age': time.time() - self.last_seen,
+        }
+
+
+class Fleet:
+    """Keeps a connection open to every agent from a background event loop
+
+    Each host has its own connect and read timeout; a host that fails or
+    goes quiet is marked down and retried with exponential backoff, without
+    holding up the others.
+    """
+
+    def __init__(self, addresses, timeout=5.0):
+        self.hosts = [FleetHost(address) for address in addresses]
+        self.timeout = timeout
+        self.loop = None
+        self._stopping = None
+        self._thread = threading.Thread(target=self._run, name='sysinfo-fleet', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        if self.loop is not None and self._stopping is not None:
+            self.loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join(timeout=2)
+
+    def _run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        self.loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        tasks = [asyncio.create_task(self._watch(host)) for host in self.hosts]
+        await self._stopping.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _read(self, reader, n):
+        return await asyncio.wait_for(reader.readexactly(n), self.timeout)
+
+    async def _session(self, host):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(*host.address), self.timeout)
+        try:
+            magic, version, static_len = FILE_HEADER.unpack(await self._read(reader, FILE_HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("not a sysinfo agent")
+            host.feed.connected(json.loads(await self._read(reader, static_len)))
+            host.state = 'up'
+            host.error = ""
+            while True:
+                head = await self._read(reader, REC_HEADER.size)
+                magic, length = REC_HEADER.unpack_from(head)[:2]
+                if magic != REC_MAGIC or length < REC_HEADER.size:
+                    raise ValueError("corrupt record")
+                record = unpack_record(head + await self._read(reader, length - REC_HEADER.size), 0)
+                host.feed.append(record)
+                host.last_seen = time.time()
+        finally:
+            writer.close()
+
+    async def _watch(self, host):
+        backoff = 1.0
+        while True:
+            started = time.monotonic()
+            try:
+                await self._session(host)
+            except asyncio.TimeoutError:
+                host.error = "timed out"
+            except (OSError, EOFError, ValueError) as e:
+                host.error = str(e) or type(e).__name__
+            except struct.error:
+                host.error = "corrupt record"  # Truncated or garbled; reconnect
+            host.state = 'down'
+            if time.monotonic() - started > MAX_BACKOFF:
+                backoff = 1.0  # It was up for a while; retry promptly
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+            host.state = 'connecting'
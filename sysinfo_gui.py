@@ -4,20 +4,149 @@ sysinfo GUI - Interactive system information viewer with graphical interface
 Run: python3 sysinfo_gui.py
 """
 
-import tkinter as tk
-from tkinter import ttk
-import psutil
-import platform
-from datetime import datetime
+import argparse
+from datetime import datetime, timedelta
+import math
+import queue
 import threading
+import time
+
+from sysinfo_core import (CollectionEngine, DataSource, HistoryCollector, ProcessTable, format_age,
+                          heatmap_rows, memory_detail, pressure_summary, raise_open_file_limit,
+                          stale_note, thermal_detail)
+from sysinfo_profile import SelfStats
+
+# tkinter is imported in main() so --help and argument errors don't pay for it
+tk = ttk = None
+
+CHART_CORES = 64  # per-core charts up to this many CPUs; the heatmap covers the rest
+
+
+def _percent(value):
+    return f"{value:.1f}%"
+
+
+def _rate(value):
+    return f"{value / 1024**2:.2f} MB/s" if value >= 1024**2 else f"{value / 1024:.1f} KB/s"
+
+
+def _nice_ceiling(value):
+    """Smallest 1, 2 or 5 times a power of ten that is >= value, so scales don't jitter"""
+    magnitude = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if value <= step * magnitude:
+            return step * magnitude
+
+
+class Chart:
+    """A scrolling time-series chart on a Canvas, redrawn by moving its items
+
+    The frame, grid, labels, one line and one level bar per series are
+    created once. update() only calls coords() (and itemconfig() when a
+    label changed), so a redraw costs the same however long the GUI has
+    been running: `points` points per series.
+    """
+    
+    LEGEND_CHAR = 7  # approximate pixels per character of the legend font
+    
+    def __init__(self, canvas, x, y, width, height, series, title="", maximum=None,
+                 fmt=_percent, points=120):
+        self.canvas = canvas
+        self.maximum = maximum   # None: scale to the largest value shown
+        self.fmt = fmt
+        self.bottom = y + height
+        self.right = x + width
+        self.plot_height = height - 16  # leave the top line for the title and legend
+        step = width / (points - 1)
+        self.xs = [x + i * step for i in range(points)]
+        canvas.create_rectangle(x, y, x + width, y + height, outline="#cccccc", fill="#fafafa")
+        for fraction in (0.25, 0.5, 0.75):
+            level = self.bottom - self.plot_height * fraction
+            canvas.create_line(x, level, x + width, level, fill="#e4e4e4", dash=(2, 4))
+        canvas.create_text(x + 4, y + 2, anchor="nw", text=title, font=("Helvetica", 9, "bold"))
+        self.scale = canvas.create_text(x + width - 4, y + 2, anchor="ne", text="",
+                                        font=("Helvetica", 8), fill="#666666")
+        self.lines, self.bars, self.legend = [], [], []
+        legend_x = x + 12 + len(title) * self.LEGEND_CHAR
+        for label, color in series:
+            self.lines.append(canvas.create_line(x, self.bottom, x + width, self.bottom,
+                                                 fill=color, width=1.5))
+            # Current value as a bar just right of the plot
+            self.bars.append(canvas.create_rectangle(x + width + 2, self.bottom, x + width + 6,
+                                                     self.bottom, fill=color, outline=""))
+            self.legend.append(canvas.create_text(legend_x, y + 2, anchor="nw", text=label,
+                                                  fill=color, font=("Helvetica", 8)))
+            legend_x += (len(label) + 12) * self.LEGEND_CHAR
+        self.labels = {}  # item -> text shown, to skip unchanged itemconfig calls
+        
+    def _label(self, item, text):
+        if self.labels.get(item) != text:
+            self.canvas.itemconfig(item, text=text)
+            self.labels[item] = text
+        
+    def update(self, series_values, labels):
+        """Move each series' line to its latest values (oldest first)"""
+        canvas = self.canvas
+        points = len(self.xs)
+        series_values = [values[-points:] or [0.0] for values in series_values]
+        maximum = self.maximum
+        if maximum is None:
+            maximum = _nice_ceiling(max(max(values) for values in series_values) or 1024.0)
+            self._label(self.scale, self.fmt(maximum))
+        scale = self.plot_height / maximum
+        bottom = self.bottom
+        for line, bar, legend, label, values in zip(self.lines, self.bars, self.legend,
+                                                    labels, series_values):
+            if len(values) == 1:
+                values = values * 2  # A line needs two points
+            coords = []
+            for x, value in zip(self.xs[-len(values):], values):
+                coords.append(x)
+                coords.append(bottom - min(value, maximum) * scale)
+            canvas.coords(line, coords)
+            canvas.coords(bar, self.right + 2, coords[-1], self.right + 6, bottom)
+            self._label(legend, f"{label} {self.fmt(values[-1])}".lstrip())
 
 
 class SysInfoGUI:
-    def __init__(self, root):
+    TABS = ('overview', 'cpu', 'memory', 'disk', 'diskio', 'network', 'process', 'cgroups', 'thermal',
+            'proclist')
+    LIST_ROWS = 25  # process list rows; only these are ever filled in
+    LIST_COLUMNS = (
+        ('pid', "PID", 70, 'e'), ('user', "User", 90, 'w'), ('cpu', "CPU %", 70, 'e'),
+        ('memory', "RSS MB", 80, 'e'), ('io', "I/O MB/s", 80, 'e'), ('age', "Age", 80, 'e'),
+        ('name', "Command", 500, 'w'),
+    )
+    
+    def __init__(self, root, interval=1.0, alerts=None, budget=0.05):
         self.root = root
         self.root.title("System Information Viewer")
         self.root.geometry("1000x700")
         self.root.configure(bg="#f0f0f0")
+        self.interval = interval
+        self.requests = queue.Queue()   # tab names for the worker to compute
+        self.results = queue.Queue()    # (tab name, text) for the main thread
+        self.pending = set()            # tabs queued or being computed
+        self.updated_at = dict.fromkeys(self.TABS)
+        self.auto_refresh_job = None
+        self.overhead_job = None
+        self.list_offset = 0  # first process list row shown
+        self.charts = {}      # tab name -> [(Chart, series names or core ids, legend labels)]
+        self.shown_text = {}  # tab name -> text in its widget, to skip identical rewrites
+        self.stats = SelfStats()
+        self.engine = CollectionEngine()  # tabs wait for their data only until its deadline
+        self.collector = HistoryCollector(interval=interval)
+        self.process_table = ProcessTable()
+        self.source = DataSource(self.collector, self.process_table)
+        self.stats.instrument(self, ('get_', 'filter_list', 'sort_list', 'render_list'))
+        self.stats.instrument(self.collector, ('sample',), 'collector')
+        self.stats.instrument(self.process_table, ('refresh',), 'process_table')
+        self.scheduler = self.source.start(budget)
+        self.stats.instrument(self.scheduler, ('use',), 'scheduler')
+        self.alerts = alerts
+        if alerts is not None:
+            self.stats.instrument(alerts, ('observe',), 'alerts')
+            alerts.attach(self.source)
         
         # Apply modern theme
         style = ttk.Style()
@@ -26,7 +155,35 @@ class SysInfoGUI:
         style.configure('TNotebook.Tab', padding=[20, 10])
         
         self.setup_ui()
+        self.getters = {
+            'overview': self.get_overview,
+            'cpu': self.get_cpu_info,
+            'memory': self.get_memory_info,
+            'disk': self.get_disk_info,
+            'diskio': self.get_diskio_info,
+            'network': self.get_network_info,
+            'process': self.get_process_info,
+            'cgroups': self.get_cgroup_info,
+            'thermal': self.get_thermal_info,
+            'proclist': self.get_process_list,
+        }
+        self.text_widgets = {
+            'overview': self.overview_text,
+            'cpu': self.cpu_text,
+            'memory': self.memory_text,
+            'disk': self.disk_text,
+            'diskio': self.diskio_text,
+            'network': self.network_text,
+            'process': self.process_text,
+            'cgroups': self.cgroups_text,
+            'thermal': self.thermal_text,
+        }
+        threading.Thread(target=self._worker, name='sysinfo-gui-worker', daemon=True).start()
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.apply_updates()
         self.update_data()
+        if alerts is not None:
+            self.refresh_alerts()
         
     def setup_ui(self):
         """Create the main UI"""
@@ -39,6 +196,11 @@ class SysInfoGUI:
                         bg="#1a1a2e", fg="white")
         title.pack(pady=10)
         
+        # Alert banner, shown under the header while any alert is active
+        self.alert_label = tk.Label(self.root, anchor="w", justify=tk.LEFT,
+                                    font=("Helvetica", 10, "bold"), fg="white",
+                                    padx=10, pady=4)
+        
         # Notebook (tabbed interface)
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -48,27 +210,45 @@ class SysInfoGUI:
         self.cpu_tab = ttk.Frame(self.notebook)
         self.memory_tab = ttk.Frame(self.notebook)
         self.disk_tab = ttk.Frame(self.notebook)
+        self.diskio_tab = ttk.Frame(self.notebook)
         self.network_tab = ttk.Frame(self.notebook)
         self.process_tab = ttk.Frame(self.notebook)
+        self.cgroups_tab = ttk.Frame(self.notebook)
+        self.thermal_tab = ttk.Frame(self.notebook)
+        self.proclist_tab = ttk.Frame(self.notebook)
         
         self.notebook.add(self.overview_tab, text="Overview")
         self.notebook.add(self.cpu_tab, text="CPU")
         self.notebook.add(self.memory_tab, text="Memory")
         self.notebook.add(self.disk_tab, text="Disk")
+        self.notebook.add(self.diskio_tab, text="Disk I/O")
         self.notebook.add(self.network_tab, text="Network")
         self.notebook.add(self.process_tab, text="Processes")
+        self.notebook.add(self.cgroups_tab, text="Cgroups")
+        self.notebook.add(self.thermal_tab, text="Thermal")
+        self.notebook.add(self.proclist_tab, text="All Processes")
         
         # Populate tabs
         self.create_overview_tab()
         self.create_cpu_tab()
         self.create_memory_tab()
         self.create_disk_tab()
+        self.create_diskio_tab()
         self.create_network_tab()
         self.create_process_tab()
+        self.create_cgroups_tab()
+        self.create_thermal_tab()
+        self.create_proclist_tab()
+        
+        # Overhead panel, shown above the footer while its checkbox is set
+        self.overhead_text = tk.Text(self.root, height=12, font=("Courier", 9),
+                                     bg="#1a1a2e", fg="white", relief=tk.FLAT,
+                                     padx=10, pady=5, state=tk.DISABLED)
         
         # Footer with refresh button
         footer = tk.Frame(self.root, bg="#f0f0f0")
         footer.pack(fill=tk.X, padx=10, pady=10)
+        self.footer = footer
         
         refresh_btn = tk.Button(footer, text="🔄 Refresh", command=self.update_data,
                                bg="#0066cc", fg="white", padx=20, pady=5, 
@@ -76,12 +256,19 @@ class SysInfoGUI:
         refresh_btn.pack(side=tk.LEFT)
         
         self.auto_refresh_var = tk.BooleanVar(value=False)
-        auto_refresh = tk.Checkbutton(footer, text="Auto-refresh every 5s",
+        auto_refresh = tk.Checkbutton(footer, text=f"Auto-refresh every {self.interval:g}s",
                                      variable=self.auto_refresh_var,
                                      command=self.toggle_auto_refresh,
                                      font=("Helvetica", 9))
         auto_refresh.pack(side=tk.LEFT, padx=20)
         
+        self.overhead_var = tk.BooleanVar(value=False)
+        overhead = tk.Checkbutton(footer, text="Show overhead",
+                                  variable=self.overhead_var,
+                                  command=self.toggle_overhead,
+                                  font=("Helvetica", 9))
+        overhead.pack(side=tk.LEFT)
+        
         exit_btn = tk.Button(footer, text="Exit", command=self.root.quit,
                             bg="#cc0000", fg="white", padx=20, pady=5,
                             font=("Helvetica", 10, "bold"), cursor="hand2")
@@ -123,6 +310,7 @@ class SysInfoGUI:
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
         
+        self.create_charts('cpu', scrollable_frame)
         self.cpu_text = tk.Text(scrollable_frame, height=30, width=80,
                                font=("Courier", 10), bg="white",
                                relief=tk.FLAT, borderwidth=0)
@@ -145,6 +333,7 @@ class SysInfoGUI:
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
         
+        self.create_charts('memory', scrollable_frame)
         self.memory_text = tk.Text(scrollable_frame, height=30, width=80,
                                   font=("Courier", 10), bg="white",
                                   relief=tk.FLAT, borderwidth=0)
@@ -167,6 +356,7 @@ class SysInfoGUI:
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
         
+        self.create_charts('disk', scrollable_frame)
         self.disk_text = tk.Text(scrollable_frame, height=30, width=80,
                                 font=("Courier", 10), bg="white",
                                 relief=tk.FLAT, borderwidth=0)
@@ -175,6 +365,28 @@ class SysInfoGUI:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
+    def create_diskio_tab(self):
+        """Disk I/O tab"""
+        canvas = tk.Canvas(self.diskio_tab, bg="white", highlightthickness=0)
+        scrollbar = ttk.Scrollbar(self.diskio_tab, orient="vertical", command=canvas.yview)
+        scrollable_frame = ttk.Frame(canvas)
+        
+        scrollable_frame.bind(
+            "<Configure>",
+            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        )
+        
+        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+        canvas.configure(yscrollcommand=scrollbar.set)
+        
+        self.diskio_text = tk.Text(scrollable_frame, height=30, width=80,
+                                  font=("Courier", 10), bg="white",
+                                  relief=tk.FLAT, borderwidth=0)
+        self.diskio_text.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        
+        canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        
     def create_network_tab(self):
         """Network tab"""
         canvas = tk.Canvas(self.network_tab, bg="white", highlightthickness=0)
@@ -189,6 +401,7 @@ class SysInfoGUI:
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
         
+        self.create_charts('network', scrollable_frame)
         self.network_text = tk.Text(scrollable_frame, height=30, width=80,
                                    font=("Courier", 10), bg="white",
                                    relief=tk.FLAT, borderwidth=0)
@@ -219,199 +432,553 @@ class SysInfoGUI:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
+    def create_cgroups_tab(self):
+        """Cgroups tab"""
+        canvas = tk.Canvas(self.cgroups_tab, bg="white", highlightthickness=0)
+        scrollbar = ttk.Scrollbar(self.cgroups_tab, orient="vertical", command=canvas.yview)
+        scrollable_frame = ttk.Frame(canvas)
+        
+        scrollable_frame.bind(
+            "<Configure>",
+            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        )
+        
+        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+        canvas.configure(yscrollcommand=scrollbar.set)
+        
+        self.cgroups_text = tk.Text(scrollable_frame, height=30, width=120,
+                                   font=("Courier", 10), bg="white",
+                                   relief=tk.FLAT, borderwidth=0)
+        self.cgroups_text.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        
+        canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        
+    def create_thermal_tab(self):
+        """Per-CPU frequency, throttling and temperature tab"""
+        canvas = tk.Canvas(self.thermal_tab, bg="white", highlightthickness=0)
+        scrollbar = ttk.Scrollbar(self.thermal_tab, orient="vertical", command=canvas.yview)
+        scrollable_frame = ttk.Frame(canvas)
+        
+        scrollable_frame.bind(
+            "<Configure>",
+            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        )
+        
+        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+        canvas.configure(yscrollcommand=scrollbar.set)
+        
+        self.thermal_text = tk.Text(scrollable_frame, height=30, width=120,
+                                    font=("Courier", 10), bg="white",
+                                    relief=tk.FLAT, borderwidth=0)
+        self.thermal_text.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        # One line per CPU: grow with the text so the canvas scrolls to all of them
+        self.thermal_text.bind("<<Modified>>", self.fit_thermal_text)
+        
+        canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        
+    def fit_thermal_text(self, event=None):
+        """Size the thermal Text to its line count"""
+        widget = self.thermal_text
+        if widget.edit_modified():
+            lines = int(widget.index('end-1c').split('.')[0])
+            widget.config(height=max(lines, 30))
+            widget.edit_modified(False)
+        
+    def create_charts(self, name, parent):
+        """Canvas of history charts at the top of a tab"""
+        collector = self.collector
+        width = 880
+        specs = []  # (x, y, width, height, [(label, color)], title, maximum, fmt, fetch)
+        if name == 'cpu':
+            specs.append((0, 0, width, 110, [("total", "#0066cc")], "CPU usage", 100, _percent,
+                          lambda: [collector.history('cpu')]))
+            cores = len(collector.percpu)
+            if cores <= CHART_CORES:
+                columns = 4 if cores <= 16 else 8
+                cell = width / columns
+                for i, cpu_id in enumerate(collector.cpu_sampler.ids[:cores]):
+                    row, column = divmod(i, columns)
+                    specs.append((column * cell, 125 + row * 65, cell - 14, 55, [("", "#0066cc")],
+                                  f"CPU {cpu_id}", 100, _percent,
+                                  lambda i=i: [collector.core_history(i)]))
+        elif name == 'memory':
+            specs.append((0, 0, width, 130, [("memory", "#7b1fa2"), ("swap", "#e65100")],
+                          "Memory and swap used", 100, _percent,
+                          lambda: [collector.history('memory'), collector.history('swap')]))
+        elif name == 'disk':
+            specs.append((0, 0, width, 130, [("read", "#2e7d32"), ("write", "#c62828")],
+                          "Disk throughput", None, _rate,
+                          lambda: [collector.history('disk_read'), collector.history('disk_write')]))
+        elif name == 'network':
+            specs.append((0, 0, width, 130, [("recv", "#0277bd"), ("sent", "#ef6c00")],
+                          "Network throughput", None, _rate,
+                          lambda: [collector.history('net_recv'), collector.history('net_sent')]))
+        height = max(y + h for _, y, _, h, *_ in specs)
+        canvas = tk.Canvas(parent, width=width + 10, height=height + 2, bg="white",
+                           highlightthickness=0)
+        canvas.pack(padx=10, pady=(10, 0), anchor="w")
+        self.charts[name] = [
+            (Chart(canvas, x + 1, y + 1, w, h, series, title, maximum, fmt, collector.length),
+             fetch, [label for label, _ in series])
+            for x, y, w, h, series, title, maximum, fmt, fetch in specs]
+        
+    def update_charts(self, name):
+        """Move a tab's chart lines to the latest history"""
+        for chart, fetch, labels in self.charts.get(name, ()):
+            chart.update(fetch(), labels)
+        
+    def create_proclist_tab(self):
+        """All Processes tab: a filter box over a fixed set of rows that scroll virtually"""
+        bar = ttk.Frame(self.proclist_tab)
+        bar.pack(fill=tk.X, padx=10, pady=(10, 0))
+        ttk.Label(bar, text="Filter (name, command line or user):").pack(side=tk.LEFT)
+        self.list_filter_var = tk.StringVar()
+        self.list_filter_var.trace_add('write', lambda *args: self.filter_list())
+        ttk.Entry(bar, textvariable=self.list_filter_var, width=30).pack(side=tk.LEFT, padx=5)
+        self.list_status = ttk.Label(bar, text="")
+        self.list_status.pack(side=tk.RIGHT)
+        
+        frame = ttk.Frame(self.proclist_tab)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        columns = [column for column, _, _, _ in self.LIST_COLUMNS]
+        self.proc_tree = ttk.Treeview(frame, columns=columns, show='headings',
+                                      height=self.LIST_ROWS, selectmode='none')
+        for column, heading, width, anchor in self.LIST_COLUMNS:
+            self.proc_tree.heading(column, text=heading, command=lambda c=column: self.sort_list(c))
+            self.proc_tree.column(column, width=width, anchor=anchor, stretch=column == 'name')
+        # The rows are created once; scrolling and refreshes only change their values
+        self.list_items = [self.proc_tree.insert('', tk.END, values=()) for _ in range(self.LIST_ROWS)]
+        # The scrollbar drives list_offset instead of a scrolled widget
+        self.list_scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.scroll_list)
+        self.proc_tree.pack(side="left", fill="both", expand=True)
+        self.list_scrollbar.pack(side="right", fill="y")
+        self.proc_tree.bind("<MouseWheel>", lambda e: self.scroll_list('scroll', -e.delta // 120 * 3, 'units'))
+        self.proc_tree.bind("<Button-4>", lambda e: self.scroll_list('scroll', -3, 'units'))
+        self.proc_tree.bind("<Button-5>", lambda e: self.scroll_list('scroll', 3, 'units'))
+        
+    def get_process_list(self):
+        """Bring the process list up to date with the latest scan (worker thread)"""
+        self.source.process_list()
+        return ""  # Rendered by render_list, which shows any text as the status
+        
+    def render_list(self, error=None):
+        """Fill the visible rows of the process list"""
+        plist = self.source.process_index
+        if plist is None:
+            return
+        rows = len(self.list_items)
+        count = len(plist)
+        self.list_offset = max(min(self.list_offset, count - rows), 0)
+        now = time.time()
+        started = self.process_table.create_time
+        window = plist.window(self.list_offset, rows)
+        for i, item in enumerate(self.list_items):
+            values = ()
+            if i < len(window):
+                e = window[i]
+                values = (e.pid, e.user, f"{e.cpu_percent:.1f}", f"{e.rss / 1024**2:.1f}",
+                          f"{(e.read_bytes_per_s + e.write_bytes_per_s) / 1024**2:.2f}",
+                          format_age(now - started(e)), e.cmdline)
+            self.proc_tree.item(item, values=values)
+        if count:
+            self.list_scrollbar.set(self.list_offset / count, (self.list_offset + rows) / count)
+        else:
+            self.list_scrollbar.set(0, 1)
+        arrow = " ▼" if plist.descending else " ▲"
+        for column, heading, _, _ in self.LIST_COLUMNS:
+            self.proc_tree.heading(column, text=heading + (arrow if column == plist.column else ""))
+        self.list_status.config(text=error or f"{count} of {plist.total()} processes")
+        
+    def filter_list(self):
+        """Refilter on every keystroke in the filter box"""
+        plist = self.source.process_index
+        if plist is not None:
+            plist.set_filter(self.list_filter_var.get())
+            self.list_offset = 0
+            self.render_list()
+        
+    def sort_list(self, column):
+        """Sort by a clicked column heading; clicking it again reverses the order"""
+        plist = self.source.process_index
+        if plist is not None:
+            plist.sort(column)
+            self.list_offset = 0
+            self.render_list()
+        
+    def scroll_list(self, action, amount, unit=None):
+        """Scrollbar and mouse wheel: move the window over the list"""
+        plist = self.source.process_index
+        if plist is None:
+            return
+        rows = len(self.list_items)
+        if action == 'moveto':
+            self.list_offset = int(float(amount) * len(plist))
+        else:
+            step = rows if unit == 'pages' else 1
+            self.list_offset = max(self.list_offset + int(amount) * step, 0)
+        self.render_list()
+        
+    def visible_tab(self):
+        """Name of the currently selected notebook tab"""
+        return self.TABS[self.notebook.index(self.notebook.select())]
+        
     def update_data(self):
-        """Update all tabs with current data"""
-        thread = threading.Thread(target=self._update_all, daemon=True)
-        thread.start()
-        
-    def _update_all(self):
-        """Background thread to update data"""
-        self.overview_text.config(state=tk.NORMAL)
-        self.overview_text.delete(1.0, tk.END)
-        self.overview_text.insert(tk.END, self.get_overview())
-        self.overview_text.config(state=tk.DISABLED)
-        
-        self.cpu_text.config(state=tk.NORMAL)
-        self.cpu_text.delete(1.0, tk.END)
-        self.cpu_text.insert(tk.END, self.get_cpu_info())
-        self.cpu_text.config(state=tk.DISABLED)
-        
-        self.memory_text.config(state=tk.NORMAL)
-        self.memory_text.delete(1.0, tk.END)
-        self.memory_text.insert(tk.END, self.get_memory_info())
-        self.memory_text.config(state=tk.DISABLED)
-        
-        self.disk_text.config(state=tk.NORMAL)
-        self.disk_text.delete(1.0, tk.END)
-        self.disk_text.insert(tk.END, self.get_disk_info())
-        self.disk_text.config(state=tk.DISABLED)
-        
-        self.network_text.config(state=tk.NORMAL)
-        self.network_text.delete(1.0, tk.END)
-        self.network_text.insert(tk.END, self.get_network_info())
-        self.network_text.config(state=tk.DISABLED)
-        
-        self.process_text.config(state=tk.NORMAL)
-        self.process_text.delete(1.0, tk.END)
-        self.process_text.insert(tk.END, self.get_process_info())
-        self.process_text.config(state=tk.DISABLED)
+        """Refresh the visible tab now and mark the others stale"""
+        self.updated_at = dict.fromkeys(self.TABS)
+        self.request_update(self.visible_tab())
+        
+    def request_update(self, name):
+        """Queue a tab for recomputation unless it is already queued"""
+        if name not in self.pending:
+            self.pending.add(name)
+            self.requests.put(name)
+        
+    def on_tab_changed(self, event):
+        """Recompute a newly selected tab if its contents are stale"""
+        name = self.visible_tab()
+        updated = self.updated_at[name]
+        if updated is None or time.monotonic() - updated >= self.interval:
+            self.request_update(name)
+        
+    def _worker(self):
+        """Background thread: compute tab contents, never touch widgets
+
+        Everything queued is computed concurrently through the engine, so
+        one slow tab comes back stale after its deadline instead of
+        holding up the others.
+        """
+        while True:
+            names = [self.requests.get()]
+            while True:
+                try:
+                    names.append(self.requests.get_nowait())
+                except queue.Empty:
+                    break
+            texts = self.engine.collect({name: self._getter(name) for name in names})
+            for name in names:
+                text = texts[name]
+                note = self.engine.note(name)
+                if note is not None:
+                    text = f"{text or ''}\n({note})\n".lstrip()
+                self.results.put((name, text))
+        
+    def _getter(self, name):
+        """The tab's getter, with errors turned into the tab's text"""
+        getter = self.getters[name]
+        
+        def run():
+            try:
+                return getter()
+            except Exception as e:
+                return f"Error: {e}\n"
+        return run
+        
+    def apply_updates(self):
+        """Main-thread poller: copy finished results into the Text widgets"""
+        while True:
+            try:
+                name, text = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.discard(name)
+            self.updated_at[name] = time.monotonic()
+            start = time.perf_counter_ns()
+            widget = self.text_widgets.get(name)
+            if widget is None:
+                self.render_list(text.strip() or None)  # Empty unless failed or late
+            elif text != self.shown_text.get(name):
+                widget.config(state=tk.NORMAL)
+                widget.delete(1.0, tk.END)
+                widget.insert(tk.END, text)
+                widget.config(state=tk.DISABLED)
+                self.shown_text[name] = text
+            self.stats.record(f"text_update.{name}", time.perf_counter_ns() - start)
+            if name in self.charts:
+                start = time.perf_counter_ns()
+                self.update_charts(name)
+                self.stats.record(f"chart_update.{name}", time.perf_counter_ns() - start)
+        self.root.after(50, self.apply_updates)
         
     def get_overview(self):
         """Get system overview"""
-        boot_time = datetime.fromtimestamp(psutil.boot_time())
-        uptime = datetime.now() - boot_time
+        data = self.source.overview()
+        boot_time = datetime.fromtimestamp(data['boot_time'])
+        uptime = timedelta(seconds=int(data['uptime']))
         
         info = "=== SYSTEM OVERVIEW ===\n\n"
-        info += f"OS: {platform.system()} {platform.release()}\n"
-        info += f"Hostname: {platform.node()}\n"
-        info += f"Uptime: {str(uptime).split('.')[0]}\n"
+        info += f"OS: {data['system']} {data['release']}\n"
+        info += f"Hostname: {data['hostname']}\n"
+        info += f"Uptime: {uptime}\n"
         info += f"Boot Time: {boot_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
         info += f"Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
         
-        info += f"CPU: {platform.processor()}\n"
-        info += f"Cores: {psutil.cpu_count(logical=False)} physical, {psutil.cpu_count(logical=True)} logical\n\n"
+        info += f"CPU: {data['processor']}\n"
+        info += f"Cores: {data['cores_physical']} physical, {data['cores_logical']} logical\n\n"
         
-        mem = psutil.virtual_memory()
-        info += f"Memory: {mem.used / (1024**3):.1f} / {mem.total / (1024**3):.1f} GB ({mem.percent:.1f}%)\n"
-        info += f"Memory Available: {mem.available / (1024**3):.1f} GB\n"
+        mem = data['memory']
+        info += f"Memory: {mem['used'] / (1024**3):.1f} / {mem['total'] / (1024**3):.1f} GB ({mem['percent']:.1f}%)\n"
+        info += f"Memory Available: {mem['available'] / (1024**3):.1f} GB\n"
+        for line in pressure_summary(data.get('pressure'), data.get('paging')):
+            info += line + "\n"
         
         return info
         
     def get_cpu_info(self):
         """Get CPU information"""
-        cpu_count = psutil.cpu_count(logical=False)
-        cpu_logical = psutil.cpu_count(logical=True)
-        cpu_freq = psutil.cpu_freq()
-        cpu_percent = psutil.cpu_percent(interval=0.5, percpu=True)
+        cpu = self.source.cpu()
+        cpu_percent = cpu['percpu']
         
         info = "=== CPU INFORMATION ===\n\n"
-        info += f"Physical Cores: {cpu_count}\n"
-        info += f"Logical Cores: {cpu_logical}\n"
-        info += f"Frequency: {cpu_freq.current:.1f} MHz\n"
-        info += f"Max Frequency: {cpu_freq.max:.1f} MHz\n\n"
-        
-        info += "Per-Core Usage:\n"
-        for i, percent in enumerate(cpu_percent[:16]):  # Show first 16
-            bar = "█" * int(percent / 5) + "░" * (20 - int(percent / 5))
-            info += f"  Core {i:2d}: [{bar}] {percent:6.1f}%\n"
+        info += f"Physical Cores: {cpu['cores_physical']}\n"
+        info += f"Logical Cores: {cpu['cores_logical']}\n"
+        info += f"Frequency: {cpu['freq_current']:.1f} MHz\n"
+        info += f"Max Frequency: {cpu['freq_max']:.1f} MHz\n\n"
         
+        info += f"Average CPU Usage: {cpu['percent']:.1f}%\n"
         if len(cpu_percent) > 16:
-            info += f"\n  ... and {len(cpu_percent) - 16} more cores\n"
-        
-        avg = psutil.cpu_percent(interval=0.5)
-        info += f"\nAverage CPU Usage: {avg:.1f}%\n"
+            # Small per-core charts get hard to read: one cell per CPU, grouped by socket/node
+            info += "\nPer-CPU Load (· idle → █ busy):\n"
+            layout = self.source.cpu_topology().layout(cpu['ids'])
+            for label, cells in heatmap_rows(layout, cpu_percent, 64):
+                info += f"  {label:<7} {cells}\n"
         
         return info
         
     def get_memory_info(self):
         """Get memory information"""
-        mem = psutil.virtual_memory()
-        swap = psutil.swap_memory()
+        data = self.source.memory()
+        mem = data['memory']
+        swap = data['swap']
         
-        def draw_bar(used, total):
-            percent = (used / total * 100) if total > 0 else 0
-            bar = "█" * int(percent / 5) + "░" * (20 - int(percent / 5))
-            return f"[{bar}] {percent:.1f}%"
+        def percent(used, total):
+            return used / total * 100 if total > 0 else 0
         
         info = "=== MEMORY INFORMATION ===\n\n"
         info += f"Physical Memory:\n"
-        info += f"  Used: {mem.used / (1024**3):.2f} GB / {mem.total / (1024**3):.2f} GB\n"
-        info += f"  {draw_bar(mem.used, mem.total)}\n"
-        info += f"  Available: {mem.available / (1024**3):.2f} GB\n"
-        info += f"  Free: {mem.free / (1024**3):.2f} GB\n\n"
+        info += (f"  Used: {mem['used'] / (1024**3):.2f} GB / {mem['total'] / (1024**3):.2f} GB "
+                 f"({percent(mem['used'], mem['total']):.1f}%)\n")
+        info += f"  Available: {mem['available'] / (1024**3):.2f} GB\n"
+        info += f"  Free: {mem['free'] / (1024**3):.2f} GB\n\n"
         
         info += f"Swap:\n"
-        info += f"  Used: {swap.used / (1024**3):.2f} GB / {swap.total / (1024**3):.2f} GB\n"
-        info += f"  {draw_bar(swap.used, swap.total)}\n"
+        info += (f"  Used: {swap['used'] / (1024**3):.2f} GB / {swap['total'] / (1024**3):.2f} GB "
+                 f"({percent(swap['used'], swap['total']):.1f}%)\n")
+        detail = memory_detail(data)
+        if detail:
+            info += "\n" + "\n".join(detail) + "\n"
         
         return info
         
     def get_disk_info(self):
         """Get disk usage information"""
+        data = self.source.disk()
         info = "=== DISK USAGE ===\n\n"
         
-        for partition in psutil.disk_partitions():
-            if partition.fstype:
-                try:
-                    usage = psutil.disk_usage(partition.mountpoint)
-                    percent = usage.percent
-                    bar = "█" * int(percent / 5) + "░" * (20 - int(percent / 5))
-                    info += f"{partition.device} ({partition.fstype})\n"
-                    info += f"  Mount: {partition.mountpoint}\n"
-                    info += f"  {usage.used / (1024**3):.2f} GB / {usage.total / (1024**3):.2f} GB\n"
-                    info += f"  [{bar}] {percent:.1f}%\n\n"
-                except:
-                    pass
+        for part in data['partitions']:
+            percent = part['percent']
+            bar = "█" * int(percent / 5) + "░" * (20 - int(percent / 5))
+            info += f"{part['device']} ({part['fstype']})\n"
+            info += f"  Mount: {part['mountpoint']}\n"
+            info += f"  {part['used'] / (1024**3):.2f} GB / {part['total'] / (1024**3):.2f} GB\n"
+            info += f"  [{bar}] {percent:.1f}%{stale_note(part)}\n\n"
+        
+        info += f"Disk I/O:\n"
+        info += f"  Read:  {data['read_bytes_per_s'] / (1024**2):8.2f} MB/s\n"
+        info += f"  Write: {data['write_bytes_per_s'] / (1024**2):8.2f} MB/s\n"
+        
+        return info
+        
+    def get_diskio_info(self):
+        """Get per-device disk throughput and IOPS"""
+        devices = self.source.diskio()['devices']
+        info = "=== DISK I/O ===\n\n"
+        
+        info += f"{'Device':<16} {'Read MB/s':>10} {'Write MB/s':>10} {'Read IOPS':>10} {'Write IOPS':>10} {'Busy':>7}\n"
+        for d in devices:
+            info += (f"{d['name'][:16]:<16} {d['read_bytes_per_s'] / (1024**2):>10.2f} "
+                     f"{d['write_bytes_per_s'] / (1024**2):>10.2f} {d['read_iops']:>10.1f} "
+                     f"{d['write_iops']:>10.1f} {d['busy_percent']:>6.1f}%\n")
         
         return info
         
     def get_network_info(self):
         """Get network information"""
+        data = self.source.network()
         info = "=== NETWORK INFORMATION ===\n\n"
         
-        net_if = psutil.net_if_addrs()
-        for interface, addrs in net_if.items():
-            info += f"{interface}:\n"
-            for addr in addrs:
-                info += f"  {addr.family.name}: {addr.address}\n"
-            info += "\n"
+        info += f"{'Interface':<18} {'Recv KB/s':>10} {'Send KB/s':>10} {'Pkt in/s':>9} {'Pkt out/s':>9} {'Err/s':>6} {'Drop/s':>6}\n"
+        for nic in data['nics']:
+            info += (f"{nic['name'][:18]:<18} {nic['bytes_recv_per_s'] / 1024:>10.1f} "
+                     f"{nic['bytes_sent_per_s'] / 1024:>10.1f} {nic['packets_recv_per_s']:>9.1f} "
+                     f"{nic['packets_sent_per_s']:>9.1f} {nic['errors_per_s']:>6.1f} {nic['drops_per_s']:>6.1f}\n")
+        info += "\n"
         
         # Network I/O stats
-        net_io = psutil.net_io_counters()
+        net_io = data['io']
         info += f"Network Statistics:\n"
-        info += f"  Bytes Sent: {net_io.bytes_sent / (1024**3):.2f} GB\n"
-        info += f"  Bytes Received: {net_io.bytes_recv / (1024**3):.2f} GB\n"
-        info += f"  Packets Sent: {net_io.packets_sent:,}\n"
-        info += f"  Packets Received: {net_io.packets_recv:,}\n"
+        info += f"  Bytes Sent: {net_io['bytes_sent'] / (1024**3):.2f} GB\n"
+        info += f"  Bytes Received: {net_io['bytes_recv'] / (1024**3):.2f} GB\n"
+        info += f"  Packets Sent: {net_io['packets_sent']:,}\n"
+        info += f"  Packets Received: {net_io['packets_recv']:,}\n"
+        info += f"  Send Rate: {data['sent_bytes_per_s'] / 1024:8.1f} KB/s\n"
+        info += f"  Recv Rate: {data['recv_bytes_per_s'] / 1024:8.1f} KB/s\n\n"
+        
+        info += f"Addresses:\n"
+        for interface, addrs in data['interfaces'].items():
+            info += f"{interface}:\n"
+            for addr in addrs:
+                info += f"  {addr['family']}: {addr['address']}\n"
+            info += "\n"
         
         return info
         
+    PROCESS_LISTS = (
+        ('top_read', "Disk Read", lambda p: f"{p['read_bytes_per_s'] / 1024**2:.2f} MB/s"),
+        ('top_write', "Disk Write", lambda p: f"{p['write_bytes_per_s'] / 1024**2:.2f} MB/s"),
+        ('top_syscr', "Read Syscalls", lambda p: f"{p['syscr_per_s']:.0f}/s"),
+        ('top_syscw', "Write Syscalls", lambda p: f"{p['syscw_per_s']:.0f}/s"),
+        ('top_fds', "Open Files", lambda p: f"{p['fds']}"),
+        ('top_threads', "Threads", lambda p: f"{p['threads']}"),
+        ('top_ctx', "Context Switches", lambda p: f"{p['ctx_switches_per_s']:.0f}/s"),
+    )
+    
     def get_process_info(self):
         """Get top processes"""
-        info = "=== TOP PROCESSES ===\n\n"
+        data = self.source.process(k=10, detail=True)
+        info = f"=== TOP PROCESSES ({data['count']} running) ===\n\n"
         
         info += "Top 10 by Memory Usage:\n"
-        try:
-            procs = sorted(psutil.process_iter(['pid', 'name', 'memory_percent']), 
-                          key=lambda p: p.info['memory_percent'], reverse=True)[:10]
-            for p in procs:
-                try:
-                    info += f"  PID {p.info['pid']:>6} | {p.info['name'][:40]:<40} | {p.info['memory_percent']:>6.1f}%\n"
-                except:
-                    pass
-        except:
-            pass
+        for p in data['top_memory']:
+            info += f"  PID {p['pid']:>6} | {p['name'][:40]:<40} | {p['memory_percent']:>6.1f}%\n"
         
         info += "\nTop 10 by CPU Usage:\n"
-        try:
-            procs = sorted(psutil.process_iter(['pid', 'name', 'cpu_percent']), 
-                          key=lambda p: p.info['cpu_percent'] or 0, reverse=True)[:10]
-            for p in procs:
-                try:
-                    cpu = p.info['cpu_percent'] or 0
-                    info += f"  PID {p.info['pid']:>6} | {p.info['name'][:40]:<40} | {cpu:>6.1f}%\n"
-                except:
-                    pass
-        except:
-            pass
+        for p in data['top_cpu']:
+            info += f"  PID {p['pid']:>6} | {p['name'][:40]:<40} | {p['cpu_percent']:>6.1f}%\n"
+        
+        for key, title, fmt in self.PROCESS_LISTS:
+            info += f"\nTop 10 by {title}:\n"
+            for p in data[key]:
+                info += f"  PID {p['pid']:>6} | {p['name'][:40]:<40} | {fmt(p):>14}\n"
         
+        info += "\nDisk I/O and open files of other users' processes need root.\n"
         return info
         
+    def get_cgroup_info(self):
+        """Get resource usage per systemd unit, container or pod"""
+        data = self.source.cgroups(k=50)
+        info = "=== CGROUPS ===\n\n"
+        if not data['available']:
+            return info + "No cgroup v2 hierarchy on this host.\n"
+        if not data['groups']:
+            return info + "No cgroups with counters (cgroup v2 has no controllers on this host).\n"
+        
+        info += (f"{'Unit':<32} | {'Kind':<9} | {'CPU':>6} | {'Memory':>9} | {'Read MB/s':>9} | "
+                 f"{'Write MB/s':>10} | {'PSI':>5} | {'Procs':>5} | Top process\n")
+        for g in data['groups']:
+            memory = f"{g['memory'] / 1024**2:.0f} MB" if g['memory'] is not None else "-"
+            pressure = f"{g['pressure']:.1f}" if g['pressure'] is not None else "-"
+            info += (f"{g['name'][:32]:<32} | {g['kind']:<9} | {g['cpu_percent']:5.1f}% | {memory:>9} | "
+                     f"{g['read_bytes_per_s'] / 1024**2:>9.2f} | {g['write_bytes_per_s'] / 1024**2:>10.2f} | "
+                     f"{pressure:>5} | {g['procs']:>5} | {g['top'] or ''}\n")
+        info += "\nPSI is the share of the last 10 s some task in the group waited for memory.\n"
+        return info
+        
+    def get_thermal_info(self):
+        """Get every CPU's clock, thermal throttling and temperatures"""
+        lines = thermal_detail(self.source.thermal(), per_cpu=None)
+        info = "=== FREQUENCY, THROTTLING AND TEMPERATURES ===\n\n"
+        if not lines:
+            return info + "No cpufreq, thermal_throttle or temperature sensors on this host.\n"
+        return info + "\n".join(lines) + "\n"
+        
     def toggle_auto_refresh(self):
         """Toggle auto-refresh"""
+        if self.auto_refresh_job is not None:
+            self.root.after_cancel(self.auto_refresh_job)
+            self.auto_refresh_job = None
         if self.auto_refresh_var.get():
             self.auto_refresh()
         
     def auto_refresh(self):
-        """Auto-refresh every 5 seconds"""
+        """Refresh the visible tab every interval"""
         if self.auto_refresh_var.get():
-            self.update_data()
-            self.root.after(5000, self.auto_refresh)
+            self.request_update(self.visible_tab())
+            self.auto_refresh_job = self.root.after(int(self.interval * 1000), self.auto_refresh)
+        
+    def refresh_alerts(self):
+        """Show firing (red) and pending (amber) alerts in the banner"""
+        active = self.alerts.active()
+        if active:
+            firing = any(alert.state == 'firing' for alert in active)
+            lines = [f"{'⚠ FIRING' if alert.state == 'firing' else '… pending'}  {alert.describe()}"
+                     for alert in active[:5]]
+            if len(active) > 5:
+                lines.append(f"... and {len(active) - 5} more")
+            self.alert_label.config(text="\n".join(lines), bg="#cc0000" if firing else "#cc8800")
+            if not self.alert_label.winfo_ismapped():
+                self.alert_label.pack(fill=tk.X, padx=10, pady=(10, 0), before=self.notebook)
+        else:
+            self.alert_label.pack_forget()
+        self.root.after(int(self.interval * 1000), self.refresh_alerts)
+        
+    def toggle_overhead(self):
+        """Show or hide the panel with the viewer's own CPU, RSS and latencies"""
+        if self.overhead_job is not None:
+            self.root.after_cancel(self.overhead_job)
+            self.overhead_job = None
+        if self.overhead_var.get():
+            self.overhead_text.pack(fill=tk.X, padx=10, before=self.footer)
+            self.refresh_overhead()
+        else:
+            self.overhead_text.pack_forget()
+        
+    def refresh_overhead(self):
+        """Redraw the overhead panel every interval while it is shown"""
+        widget = self.overhead_text
+        widget.config(state=tk.NORMAL)
+        widget.delete(1.0, tk.END)
+        lines = self.stats.report(rows=int(widget.cget('height')) - 3)
+        lines.insert(1, self.scheduler.summary())
+        widget.insert(tk.END, "\n".join(lines))
+        widget.config(state=tk.DISABLED)
+        self.overhead_job = self.root.after(int(self.interval * 1000), self.refresh_overhead)
 
 
 def main():
+    global tk, ttk
+    parser = argparse.ArgumentParser(description="Graphical system information viewer")
+    parser.add_argument('-i', '--interval', type=float, default=1.0,
+                        help="auto-refresh interval in seconds (default: 1.0)")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="profile this session into FILE: cProfile stats for .prof/.pstats, "
+                             "otherwise folded stacks of every thread (for flamegraph.pl/speedscope)")
+    parser.add_argument('--alerts', metavar='FILE',
+                        help="alert rules to evaluate on every sample "
+                             "(default: ~/.config/sysinfo/alerts.conf if it exists)")
+    parser.add_argument('--budget', type=float, default=5.0, metavar='PERCENT',
+                        help="keep sysinfo's own CPU use under PERCENT of one core by "
+                             "collecting less often when needed (default: 5)")
+    args = parser.parse_args()
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    if args.budget <= 0:
+        parser.error("--budget must be positive")
+    from sysinfo_alerts import load_alerts
+    try:
+        alerts = load_alerts(args.alerts)
+    except (OSError, ValueError) as e:
+        parser.error(f"cannot load alert rules: {e}")
+    if args.profile:
+        from sysinfo_profile import start_profile
+        start_profile(args.profile)
+    raise_open_file_limit()  # The Thermal tab keeps two sysfs files open per CPU
+    
+    import tkinter as tk
+    from tkinter import ttk
     root = tk.Tk()
-    app = SysInfoGUI(root)
+    app = SysInfoGUI(root, args.interval, alerts, args.budget / 100)
     root.mainloop()
 
 
@@ -0,0 +1,208 @@
+"""
+sysinfo profile - What sysinfo itself costs
+Used by: the TUI/GUI overhead panel, sysinfo --profile FILE
+
+SelfStats keeps a latency histogram per instrumented call (collector
+samples, get_* formatters, view_* renders) using perf_counter_ns, plus the
+tool's own CPU% and RSS. --profile records a whole session, either with a
+sampling profiler over every thread (folded stacks, for flamegraph.pl or
+speedscope) or, for a .prof/.pstats file, with cProfile on the main thread.
+"""
+
+import atexit
+import os
+import sys
+import threading
+import time
+from functools import wraps
+
+from sysinfo_core import SPARK_CHARS
+
+BUCKETS = 32  # bucket b holds calls that took < 2**b microseconds
+
+
+class SelfStats:
+    """Latency histograms for sysinfo's own work, plus its CPU% and RSS"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {}   # name -> [calls, total ns, max ns, bucket counts]
+        self._cpu_prev = (time.monotonic(), self._cpu_seconds())
+        self.cpu_percent = 0.0
+
+    @staticmethod
+    def _cpu_seconds():
+        t = os.times()
+        return t.user + t.system
+
+    def record(self, name, ns):
+        bucket = min((ns // 1000).bit_length(), BUCKETS - 1)
+        with self.lock:
+            entry = self.timings.get(name)
+            if entry is None:
+                entry = self.timings[name] = [0, 0, 0, [0] * BUCKETS]
+            entry[0] += 1
+            entry[1] += ns
+            if ns > entry[2]:
+                entry[2] = ns
+            entry[3][bucket] += 1
+
+    def wrap(self, name, fn):
+        """fn, timed into the histogram called name"""
+        clock = time.perf_counter_ns
+        record = self.record
+
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, clock() - start)
+        return timed
+
+    def instrument(self, obj, prefixes, label=None):
+        """Time every method of obj whose name starts with one of prefixes
+
+        The wrappers are set on the instance, so calls through self (e.g.
+        getattr(self, f"view_{name}")()) go through them too. Methods that are
+        already instrumented are left alone, so calling this again is harmless.
+        """
+        if obj is None:
+            return
+        for name in dir(type(obj)):
+            if name in vars(obj):
+                continue
+            if name.startswith(prefixes) and callable(getattr(obj, name, None)):
+                method = getattr(obj, name)
+                setattr(obj, name, self.wrap(f"{label}.{name}" if label else name, method))
+
+    def usage(self):
+        """{'cpu_percent', 'rss', 'threads'}; CPU% covers the time since the last call"""
+        now, cpu = time.monotonic(), self._cpu_seconds()
+        then, cpu_then = self._cpu_prev
+        if now - then >= 0.2:
+            self.cpu_percent = (cpu - cpu_then) / (now - then) * 100
+            self._cpu_prev = (now, cpu)
+        try:
+            with open('/proc/self/statm') as f:
+                rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            import psutil
+            rss = psutil.Process().memory_info().rss
+        return {'cpu_percent': self.cpu_percent, 'rss': rss, 'threads': threading.active_count()}
+
+    def summary(self):
+        """One dict per instrumented call, most total time first"""
+        with self.lock:
+            items = [(name, e[0], e[1], e[2], list(e[3])) for name, e in self.timings.items()]
+        rows = []
+        for name, calls, total, peak, buckets in items:
+            rows.append({
+                'name': name,
+                'calls': calls,
+                'total_ms': total / 1e6,
+                'avg_ms': total / calls / 1e6,
+                'p50_ms': _bucket_percentile(buckets, calls, 0.50),
+                'p99_ms': _bucket_percentile(buckets, calls, 0.99),
+                'max_ms': peak / 1e6,
+                'buckets': buckets,
+            })
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+
+    def report(self, rows=None):
+        """Plain-text panel: own usage, then one line per instrumented call"""
+        usage = self.usage()
+        lines = [f"sysinfo itself: CPU {usage['cpu_percent']:.1f}%  "
+                 f"RSS {usage['rss'] / 1024**2:.1f} MB  threads {usage['threads']}",
+                 f"{'Call':<24} {'calls':>7} {'avg ms':>8} {'p50 ≤':>8} {'p99 ≤':>8} {'max ms':>8}  "
+                 f"latency histogram (1 µs … 1 s, log2)"]
+        for row in self.summary()[:rows]:
+            lines.append(f"{row['name'][:24]:<24} {row['calls']:>7} {row['avg_ms']:>8.3f} "
+                         f"{row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f} {row['max_ms']:>8.3f}  "
+                         f"{histogram(row['buckets'])}")
+        return lines
+
+
+def _bucket_percentile(buckets, calls, p):
+    """Upper edge (ms) of the bucket holding the p-th percentile call"""
+    target = p * calls
+    seen = 0
+    for b, count in enumerate(buckets):
+        seen += count
+        if seen >= target and count:
+            return (1 << b) / 1000
+    return 0.0
+
+
+def histogram(buckets, first=0, last=20):
+    """Buckets from 1 µs to ~1 s as a block sparkline"""
+    window = buckets[first:last + 1]
+    top = max(window) or 1
+    top_char = len(SPARK_CHARS) - 1
+    return "".join(" " if not c else SPARK_CHARS[min(int(c / top * top_char + 0.5), top_char)]
+                   for c in window)
+
+
+class SamplingProfiler(threading.Thread):
+    """Samples every thread's stack at a fixed rate into folded-stack counts"""
+
+    def __init__(self, interval=0.01):
+        super().__init__(name='sysinfo-profiler', daemon=True)
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        me = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                key = ';'.join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=1)
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]):
+                f.write(f"{stack} {count}\n")
+
+
+def start_profile(path):
+    """Profile the rest of this process and write the result to path at exit
+
+    .prof/.pstats files get cProfile output (main thread only, for pstats
+    or snakeviz); anything else gets folded stacks from the sampling
+    profiler, covering the collector and worker threads as well.
+    """
+    if path.endswith(('.prof', '.pstats')):
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def finish():
+            profiler.disable()
+            profiler.dump_stats(path)
+    else:
+        profiler = SamplingProfiler()
+        profiler.start()
+
+        def finish():
+            profiler.stop()
+            profiler.write(path)
+    atexit.register(finish)
+    return profiler
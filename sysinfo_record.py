@@ -0,0 +1,528 @@
+"""
+sysinfo record - Compact binary recording of snapshots, and replay
+Used by: sysinfo --record FILE, sysinfo --replay FILE
+
+File layout:
+    header   FILE_HEADER + JSON static host facts (hostname, OS, cores, ...)
+    records  REC_HEADER (block counts, host process count) followed by fixed-size blocks:
+             CPU (total, freq, per-core %), memory, swap, NIC counters,
+             disk counters, filesystem usage, top processes
+An index of (offset, timestamp) pairs is kept next to it in FILE.idx so a
+replay can seek by record number or time without scanning the file. The
+index is rebuilt from the record headers if it is missing or out of date.
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_right
+from functools import lru_cache
+
+import psutil
+
+from sysinfo_core import CpuTopology, MemInfo, NetIO, SwapInfo, counter_delta, host_facts
+
+MAGIC = b'SYSREC\x00\x01'
+VERSION = 1
+REC_MAGIC = b'SREC'
+
+FILE_HEADER = struct.Struct('<8sHI')              # magic, version, static length
+REC_HEADER = struct.Struct('<4sIdHHHHHH')         # magic, length, time, counts, processes
+CPU_HEAD = struct.Struct('<ff')                   # total %, frequency MHz
+MEM = struct.Struct('<QQQQf')                     # total, available, used, free, %
+SWAP = struct.Struct('<QQQf')                     # total, used, free, %
+NIC = struct.Struct('<16s8Q')                     # name, NetIO fields
+DISK = struct.Struct('<16s5Q')                    # name, reads, writes, rbytes, wbytes, busy ms
+PART = struct.Struct('<32s64s16sQQQf')            # device, mountpoint, fstype, usage
+PROC = struct.Struct('<Iff32s')                   # pid, cpu %, memory %, name
+INDEX = struct.Struct('<Qd')                      # record offset, timestamp
+
+TOP_PROCESSES = 10
+
+
+@lru_cache(maxsize=64)
+def _floats(n):
+    return struct.Struct(f'<{n}f')
+
+
+def _name(value, size):
+    return value.encode('utf-8', 'replace')[:size]
+
+
+def _text(raw):
+    return raw.rstrip(b'\0').decode('utf-8', 'ignore')
+
+
+def pack_record(timestamp, cpu, memory, swap, nics, disks, partitions, procs, proc_count=0):
+    """Serialize one snapshot
+
+    cpu: (total, freq, [per-core %]); nics: {name: NetIO};
+    disks: {name: (reads, writes, read_bytes, write_bytes, busy_ms)};
+    partitions: DataSource-style dicts; procs: [(pid, cpu %, mem %, name)];
+    proc_count: processes on the host, capped at 65535 (0: not known)
+    """
+    total, freq, percpu = cpu
+    body = [CPU_HEAD.pack(total, freq), _floats(len(percpu)).pack(*percpu),
+            MEM.pack(memory.total, memory.available, memory.used, memory.free, memory.percent),
+            SWAP.pack(swap.total, swap.used, swap.free, swap.percent)]
+    body += [NIC.pack(_name(name, 16), *counters) for name, counters in nics.items()]
+    body += [DISK.pack(_name(name, 16), *counters) for name, counters in disks.items()]
+    body += [PART.pack(_name(p['device'], 32), _name(p['mountpoint'], 64), _name(p['fstype'], 16),
+                       p['total'], p['used'], p['free'], p['percent']) for p in partitions]
+    body += [PROC.pack(pid, cpu_pct, mem_pct, _name(name, 32)) for pid, cpu_pct, mem_pct, name in procs]
+    body = b''.join(body)
+    header = REC_HEADER.pack(REC_MAGIC, REC_HEADER.size + len(body), timestamp, len(percpu),
+                             len(nics), len(disks), len(partitions), len(procs),
+                             min(proc_count, 0xFFFF))
+    return header + body
+
+
+def unpack_record(buf, offset):
+    """Parse the record at offset into a dict"""
+    magic, length, timestamp, n_cpu, n_nic, n_disk, n_part, n_proc, proc_count = \
+        REC_HEADER.unpack_from(buf, offset)
+    if magic != REC_MAGIC:
+        raise ValueError(f"bad record at offset {offset}")
+    pos = offset + REC_HEADER.size
+    total, freq = CPU_HEAD.unpack_from(buf, pos)
+    pos += CPU_HEAD.size
+    percpu = list(_floats(n_cpu).unpack_from(buf, pos))
+    pos += 4 * n_cpu
+    m_total, m_available, m_used, m_free, m_percent = MEM.unpack_from(buf, pos)
+    memory = MemInfo(m_total, m_available, m_percent, m_used, m_free)
+    pos += MEM.size
+    swap = SwapInfo(*SWAP.unpack_from(buf, pos))
+    pos += SWAP.size
+    nics = {}
+    for _ in range(n_nic):
+        name, *counters = NIC.unpack_from(buf, pos)
+        nics[_text(name)] = NetIO(*counters)
+        pos += NIC.size
+    disks = {}
+    for _ in range(n_disk):
+        name, *counters = DISK.unpack_from(buf, pos)
+        disks[_text(name)] = counters
+        pos += DISK.size
+    partitions = []
+    for _ in range(n_part):
+        device, mountpoint, fstype, p_total, used, free, percent = PART.unpack_from(buf, pos)
+        partitions.append({'device': _text(device), 'mountpoint': _text(mountpoint),
+                           'fstype': _text(fstype), 'total': p_total, 'used': used,
+                           'free': free, 'percent': percent, 'stale': False})
+        pos += PART.size
+    procs = []
+    for _ in range(n_proc):
+        pid, cpu_pct, mem_pct, name = PROC.unpack_from(buf, pos)
+        procs.append({'pid': pid, 'name': _text(name), 'cpu_percent': cpu_pct,
+                      'memory_percent': mem_pct})
+        pos += PROC.size
+    return {
+        'timestamp': timestamp,
+        'cpu': (total, percpu),
+        'freq': freq,
+        'memory': memory,
+        'swap': swap,
+        'nics': nics,
+        'disks': disks,
+        'partitions': partitions,
+        'procs': procs,
+        'proc_count': proc_count or None,  # Was padding before; 0 in older recordings
+    }
+
+
+def static_facts():
+    """Host facts that don't change during a recording"""
+    facts = host_facts()
+    return {
+        'system': facts['system'],
+        'release': facts['release'],
+        'hostname': facts['hostname'],
+        'processor': facts['processor'],
+        'boot_time': facts['boot_time'],
+        'cores_physical': facts['cores_physical'],
+        'cores_logical': facts['cores_logical'],
+        'interfaces': {
+            name: [{'family': a.family.name, 'address': a.address} for a in addrs]
+            for name, addrs in psutil.net_if_addrs().items()
+        },
+    }
+
+
+def file_header(static):
+    """FILE_HEADER plus the static facts, as written at the start of a stream"""
+    static = json.dumps(static).encode()
+    return FILE_HEADER.pack(MAGIC, VERSION, len(static)) + static
+
+
+def snapshot_record(source):
+    """Pack the source's current state; returns (timestamp, record bytes)"""
+    latest = source.collector.latest
+    total, percpu = latest['cpu']
+    freq = psutil.cpu_freq()
+    disks = {name: (d.read_count, d.write_count, d.read_bytes, d.write_bytes,
+                    getattr(d, 'busy_time', 0))
+             for name, d in (psutil.disk_io_counters(perdisk=True) or {}).items()}
+    table = source.process_table
+    table.refresh()
+    top = {e.pid: e for e in table.top(TOP_PROCESSES, 'cpu_percent')}
+    top.update((e.pid, e) for e in table.top(TOP_PROCESSES, 'memory_percent'))
+    procs = [(e.pid, e.cpu_percent, e.memory_percent, e.name) for e in top.values()]
+    timestamp = time.time()
+    record = pack_record(timestamp, (total, freq.current if freq else 0.0, percpu),
+                         latest['memory'], latest['swap'], source.collector.net_rates.prev,
+                         disks, source.disks.partitions(), procs, len(table))
+    return timestamp, record
+
+
+def scan_records(buf, start):
+    """Rebuild the index by hopping over record headers
+
+    Stops at the first incomplete or corrupt record, e.g. one cut short
+    by a crash mid-write.
+    """
+    entries = []
+    offset = start
+    size = len(buf)
+    while offset + REC_HEADER.size <= size:
+        magic, length, timestamp = REC_HEADER.unpack_from(buf, offset)[:3]
+        if magic != REC_MAGIC or length < REC_HEADER.size or offset + length > size:
+            break
+        entries.append((offset, timestamp))
+        offset += length
+    return entries
+
+
+def read_header(buf):
+    magic, version, static_len = FILE_HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a sysinfo recording")
+    start = FILE_HEADER.size + static_len
+    static = json.loads(bytes(buf[FILE_HEADER.size:start]))
+    return static, start
+
+
+def torn_header(buf):
+    """Whether buf is the start of a file header whose write was cut short"""
+    if len(buf) < FILE_HEADER.size:
+        return bytes(buf[:len(MAGIC)]) == MAGIC[:len(buf)]
+    magic, version, static_len = FILE_HEADER.unpack_from(buf, 0)
+    return magic == MAGIC and version == VERSION and len(buf) < FILE_HEADER.size + static_len
+
+
+def load_index(path, buf, start):
+    """Return [(offset, timestamp), ...], rebuilding FILE.idx if it's stale"""
+    entries = None
+    try:
+        with open(path + '.idx', 'rb') as f:
+            data = f.read()
+        if len(data) % INDEX.size == 0:
+            entries = list(INDEX.iter_unpack(data))
+    except OSError:
+        pass
+    if entries:
+        # Trust the index only if its last entry ends exactly at EOF
+        offset = entries[-1][0]
+        try:
+            magic, length = REC_HEADER.unpack_from(buf, offset)[:2]
+        except struct.error:
+            magic = length = None
+        if magic != REC_MAGIC or offset + length != len(buf):
+            entries = None
+    elif entries is not None and len(buf) != start:
+        entries = None
+    if entries is None:
+        entries = scan_records(buf, start)
+        try:
+            with open(path + '.idx', 'wb') as f:
+                f.write(b''.join(INDEX.pack(*e) for e in entries))
+        except OSError:
+            pass  # Read-only location; the in-memory index still works
+    return entries
+
+
+class Recorder:
+    """Appends snapshots to a recording file and its index"""
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        self.file = open(path, 'ab+')
+        self.file.seek(0, os.SEEK_END)
+        if self.file.tell() == 0:
+            self.file.write(file_header(static_facts()))
+            self.file.flush()
+            open(path + '.idx', 'wb').close()
+        else:
+            self._repair()
+        self.index = open(path + '.idx', 'ab')
+
+    def _repair(self):
+        """Drop a torn final record and make sure the index matches the file
+
+        A file header cut short by a crash mid-write is rewritten, since no
+        record can follow it; any other file is refused with ValueError.
+        """
+        self.file.seek(0)
+        with mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            try:
+                _, start = read_header(buf)
+            except (struct.error, ValueError):
+                if not torn_header(buf):
+                    raise ValueError("not a sysinfo recording") from None
+                start = None
+            if start is not None:
+                entries = load_index(self.path, buf, start)
+                end = start
+                if entries:
+                    end = entries[-1][0] + REC_HEADER.unpack_from(buf, entries[-1][0])[1]
+        if start is None:
+            self.file.truncate(0)
+            self.file.write(file_header(static_facts()))
+            self.file.flush()
+            open(self.path + '.idx', 'wb').close()
+        elif end != os.fstat(self.file.fileno()).st_size:
+            self.file.truncate(end)
+        self.file.seek(0, os.SEEK_END)
+
+    def append(self):
+        """Record the source's current state"""
+        timestamp, record = snapshot_record(self.source)
+        offset = self.file.tell()
+        self.file.write(record)
+        self.file.flush()
+        self.index.write(INDEX.pack(offset, timestamp))
+        self.index.flush()
+
+    def close(self):
+        self.file.close()
+        self.index.close()
+
+
+class Recording:
+    """Read-only, memory-mapped view of a recording"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.buf = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.static, start = read_header(self.buf)
+        self.index = load_index(path, self.buf, start)
+        self.times = [t for _, t in self.index]
+        self._record = lru_cache(maxsize=256)(self._load)
+
+    def __len__(self):
+        return len(self.index)
+
+    def _load(self, i):
+        return unpack_record(self.buf, self.index[i][0])
+
+    def record(self, i):
+        return self._record(i)
+
+    def find(self, timestamp):
+        """Index of the last record taken at or before timestamp"""
+        return max(bisect_right(self.times, timestamp) - 1, 0)
+
+    def close(self):
+        self.buf.close()
+        self.file.close()
+
+
+def _rate_between(cur, prev, elapsed):
+    return [counter_delta(c, p) / elapsed for c, p in zip(cur, prev)]
+
+
+class ReplayHistory:
+    """Stands in for HistoryCollector, serving history from the recording"""
+
+    def __init__(self, replay):
+        self.replay = replay
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def history(self, name, n=None):
+        replay = self.replay
+        n = n or 120
+        first = max(replay.position - n + 1, 0)
+        return [replay.series_value(i, name) for i in range(first, replay.position + 1)]
+
+
+class ReplaySource:
+    """DataSource lookalike that answers from a recorded snapshot
+
+    `position` selects the record; rates are computed against the record
+    before it.
+    """
+
+    def __init__(self, recording):
+        self.recording = recording
+        self.position = 0
+        self.collector = ReplayHistory(self)
+        self.process_table = None
+        self.topology = CpuTopology(sysfs=None)
+
+    def start(self, budget=None):
+        pass
+
+    def stop(self):
+        pass
+
+    def process_list(self, max_age=0.0):
+        return None  # Recordings keep only the top processes
+
+    def _pair(self, i=None):
+        i = self.position if i is None else i
+        cur = self.recording.record(i)
+        prev = self.recording.record(i - 1) if i > 0 else None
+        return cur, prev
+
+    def _rates(self, i=None):
+        """(elapsed, {nic: rates}, {disk: rates}) between record i-1 and i"""
+        cur, prev = self._pair(i)
+        if prev is None or cur['timestamp'] <= prev['timestamp']:
+            return 0.0, {}, {}
+        elapsed = cur['timestamp'] - prev['timestamp']
+        nics = {name: _rate_between(c, prev['nics'][name], elapsed)
+                for name, c in cur['nics'].items() if name in prev['nics']}
+        disks = {name: _rate_between(c, prev['disks'][name], elapsed)
+                 for name, c in cur['disks'].items() if name in prev['disks']}
+        return elapsed, nics, disks
+
+    def series_value(self, i, name):
+        record = self.recording.record(i)
+        if name == 'cpu':
+            return record['cpu'][0]
+        if name in ('memory', 'swap'):
+            return record[name].percent
+        if name == 'time':
+            return record['timestamp']
+        _, nics, disks = self._rates(i)
+        if name == 'disk_read':
+            return sum(r[2] for r in disks.values())
+        if name == 'disk_write':
+            return sum(r[3] for r in disks.values())
+        if name == 'net_sent':
+            return sum(r[0] for r in nics.values())
+        if name == 'net_recv':
+            return sum(r[1] for r in nics.values())
+        return 0.0
+
+    def timestamp(self):
+        return self.recording.record(self.position)['timestamp']
+
+    def overview(self):
+        static = self.recording.static
+        record = self.recording.record(self.position)
+        return {
+            'system': static['system'],
+            'release': static['release'],
+            'hostname': static['hostname'],
+            'processor': static['processor'],
+            'boot_time': static['boot_time'],
+            'uptime': record['timestamp'] - static['boot_time'],
+            'cores_physical': static['cores_physical'],
+            'cores_logical': static['cores_logical'],
+            'memory': record['memory']._asdict(),
+        }
+
+    def cpu_topology(self):
+        """Recordings don't carry the topology; show a flat grid"""
+        return self.topology
+
+    def cpu(self):
+        static = self.recording.static
+        record = self.recording.record(self.position)
+        total, percpu = record['cpu']
+        return {
+            'cores_physical': static['cores_physical'],
+            'cores_logical': static['cores_logical'],
+            'freq_current': record['freq'],
+            'freq_max': 0.0,
+            'percent': total,
+            'percpu': percpu,
+            'ids': list(range(len(percpu))),
+        }
+
+    def memory(self):
+        record = self.recording.record(self.position)
+        return {'memory': record['memory']._asdict(), 'swap': record['swap']._asdict()}
+
+    def disk(self):
+        record = self.recording.record(self.position)
+        return {
+            'partitions': record['partitions'],
+            'read_bytes_per_s': self.series_value(self.position, 'disk_read'),
+            'write_bytes_per_s': self.series_value(self.position, 'disk_write'),
+        }
+
+    def diskio(self):
+        record = self.recording.record(self.position)
+        elapsed, _, disks = self._rates()
+        devices = []
+        for name in sorted(record['disks']):
+            r = disks.get(name, [0.0] * 5)
+            devices.append({'name': name, 'read_iops': r[0], 'write_iops': r[1],
+                            'read_bytes_per_s': r[2], 'write_bytes_per_s': r[3],
+                            'busy_percent': min(r[4] / 10, 100.0)})
+        return {'devices': devices}
+
+    def network(self):
+        record = self.recording.record(self.position)
+        _, nics, _ = self._rates()
+        rows = []
+        for name in record['nics']:
+            r = nics.get(name, [0.0] * 8)
+            rows.append({'name': name, 'bytes_sent_per_s': r[0], 'bytes_recv_per_s': r[1],
+                         'packets_sent_per_s': r[2], 'packets_recv_per_s': r[3],
+                         'errors_per_s': r[4] + r[5], 'drops_per_s': r[6] + r[7]})
+        rows.sort(key=lambda row: row['bytes_sent_per_s'] + row['bytes_recv_per_s'],
+                  reverse=True)
+        totals = [sum(col) for col in zip(*record['nics'].values())] or [0] * 8
+        return {
+            'interfaces': self.recording.static['interfaces'],
+            'nics': rows,
+            'io': NetIO(*totals)._asdict(),
+            'sent_bytes_per_s': sum(r['bytes_sent_per_s'] for r in rows),
+            'recv_bytes_per_s': sum(r['bytes_recv_per_s'] for r in rows),
+        }
+
+    def process(self, k=10, max_age=0.0, detail=False):
+        # Records keep memory and CPU only, so detail adds no top_read/... lists
+        record = self.recording.record(self.position)
+        procs = record['procs']
+        return {
+            'count': record['proc_count'],  # None: the recording only has the top processes
+            'top_memory': sorted(procs, key=lambda p: p['memory_percent'], reverse=True)[:k],
+            'top_cpu': sorted(procs, key=lambda p: p['cpu_percent'], reverse=True)[:k],
+        }
+
+    def cgroups(self, k=None, max_age=0.0):
+        return {'available': False, 'groups': []}  # Not part of the record format
+
+    def thermal(self):
+        return {'cpus': [], 'packages': [], 'sensors': []}  # Not part of the record format
+
+
+def run_record(path, interval, count=None):
+    """Append one record per interval until interrupted"""
+    from sysinfo_stream import make_source, ticks
+    source = make_source(interval)
+    try:
+        recorder = Recorder(path, source)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"sysinfo: cannot record to {path}: {e}")
+    print(f"sysinfo: recording to {path} every {interval:g}s (Ctrl-C to stop)", flush=True)
+    try:
+        for _ in ticks(interval, count):
+            source.collector.sample()
+            recorder.append()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.close()
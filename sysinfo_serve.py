@@ -0,0 +1,238 @@
+"""
+sysinfo serve - HTTP endpoint exposing the same data in Prometheus and JSON
+Used by: sysinfo --serve PORT
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sysinfo_stream import make_source
+
+
+class SnapshotCache:
+    """One snapshot shared by every request until it is older than ttl
+
+    Refreshes are single-flight: while one request rebuilds the snapshot,
+    concurrent requests wait for it instead of starting their own process
+    scan.
+    """
+
+    def __init__(self, source, ttl=1.0):
+        self.source = source
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.taken_at = 0.0
+
+    def get(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.snapshot is None or now - self.taken_at >= self.ttl:
+                self.source.collector.sample()
+                self.snapshot = self.source.snapshot()
+                self.taken_at = time.monotonic()
+            return self.snapshot
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer with a listen backlog for scrape bursts
+
+    The default backlog of 5 leaves the rest of a burst of scrapers waiting
+    on SYN retries, about a second, before they share the snapshot.
+    """
+
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Metrics:
+    """Accumulates Prometheus text exposition lines"""
+
+    def __init__(self):
+        self.lines = []
+
+    def add(self, name, kind, help_text, samples):
+        """samples: iterable of (labels dict or None, value)"""
+        self.lines.append(f"# HELP sysinfo_{name} {help_text}")
+        self.lines.append(f"# TYPE sysinfo_{name} {kind}")
+        for labels, value in samples:
+            if labels:
+                label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                self.lines.append(f"sysinfo_{name}{{{label_text}}} {value}")
+            else:
+                self.lines.append(f"sysinfo_{name} {value}")
+
+    def text(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def prometheus_text(snapshot):
+    """Render a DataSource snapshot in the Prometheus text format"""
+    m = _Metrics()
+    overview = snapshot.get('overview')
+    if overview:
+        m.add('info', 'gauge', "Host identification.",
+              [({'hostname': overview['hostname'], 'system': overview['system'],
+                 'release': overview['release']}, 1)])
+        m.add('boot_time_seconds', 'gauge', "System boot time, seconds since the epoch.",
+              [(None, overview['boot_time'])])
+        m.add('uptime_seconds', 'gauge', "Seconds since boot.",
+              [(None, round(overview['uptime'], 3))])
+
+    cpu = snapshot.get('cpu')
+    if cpu:
+        m.add('cpu_percent', 'gauge', "Aggregate CPU utilization.",
+              [(None, round(cpu['percent'], 2))])
+        m.add('cpu_core_percent', 'gauge', "Per logical CPU utilization.",
+              [({'core': i}, round(p, 2)) for i, p in zip(cpu['ids'], cpu['percpu'])])
+        m.add('cpu_frequency_mhz', 'gauge', "Current CPU frequency.",
+              [(None, cpu['freq_current'])])
+        m.add('cpu_cores', 'gauge', "Number of CPU cores.",
+              [({'type': 'physical'}, cpu['cores_physical'] or 0),
+               ({'type': 'logical'}, cpu['cores_logical'] or 0)])
+
+    memory = snapshot.get('memory')
+    if memory:
+        mem, swap = memory['memory'], memory['swap']
+        m.add('memory_bytes', 'gauge', "Physical memory.",
+              [({'state': k}, mem[k]) for k in ('total', 'used', 'available', 'free')])
+        m.add('memory_percent', 'gauge', "Physical memory in use.",
+              [(None, mem['percent'])])
+        m.add('swap_bytes', 'gauge', "Swap space.",
+              [({'state': k}, swap[k]) for k in ('total', 'used', 'free')])
+        m.add('swap_percent', 'gauge', "Swap space in use.", [(None, swap['percent'])])
+
+    disk = snapshot.get('disk')
+    if disk:
+        parts = disk['partitions']
+        m.add('filesystem_bytes', 'gauge', "Filesystem size and usage.",
+              [({'device': p['device'], 'mountpoint': p['mountpoint'],
+                 'fstype': p['fstype'], 'state': k}, p[k])
+               for p in parts for k in ('total', 'used', 'free')])
+        m.add('filesystem_stale', 'gauge', "1 if the last statvfs call didn't answer in time.",
+              [({'device': p['device'], 'mountpoint': p['mountpoint']}, int(p['stale']))
+               for p in parts])
+        m.add('filesystem_percent', 'gauge', "Filesystem space in use.",
+              [({'device': p['device'], 'mountpoint': p['mountpoint']}, p['percent'])
+               for p in parts])
+        m.add('disk_bytes_per_second', 'gauge', "Disk throughput, all devices.",
+              [({'direction': 'read'}, round(disk['read_bytes_per_s'], 1)),
+               ({'direction': 'write'}, round(disk['write_bytes_per_s'], 1))])
+
+    diskio = snapshot.get('diskio')
+    if diskio:
+        devices = diskio['devices']
+        m.add('disk_device_bytes_per_second', 'gauge', "Per-device disk throughput.",
+              [({'device': d['name'], 'direction': direction}, round(d[f'{direction}_bytes_per_s'], 1))
+               for d in devices for direction in ('read', 'write')])
+        m.add('disk_device_iops', 'gauge', "Per-device I/O operations per second.",
+              [({'device': d['name'], 'direction': direction}, round(d[f'{direction}_iops'], 2))
+               for d in devices for direction in ('read', 'write')])
+        m.add('disk_device_busy_percent', 'gauge', "Share of time the device was busy.",
+              [({'device': d['name']}, round(d['busy_percent'], 2)) for d in devices])
+
+    network = snapshot.get('network')
+    if network:
+        io = network['io']
+        m.add('network_bytes_total', 'counter', "Bytes transferred, all interfaces.",
+              [({'direction': 'sent'}, io['bytes_sent']),
+               ({'direction': 'recv'}, io['bytes_recv'])])
+        m.add('network_packets_total', 'counter', "Packets transferred, all interfaces.",
+              [({'direction': 'sent'}, io['packets_sent']),
+               ({'direction': 'recv'}, io['packets_recv'])])
+        m.add('network_bytes_per_second', 'gauge', "Network throughput, all interfaces.",
+              [({'direction': 'sent'}, round(network['sent_bytes_per_s'], 1)),
+               ({'direction': 'recv'}, round(network['recv_bytes_per_s'], 1))])
+        nics = network['nics']
+        m.add('interface_bytes_per_second', 'gauge', "Smoothed per-interface throughput.",
+              [({'interface': n['name'], 'direction': d}, round(n[f'bytes_{d}_per_s'], 1))
+               for n in nics for d in ('sent', 'recv')])
+        m.add('interface_packets_per_second', 'gauge', "Smoothed per-interface packet rate.",
+              [({'interface': n['name'], 'direction': d}, round(n[f'packets_{d}_per_s'], 2))
+               for n in nics for d in ('sent', 'recv')])
+        m.add('interface_errors_per_second', 'gauge', "Smoothed per-interface error rate.",
+              [({'interface': n['name']}, round(n['errors_per_s'], 3)) for n in nics])
+        m.add('interface_drops_per_second', 'gauge', "Smoothed per-interface drop rate.",
+              [({'interface': n['name']}, round(n['drops_per_s'], 3)) for n in nics])
+
+    process = snapshot.get('process')
+    if process:
+        m.add('processes', 'gauge', "Number of processes.", [(None, process['count'])])
+        m.add('top_process_cpu_percent', 'gauge', "CPU usage of the busiest processes.",
+              [({'pid': p['pid'], 'name': p['name']}, round(p['cpu_percent'], 2))
+               for p in process['top_cpu']])
+        m.add('top_process_memory_percent', 'gauge', "Memory usage of the largest processes.",
+              [({'pid': p['pid'], 'name': p['name']}, round(p['memory_percent'], 2))
+               for p in process['top_memory']])
+
+    thermal = snapshot.get('thermal')
+    if thermal:
+        cpus = [c for c in thermal['cpus'] if c['mhz'] is not None]
+        if cpus:
+            m.add('cpu_core_frequency_mhz', 'gauge', "Current frequency of each logical CPU.",
+                  [({'core': c['cpu']}, c['mhz']) for c in cpus])
+        cpus = [c for c in thermal['cpus'] if c['throttles'] is not None]
+        if cpus:
+            m.add('cpu_core_throttles_total', 'counter', "Thermal throttling events of each CPU's core.",
+                  [({'core': c['cpu']}, c['throttles']) for c in cpus])
+        if thermal['packages']:
+            m.add('cpu_package_throttles_total', 'counter', "Thermal throttling events per package.",
+                  [({'package': p['package']}, p['throttles']) for p in thermal['packages']
+                   if p['throttles'] is not None])
+        if thermal['sensors']:
+            m.add('temperature_celsius', 'gauge', "Temperature sensor readings.",
+                  [({'chip': t['chip'], 'device': t['device'], 'sensor': t['label']}, t['current'])
+                   for t in thermal['sensors']])
+    return m.text()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics (Prometheus) and /json from the server's cache"""
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            body = prometheus_text(self.server.cache.get()).encode()
+            ctype = 'text/plain; version=0.0.4; charset=utf-8'
+        elif path == '/json':
+            body = json.dumps(self.server.cache.get(), separators=(',', ':')).encode()
+            ctype = 'application/json'
+        elif path == '/':
+            body = b"sysinfo: see /metrics (Prometheus) or /json\n"
+            ctype = 'text/plain; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapers hit this every few seconds; don't flood stderr
+
+
+def make_server(port, bind='127.0.0.1', ttl=1.0):
+    """Create (but don't start) the metrics server"""
+    server = MetricsServer((bind, port), MetricsHandler)
+    server.cache = SnapshotCache(make_source(), ttl)
+    return server
+
+
+def run_server(port, bind='127.0.0.1', ttl=1.0):
+    server = make_server(port, bind, ttl)
+    print(f"sysinfo: serving http://{bind}:{server.server_port}/metrics and /json "
+          f"(snapshot TTL {ttl:g}s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,73 @@
+"""
+sysinfo stream - Headless JSON output for scripts and log pipelines
+Used by: sysinfo --once --json, sysinfo --stream
+"""
+
+import json
+import os
+import sys
+import time
+
+from sysinfo_core import DataSource, HistoryCollector, ProcessTable
+
+
+def make_source(interval=1.0):
+    """Build a DataSource whose collector is sampled by the caller"""
+    collector = HistoryCollector(interval=interval)
+    return DataSource(collector, ProcessTable())
+
+
+def write_record(out, record):
+    """Write one snapshot as a single JSON line"""
+    out.write(json.dumps(record, separators=(',', ':')) + '\n')
+    out.flush()
+
+
+def run_once(sections, delay=0.25, out=sys.stdout):
+    """Print a single snapshot, measuring CPU% and rates over delay seconds"""
+    source = make_source()
+    if 'thermal' in sections and delay > 0:
+        source.thermal()  # Baseline for the throttle rates
+    source.resample(delay)
+    write_record(out, source.snapshot(sections))
+
+
+def ticks(interval, count=None):
+    """Yield tick numbers on a fixed, drift-free schedule
+
+    Ticks are scheduled from a fixed start time so the cadence doesn't
+    drift. If the caller overruns, the missed ticks are skipped rather
+    than bunched up, which shows as a jump in the tick number.
+    """
+    start = time.monotonic()
+    tick = 0
+    emitted = 0
+    while count is None or emitted < count:
+        next_time = start + (tick + 1) * interval
+        now = time.monotonic()
+        if now < next_time:
+            time.sleep(next_time - now)
+        elif now - next_time >= interval:
+            tick += int((now - next_time) / interval)
+        tick += 1
+        yield tick
+        emitted += 1
+
+
+def run_stream(interval, sections, count=None, out=sys.stdout):
+    """Print one snapshot per interval until interrupted or count is reached
+
+    The gap left by skipped ticks shows in each record's 'seq' field.
+    """
+    source = make_source(interval)
+    try:
+        for tick in ticks(interval, count):
+            source.collector.sample()
+            record = source.snapshot(sections)
+            record['seq'] = tick
+            write_record(out, record)
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head); silence the final flush
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())